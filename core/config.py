@@ -8,6 +8,8 @@ class ConfigManager:
         self.config_path = "config.json"
         self.defaults = {
             "theme": "LIGHT",  # Default to Scientific Light
+            "tree_layout": "tidy",  # Key of ui.tree_layout.LAYOUT_ENGINES
+            "worker_lanes": {"interactive": 2, "ingest": 1, "ai": 2, "export": 1},  # Threads per core.workers.TaskQueue lane
             "hotkeys": {
                 "undo": [pygame.K_z, pygame.KMOD_CTRL],
                 "redo": [pygame.K_y, pygame.KMOD_CTRL],
@@ -0,0 +1,262 @@
+# --- FILE: core/csv_table.py ---
+import csv
+import io
+import threading
+from collections import OrderedDict
+from queue import LifoQueue
+import numpy as np
+
+class EditLog:
+    """Sparse record of cell edits as (row, col, old, new), with undo/redo.
+
+    base keeps each touched cell's value from the file, so patch() reports only
+    cells whose final value actually differs from it.
+    """
+    def __init__(self):
+        self.entries = []
+        self.undone = []
+        self.base = {} # (row, col) -> text in the file
+
+    def __len__(self):
+        return len(self.entries)
+
+    def record(self, row, col, old, new):
+        self.base.setdefault((row, col), old)
+        self.entries.append((row, col, old, new))
+        self.undone = []
+
+    def undo(self):
+        if not self.entries: return None
+        entry = self.entries.pop()
+        self.undone.append(entry)
+        return entry
+
+    def redo(self):
+        if not self.undone: return None
+        entry = self.undone.pop()
+        self.entries.append(entry)
+        return entry
+
+    def current(self):
+        """{(row, col): text} of every cell that differs from the file."""
+        values = {}
+        for row, col, _, new in self.entries: values[(row, col)] = new
+        return {key: new for key, new in values.items() if new != self.base[key]}
+
+    def patch(self):
+        """[[row, col, old, new], ...] sorted by position: what a save writes and the vault keeps."""
+        return [[row, col, self.base[(row, col)], new] for (row, col), new in sorted(self.current().items())]
+
+class CsvRewriteError(ValueError):
+    """The file can't be patched line by line without risking the wrong rows or bytes."""
+
+def rewrite_csv(src_path, dst_path, patch):
+    """Streams src to dst, re-serializing only the rows a patch touches; other lines are copied byte for byte.
+
+    Rows are counted like PagedCsv: data lines after the header, blank lines included.
+    Raises CsvRewriteError (dst is then incomplete and must be discarded) when a quoted
+    field spans lines, so line and row numbers disagree, when a touched row isn't UTF-8,
+    or when a touched cell no longer holds the value the patch was made against.
+    """
+    edits = {}
+    for row, col, old, new in patch: edits.setdefault(row, {})[col] = (old, new)
+    written = 0
+    with open(src_path, "rb") as src, open(dst_path, "wb") as dst:
+        header = src.readline()
+        if header.count(b'"') % 2: raise CsvRewriteError("header has a quoted field spanning lines")
+        dst.write(header)
+        for row, line in enumerate(src):
+            if line.count(b'"') % 2: raise CsvRewriteError(f"quoted field spans lines at row {row + 1}")
+            cells = edits.get(row)
+            if cells is None:
+                dst.write(line)
+                continue
+            ending = b"\r\n" if line.endswith(b"\r\n") else b"\n" if line.endswith(b"\n") else b""
+            try: text_line = line[:len(line) - len(ending)].decode("utf-8")
+            except UnicodeDecodeError: raise CsvRewriteError(f"row {row + 1} is not UTF-8")
+            values = next(csv.reader([text_line]), [])
+            for col, (old, text) in cells.items():
+                if (values[col] if col < len(values) else "") != old: raise CsvRewriteError(f"row {row + 1} changed since it was edited")
+                values.extend([""] * (col + 1 - len(values)))
+                values[col] = text
+            out = io.StringIO()
+            csv.writer(out, lineterminator="").writerow(values)
+            dst.write(out.getvalue().encode("utf-8") + ending)
+            written += 1
+    return written
+
+class PagedCsv:
+    """Read-only paged view of a CSV file for the editor grid.
+
+    Opening only reads the header. A thread scans the file for newlines (numpy,
+    a few MB at a time) and keeps one byte offset per page of page_rows lines,
+    so rows become addressable while the scan is still running. Pages are parsed
+    on a second thread into numpy column arrays of the raw cell strings and kept
+    in an LRU, so memory stays bounded whatever the file size. Edits live in
+    overrides and are never written into the pages.
+
+    Rows are newline-delimited: quoted fields containing line breaks are not supported.
+    """
+    def __init__(self, path, page_rows=256, max_pages=64, chunk_bytes=8 << 20):
+        self.path = path
+        self.page_rows = page_rows
+        self.max_pages = max_pages
+        self.chunk_bytes = chunk_bytes
+        self.lock = threading.Lock()
+        self.pages = OrderedDict() # page number -> list of column arrays
+        self.page_starts = [] # byte offset of each page's first row
+        self.row_count = 0 # rows indexed so far
+        self.file_size = 0
+        self.indexed_bytes = 0
+        self.complete = False
+        self.edits = EditLog()
+        self.overrides = {} # (row, col) -> edited text, derived from edits
+        self.changed = True # Set when new rows or pages arrive, cleared by poll_changed
+        self.closed = False
+        self.multiline = False # Set when a page holds a quoted field spanning lines (rows then shift)
+        self.requests = LifoQueue() # Newest first, so a fast scroll doesn't wait on pages it already passed
+        self.queued = set()
+
+        with open(path, "rb") as f:
+            header = f.readline()
+            self.file_size = f.seek(0, 2)
+        self.columns = next(csv.reader([header.decode("utf-8", errors="replace")]), [])
+        self.data_start = len(header)
+        threading.Thread(target=self._index_loop, daemon=True).start()
+        threading.Thread(target=self._page_loop, daemon=True).start()
+
+    def close(self):
+        self.closed = True
+        self.requests.put(None)
+
+    def poll_changed(self):
+        changed, self.changed = self.changed, False
+        return changed
+
+    @property
+    def progress(self):
+        return 1.0 if self.complete else self.indexed_bytes / max(1, self.file_size)
+
+    # --- INDEXING ---
+    def _index_loop(self):
+        starts, lines, pos = [], 0, self.data_start
+        tail = False # Bytes after the last newline (an unterminated final row)
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(pos)
+                while not self.closed:
+                    chunk = f.read(self.chunk_bytes)
+                    if not chunk: break
+                    newlines = np.flatnonzero(np.frombuffer(chunk, dtype=np.uint8) == 10)
+                    # Row k starts after newline k - 1, so page p starts after newline p * page_rows - 1
+                    if not starts: starts.append(pos)
+                    first = (self.page_rows - 1 - lines) % self.page_rows
+                    starts.extend((pos + newlines[first::self.page_rows] + 1).tolist())
+                    lines += len(newlines)
+                    pos += len(chunk)
+                    tail = not chunk.endswith(b"\n")
+                    with self.lock:
+                        self.page_starts = [s for s in starts if s < pos]
+                        self.row_count = lines
+                        self.indexed_bytes = pos
+                    self.changed = True
+        except OSError as e:
+            print(f"CSV index failed: {e}")
+        with self.lock:
+            self.page_starts = [s for s in starts if s < pos]
+            self.row_count = lines + (1 if tail else 0)
+            self.indexed_bytes = pos
+            self.complete = True
+        self.changed = True
+
+    # --- PAGES ---
+    def _page_range(self, page, partial=False):
+        """Byte span of a page; partial=True also gives the indexed part of the page the scan is still in."""
+        with self.lock:
+            if page >= len(self.page_starts): return None
+            start = self.page_starts[page]
+            if page + 1 < len(self.page_starts): return start, self.page_starts[page + 1]
+            if self.complete: return start, self.file_size
+            return (start, self.indexed_bytes) if partial else None
+
+    def _read_page(self, page, partial=False):
+        span = self._page_range(page, partial)
+        if span is None: return None
+        with open(self.path, "rb") as f:
+            f.seek(span[0])
+            raw = f.read(span[1] - span[0])
+        if partial and span[1] != self.file_size: raw = raw[:raw.rfind(b"\n") + 1] # Only whole indexed lines
+        rows = list(csv.reader(io.StringIO(raw.decode("utf-8", errors="replace"))))
+        if len(rows) != raw.count(b"\n") + (0 if raw.endswith(b"\n") or not raw else 1): self.multiline = True
+        width = max([len(self.columns)] + [len(r) for r in rows])
+        return [np.array([r[c] if c < len(r) else "" for r in rows], dtype=object) for c in range(width)]
+
+    def _page_loop(self):
+        while not self.closed:
+            page = self.requests.get()
+            if page is None: break
+            with self.lock:
+                self.queued.discard(page)
+                if page in self.pages: continue
+            try: columns = self._read_page(page)
+            except (OSError, csv.Error) as e:
+                print(f"CSV page {page} failed: {e}")
+                continue
+            if columns is None: continue # Not indexed yet; requested again on the next draw
+            with self.lock:
+                self.pages[page] = columns
+                if len(self.pages) > self.max_pages: self.pages.popitem(last=False)
+            self.changed = True
+
+    def request_rows(self, first, last):
+        """Queues the pages covering rows first..last (plus one page of lookahead each side)."""
+        with self.lock:
+            missing = [p for p in range(max(0, first // self.page_rows - 1), last // self.page_rows + 2) if p not in self.pages and p not in self.queued]
+            self.queued.update(missing)
+        for p in reversed(missing): self.requests.put(p) # Lowest page comes off the LIFO first
+
+    def cell(self, row, col, wait=False):
+        """Cell text, or None while its page is still loading. wait=True reads a missing page right away."""
+        if (row, col) in self.overrides: return self.overrides[(row, col)]
+        page = row // self.page_rows
+        with self.lock:
+            columns = self.pages.get(page)
+            if columns is not None: self.pages.move_to_end(page)
+        if columns is None:
+            if not wait: return None
+            columns = self._read_page(page)
+            if columns is not None:
+                with self.lock: self.pages[page] = columns
+            else:
+                columns = self._read_page(page, partial=True) # Page still being indexed: not cached, it will grow
+                if not columns or row % self.page_rows >= len(columns[0]): return None
+        if col >= len(columns): return ""
+        values = columns[col]
+        i = row % self.page_rows
+        return values[i] if i < len(values) else ""
+
+    def set_cell(self, row, col, text):
+        """Records an edit; returns False if the row can't be read (not indexed yet), so the caller can say so."""
+        old = self.cell(row, col, wait=True)
+        if old is None: return False
+        if old != text:
+            self.edits.record(row, col, old, text)
+            self._show(row, col, text)
+        return True
+
+    def _show(self, row, col, text):
+        if text == self.edits.base.get((row, col)): self.overrides.pop((row, col), None)
+        else: self.overrides[(row, col)] = text
+
+    def undo(self):
+        """Reverts the last edit; returns its (row, col) or None."""
+        entry = self.edits.undo()
+        if entry is None: return None
+        self._show(entry[0], entry[1], entry[2])
+        return entry[:2]
+
+    def redo(self):
+        entry = self.edits.redo()
+        if entry is None: return None
+        self._show(entry[0], entry[1], entry[3])
+        return entry[:2]
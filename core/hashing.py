@@ -1,4 +1,5 @@
 import hashlib
+import json
 import os
 import shutil
 import time
@@ -43,4 +44,16 @@ def save_to_vault(file_path: str, project_path: str) -> str:
             print(f"Vault Backup Failed: {e}")
             return None
             
-    return file_hash
\ No newline at end of file
+    return file_hash
+
+def save_patch_to_vault(project_path: str, base_hash: str, new_hash: str, patch: list) -> str:
+    """Stores a sparse cell patch next to its base version: <new_hash>.patch.json turns <base_hash>.csv into new_hash."""
+    vault_dir = ensure_vault(project_path)
+    dest = os.path.join(vault_dir, f"{new_hash}.patch.json")
+    try:
+        with open(dest, "w", encoding="utf-8") as f:
+            json.dump({"base": base_hash, "result": new_hash, "edits": patch}, f)
+    except Exception as e:
+        print(f"Vault Patch Failed: {e}")
+        return None
+    return dest
@@ -1,6 +1,8 @@
 # --- FILE: core/processor.py ---
 from fpdf import FPDF
+import math
 import os
+import numpy as np
 import pandas as pd
 from settings import UITheme
 
@@ -22,7 +24,7 @@ class PDFReport(FPDF):
     def header(self):
         self.set_font('DejaVu', 'B', 12)
         self.cell(0, 10, 'SCI-GIT // AUTOMATED RESEARCH LOG', 0, 1, 'R')
-        self.line(10, 20, 200, 20)
+        self.line(10, 20, self.w - 10, 20)
         self.ln(10)
 
     def footer(self):
@@ -73,18 +75,88 @@ def export_to_report(filename, analysis_dict, branch_name, plot_image_path=None)
         print(f"PDF Generation Error: {e}")
         return False
 
-def export_tree_to_pdf(filename, tree_image_path):
-    """Exports the version tree diagram to a PDF."""
+MAP_SCALE = 0.15    # mm per world unit on tiled sheets: a generation step (160) is 24 mm
+MAP_MAX_SCALE = 0.5 # Small trees are scaled up to fill one sheet, but not past this
+
+def export_tree_map_pdf(filename, nodes, edges, cancel=None, progress=None, radius=18):
+    """Draws a VersionTree.map_snapshot() into a PDF as vector lines, curves and text.
+
+    Small trees fit one landscape sheet; larger ones are tiled over as many sheets
+    as needed at MAP_SCALE, each listing only the nodes and edges that reach it.
+    Nothing is rasterized, so the output grows with the node count, not the tree's area.
+    Returns False when cancel (a threading.Event such as a CancelToken) is set or the file can't be written.
+    """
+    pos = {n[0]: (n[1], n[2]) for n in nodes}
+    pad = radius * 3 # Room for the name under a node
+    min_x, max_x = min(p[0] for p in pos.values()) - pad, max(p[0] for p in pos.values()) + pad
+    min_y, max_y = min(p[1] for p in pos.values()) - pad, max(p[1] for p in pos.values()) + pad
+
     pdf = PDFReport()
-    pdf.add_page()
-    pdf.set_font("DejaVu", "B", 16)
-    pdf.cell(0, 10, "PROJECT STRUCTURE MAPPING", ln=True, align='L')
-    pdf.ln(5)
-    
-    if tree_image_path and os.path.exists(tree_image_path):
-        # Scale image to fit page width
-        pdf.image(tree_image_path, x=10, w=190)
-    
+    top = 40 # Below the report header and the map title
+    page_w, page_h = pdf.h - 20, pdf.w - top - 17 # Landscape area, clear of the footer
+    scale = min(MAP_MAX_SCALE, page_w / (max_x - min_x), page_h / (max_y - min_y))
+    if scale < MAP_SCALE: scale = MAP_SCALE
+    tile_w, tile_h = page_w / scale, page_h / scale # World size of one sheet
+    cols = max(1, math.ceil((max_x - min_x) / tile_w))
+    rows = max(1, math.ceil((max_y - min_y) / tile_h))
+
+    def tiles(x0, y0, x1, y1):
+        c0, c1 = int((x0 - min_x) // tile_w), int((x1 - min_x) // tile_w)
+        r0, r1 = int((y0 - min_y) // tile_h), int((y1 - min_y) // tile_h)
+        return [(r, c) for r in range(max(0, r0), min(rows - 1, r1) + 1) for c in range(max(0, c0), min(cols - 1, c1) + 1)]
+
+    sheets = {} # (row, col) -> ([node rows], [edge tuples])
+    for n in nodes:
+        x, y = n[1], n[2]
+        for t in tiles(x - pad, y - radius, x + pad, y + pad): sheets.setdefault(t, ([], []))[0].append(n)
+    for src, dst in edges:
+        if src not in pos or dst not in pos: continue
+        (x0, y0), (x1, y1) = pos[src], pos[dst]
+        for t in tiles(min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1)): sheets.setdefault(t, ([], []))[1].append((x0, y0, x1, y1))
+
+    r = radius * scale
+    font_pt = max(2.0, r * 1.4) # ~0.35 mm per point
+    for done, ((row, col), (sheet_nodes, sheet_edges)) in enumerate(sorted(sheets.items())):
+        if cancel is not None and cancel.is_set(): return False
+        if progress: progress(done, len(sheets))
+        pdf.add_page(orientation="L")
+        pdf.set_font("DejaVu", "B", 12)
+        title = "PROJECT STRUCTURE MAPPING"
+        pdf.cell(0, 8, title if len(sheets) == 1 else f"{title} // SHEET {row + 1}-{col + 1} OF {rows}x{cols}", ln=True)
+        ox, oy = 10 - (min_x + col * tile_w) * scale, top - (min_y + row * tile_h) * scale
+        with pdf.rect_clip(10, top, page_w, page_h):
+            pdf.set_line_width(0.3)
+            pdf.set_draw_color(100, 100, 110)
+            if sheet_edges:
+                # Same n8n-style curve as the tree view, from the parent's right to the child's left,
+                # flattened to short polylines in one numpy pass (FPDF.bezier is ~50x slower per call)
+                ends = np.array(sheet_edges, dtype=float) * scale + (ox, oy, ox, oy)
+                start, end = ends[:, :2] + (r, 0), ends[:, 2:] - (r, 0)
+                bend = (end[:, 0] - start[:, 0]) / 2
+                bend[np.abs(bend) < 10 * scale] = 40 * scale
+                cp1, cp2 = start.copy(), end.copy()
+                cp1[:, 0] += bend
+                cp2[:, 0] -= bend
+                t = np.linspace(0, 1, 13)[None, :, None]
+                curves = (1-t)**3 * start[:, None] + 3*(1-t)**2 * t * cp1[:, None] + 3*(1-t) * t**2 * cp2[:, None] + t**3 * end[:, None]
+                for points in curves.tolist(): pdf.polyline(points)
+            pdf.set_font("DejaVu", "", font_pt)
+            pdf.set_fill_color(*UITheme.PANEL_GREY)
+            for branch_main in (True, False): # One draw colour change per group instead of per node
+                pdf.set_draw_color(*(UITheme.NODE_MAIN if branch_main else UITheme.NODE_BRANCH))
+                for node_id, x, y, name, branch in sheet_nodes:
+                    if (branch == "main") != branch_main: continue
+                    cx, cy = x * scale + ox, y * scale + oy
+                    pdf.ellipse(cx - r, cy - r, 2 * r, 2 * r, style="DF")
+            pdf.set_text_color(*UITheme.TEXT_OFF_WHITE)
+            for node_id, x, y, name, branch in sheet_nodes:
+                label = str(node_id)
+                pdf.text(x * scale + ox - pdf.get_string_width(label) / 2, y * scale + oy + font_pt * 0.12, label)
+            pdf.set_text_color(60, 60, 70)
+            for node_id, x, y, name, branch in sheet_nodes:
+                pdf.text(x * scale + ox - r * 1.6, y * scale + oy + r * 1.9, name[:15] + ".." if len(name) > 15 else name)
+        pdf.set_text_color(0, 0, 0)
+
     try:
         pdf.output(filename)
         return True
@@ -0,0 +1,63 @@
+# --- FILE: core/stall_monitor.py ---
+import os
+import sys
+import threading
+import time
+import traceback
+
+class StallMonitor:
+    """Watchdog that logs main-thread stalls.
+
+    The main loop calls beat() when it starts working on a frame and idle()
+    before it sleeps. A daemon thread samples every few ms; when one busy
+    stretch runs past threshold_ms it prints where the main thread currently
+    is, and once the stretch ends how long it lasted in total.
+    """
+    def __init__(self, threshold_ms=50, depth=4):
+        self.threshold = threshold_ms / 1000
+        self.depth = depth
+        self.main_id = threading.main_thread().ident
+        self.root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        self.busy_since = None
+        self.reported = None # busy_since of the stretch already logged
+        self.stalls = 0
+        self.thread = None
+
+    def start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._loop, daemon=True)
+            self.thread.start()
+        return self
+
+    def beat(self):
+        self._finish(time.perf_counter())
+        self.busy_since = time.perf_counter()
+
+    def idle(self):
+        self._finish(time.perf_counter())
+        self.busy_since = None
+
+    def _finish(self, now):
+        since = self.busy_since
+        if since is not None and since == self.reported:
+            print(f"STALL: main thread was blocked {(now - since) * 1000:.0f} ms")
+
+    def call_site(self):
+        """Innermost project frames of the main thread (library frames skipped), outermost first."""
+        frame = sys._current_frames().get(self.main_id)
+        if frame is None: return "?"
+        stack = [f for f in traceback.extract_stack(frame) if f.filename.startswith(self.root)]
+        return " <- ".join(f"{os.path.relpath(f.filename, self.root)}:{f.lineno} {f.name}" for f in reversed(stack[-self.depth:])) or "?"
+
+    def _loop(self):
+        while True:
+            time.sleep(self.threshold / 5)
+            since = self.busy_since
+            if since is None or since == self.reported: continue
+            if time.perf_counter() - since >= self.threshold:
+                self.reported = since
+                self.stalls += 1
+                print(f"STALL: main thread busy > {self.threshold * 1000:.0f} ms at {self.call_site()}")
+
+# Global Instance
+stall_monitor = StallMonitor()
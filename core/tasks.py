@@ -0,0 +1,35 @@
+# --- FILE: core/tasks.py ---
+import threading
+
+HIGH, NORMAL, LOW = 0, 1, 2 # Task priorities within a lane; lower runs first
+
+class CancelToken(threading.Event):
+    """Per-task cancellation flag. Tasks poll current_token().cancelled between slow steps.
+
+    superseded marks a token cancelled because a newer task with the same key was queued;
+    the TaskQueue drops such a task's result even if it already ran.
+    """
+    def __init__(self, key=None):
+        super().__init__()
+        self.key = key
+        self.superseded = False
+
+    @property
+    def cancelled(self):
+        return self.is_set()
+
+    def cancel(self, superseded=False):
+        self.superseded = self.superseded or superseded
+        self.set()
+
+_local = threading.local()
+_idle_token = CancelToken() # Returned outside tasks; never cancelled
+
+def current_token():
+    """Token of the task running on this thread."""
+    return getattr(_local, "token", None) or _idle_token
+
+def run_with_token(token, func, args):
+    _local.token = token
+    try: return func(*args)
+    finally: _local.token = None
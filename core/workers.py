@@ -1,15 +1,22 @@
 # --- FILE: core/workers.py ---
 import pygame
 import os
-import json
+import errno
 import pandas as pd
 import threading
+import time
+import itertools
 import shutil
 import tempfile
-from queue import Queue
+from queue import Queue, PriorityQueue
 from state_manager import state
-from engine.analytics import create_seaborn_surface, HeaderScanner
-from core.hashing import save_to_vault, get_file_hash, ensure_vault
+from core.tasks import CancelToken, current_token, run_with_token, NORMAL
+from engine.analytics import create_seaborn_surface, compute_column_stats, compute_column_stats_chunked, HeaderScanner
+from core.hashing import save_to_vault, get_file_hash, ensure_vault, save_patch_to_vault
+from core.csv_table import rewrite_csv, CsvRewriteError
+from core.processor import export_tree_map_pdf
+
+PREVIEW_BYTES = 50 * 1024 * 1024 # Files above this are plotted from their first rows and summarized in chunks
 
 class WorkerController:
     def __init__(self, db, ai_engine):
@@ -21,12 +28,11 @@ class WorkerController:
             if len(exp_ids) == 1:
                 raw = self.db.get_experiment_by_id(exp_ids[0])
                 if raw:
-                    file_path = raw[3]
+                    file_path = raw.file_path
                     if not os.path.exists(file_path):
                         return {"type": "LOAD_COMPLETE", "data": {"analysis": {"summary": "FILE MISSING", "anomalies": ["FILE_NOT_FOUND"]}, "status": "FILE MISSING", "is_corrupted": True}}
                     
-                    saved_settings = None
-                    if len(raw) > 11 and raw[11]: saved_settings = json.loads(raw[11])
+                    saved_settings = raw.saved_plot_settings
                     final_x = custom_x if custom_x else (saved_settings.get("x") if saved_settings else None)
                     final_y = custom_y if custom_y else (saved_settings.get("y") if saved_settings else None)
 
@@ -34,12 +40,13 @@ class WorkerController:
                         self.db.update_plot_settings(exp_ids[0], final_x, final_y)
 
                     file_size = os.path.getsize(file_path)
-                    if file_size > 50 * 1024 * 1024:
+                    if file_size > PREVIEW_BYTES:
                         df = pd.read_csv(file_path, nrows=1000)
                         status_note = "LARGE FILE: PREVIEW MODE"
                     else:
                         df = pd.read_csv(file_path)
-                        status_note = f"LOADED: {raw[2]}"
+                        status_note = f"LOADED: {raw.name}"
+                    if current_token().cancelled: return {"type": "CANCELLED"} # A newer selection superseded this load
 
                     plot_bytes, size, context = create_seaborn_surface(df, x_col=final_x, y_col=final_y)
                     
@@ -47,8 +54,8 @@ class WorkerController:
                         "type": "LOAD_COMPLETE",
                         "data": {
                             "plot_data": (plot_bytes, size, context),
-                            "analysis": json.loads(raw[4]),
-                            "metadata": {"notes": raw[8], "temp": raw[9], "sid": raw[10]},
+                            "analysis": raw.analysis,
+                            "metadata": {"notes": raw.notes, "temp": raw.temperature, "sid": raw.sample_id},
                             "status": status_note
                         }
                     }
@@ -56,19 +63,67 @@ class WorkerController:
                 raw1 = self.db.get_experiment_by_id(exp_ids[0])
                 raw2 = self.db.get_experiment_by_id(exp_ids[1])
                 if raw1 and raw2:
-                    df1 = pd.read_csv(raw1[3])
-                    df2 = pd.read_csv(raw2[3])
+                    df1 = pd.read_csv(raw1.file_path)
+                    df2 = pd.read_csv(raw2.file_path)
                     u1, col1 = HeaderScanner.detect_temp_unit(df1)
                     u2, col2 = HeaderScanner.detect_temp_unit(df2)
-                    if u1 and u2 and u1 != u2: return {"type": "CONVERSION_NEEDED", "data": (raw2[3], col2, u1)}
-                    
+                    if u1 and u2 and u1 != u2: return {"type": "CONVERSION_NEEDED", "data": (raw2.file_path, col2, u1)}
+                    if current_token().cancelled: return {"type": "CANCELLED"}
+
                     plot_bytes, size, context = create_seaborn_surface(df1, df2, x_col=custom_x, y_col=custom_y)
-                    comparison = self.ai_engine.compare_experiments(df1, df2)
-                    return {"type": "LOAD_COMPLETE", "data": {"plot_data": (plot_bytes, size, context), "analysis": comparison, "status": "COMPARISON COMPLETE"}}
+                    return {
+                        "type": "LOAD_COMPLETE",
+                        "data": {"plot_data": (plot_bytes, size, context), "analysis": {"summary": "COMPARING...", "anomalies": []}, "status": self._lineage_status(exp_ids[0], exp_ids[1])},
+                        # The AI comparison is a network call: it runs on the ai lane so the next plot load doesn't wait on it
+                        "follow_up": (self.worker_compare_experiments, [list(exp_ids), df1, df2], {"background": True, "lane": "ai", "supersede": "compare"})
+                    }
             return {"type": "ERROR", "data": "Invalid Selection"}
         except Exception as e:
             return {"type": "ERROR", "data": str(e)}
 
+    def worker_search(self, text, limit):
+        """Search-bar query: a column-stat predicate or ranked full-text search."""
+        try:
+            predicate = self.db.parse_stat_predicate(text)
+            if predicate: results = self.db.query_column_stats(*predicate, limit=limit)
+            else: results = self.db.search_experiments(text, limit=limit)
+            return {"type": "SEARCH_RESULTS", "data": {"text": text, "results": results, "predicate": bool(predicate)}}
+        except Exception as e:
+            return {"type": "ERROR", "data": str(e)}
+
+    def worker_compare_experiments(self, exp_ids, df1, df2):
+        try:
+            comparison = self.ai_engine.compare_experiments(df1, df2)
+            if current_token().cancelled: return {"type": "CANCELLED"}
+            return {"type": "COMPARISON_READY", "data": {"ids": exp_ids, "analysis": comparison}}
+        except Exception as e:
+            return {"type": "ERROR", "data": str(e)}
+
+    def _lineage_status(self, id_a, id_b):
+        if self.db.is_ancestor(id_a, id_b): return f"COMPARISON COMPLETE // {id_a} IS ANCESTOR OF {id_b}"
+        if self.db.is_ancestor(id_b, id_a): return f"COMPARISON COMPLETE // {id_b} IS ANCESTOR OF {id_a}"
+        common = self.db.lca(id_a, id_b)
+        return f"COMPARISON COMPLETE // COMMON ANCESTOR {common}" if common else "COMPARISON COMPLETE"
+
+    def _record_version_stats(self, node_id, file_hash, df=None, file_path=None):
+        """Computes column stats once per data version and points the node at that version."""
+        if not file_hash: return
+        if not self.db.has_column_stats(file_hash):
+            if df is not None: stats = compute_column_stats(df)
+            elif os.path.getsize(file_path) > PREVIEW_BYTES: stats = compute_column_stats_chunked(file_path)
+            else: stats = compute_column_stats(pd.read_csv(file_path))
+            self.db.save_column_stats([(file_hash, stats)])
+        self.db.set_file_hash(node_id, file_hash)
+
+    def _record_and_preview(self, node_id, file_hash, file_path):
+        """Records stats for a file and returns the frame to plot; large files are never loaded whole."""
+        if os.path.getsize(file_path) > PREVIEW_BYTES:
+            if node_id: self._record_version_stats(node_id, file_hash, file_path=file_path)
+            return pd.read_csv(file_path, nrows=1000)
+        df = pd.read_csv(file_path)
+        if node_id: self._record_version_stats(node_id, file_hash, df)
+        return df
+
     def worker_process_new_file(self, file_path, parent_id, branch, researcher):
         try:
             existing_id = self.db.get_id_by_path(file_path)
@@ -87,7 +142,7 @@ class WorkerController:
             if initial_hash and new_id:
                 self.db.add_hash_to_history(new_id, initial_hash)
 
-            df = pd.read_csv(file_path)
+            df = self._record_and_preview(new_id, initial_hash, file_path)
             plot_bytes, size, context = create_seaborn_surface(df)
             
             return {
@@ -102,6 +157,72 @@ class WorkerController:
         except Exception as e:
             return {"type": "ERROR", "data": str(e)}
 
+    def worker_import_directory(self, dir_path, parent_id, branch, researcher):
+        """Imports every CSV in a folder (oldest first) as a chain of nodes in one bulk transaction."""
+        try:
+            files = [os.path.join(dir_path, f) for f in os.listdir(dir_path) if f.lower().endswith(".csv")]
+            files.sort(key=os.path.getmtime)
+            if not files: return {"type": "ERROR", "data": "NO CSV FILES IN FOLDER"}
+
+            records = []
+            for path in files:
+                file_hash = save_to_vault(path, state.selected_project_path)
+                records.append({
+                    "name": os.path.basename(path),
+                    "file_path": path,
+                    "analysis": self.ai_engine.get_placeholder_analysis(path).model_dump(),
+                    "file_hash": file_hash
+                })
+
+            ids = self.db.add_experiments_bulk(records, parent_id, branch)
+            unreadable = 0
+            for exp_id, rec in zip(ids, records):
+                # Same bounded path as every other ingest: large files are summarized in chunks
+                try: self._record_version_stats(exp_id, rec["file_hash"], file_path=rec["file_path"])
+                except Exception as e:
+                    print(f"Import stats skipped {rec['file_path']}: {e}")
+                    try: self.db.mark_stats_failed(exp_id, str(e) or type(e).__name__)
+                    except Exception as db_error: print(f"Could not record stats failure for {exp_id}: {db_error}")
+                    unreadable += 1
+            status = f"IMPORTED {len(ids)} RUNS BY {researcher}"
+            if unreadable: status += f" ({unreadable} UNREADABLE)"
+            return {
+                "type": "IMPORT_COMPLETE",
+                "data": {"head_id": ids[-1], "status": status}
+            }
+        except Exception as e:
+            return {"type": "ERROR", "data": str(e)}
+
+    def worker_prune_missing(self):
+        """Drops nodes whose files were deleted outside the app, reporting progress in the status bar."""
+        try:
+            def progress(done, total): state.status_msg = f"CHECKING PROJECT FILES: {done}/{total} FOLDERS"
+            removed = self.db.prune_missing_files(progress)
+            return {"type": "PRUNE_COMPLETE", "data": {"removed": removed}}
+        except Exception as e:
+            return {"type": "ERROR", "data": str(e)}
+
+    def worker_backfill_column_stats(self, batch):
+        """Hashes and summarizes one batch of (id, file_path) runs that have no column stats yet.
+
+        Main queues one small batch per task, so other ingest work runs in between. Failures
+        are stored on the run and not retried until its file changes.
+        """
+        indexed = failed = 0
+        for exp_id, file_path in batch:
+            if current_token().cancelled: return {"type": "CANCELLED"}
+            try:
+                file_hash = get_file_hash(file_path)
+                if not file_hash: raise FileNotFoundError("file missing")
+                self._record_version_stats(exp_id, file_hash, file_path=file_path)
+                indexed += 1
+            except Exception as e:
+                print(f"Stats backfill skipped {file_path}: {e}")
+                try: self.db.mark_stats_failed(exp_id, str(e) or type(e).__name__)
+                except Exception as db_error: print(f"Could not record stats failure for {exp_id}: {db_error}")
+                failed += 1
+        return {"type": "STATS_BACKFILL_PROGRESS", "data": {"indexed": indexed, "failed": failed}}
+
     def worker_find_inconsistencies(self):
         try:
             tree_data = self.db.get_tree_data()
@@ -121,15 +242,12 @@ class WorkerController:
         try:
             raw = self.db.get_experiment_by_id(node_id)
             if not raw: return {"type": "ERROR", "data": "Node not found"}
-            file_path = raw[3]
+            file_path = raw.file_path
             if not os.path.exists(file_path): return {"type": "ERROR", "data": "File missing"}
-            if state.stop_ai_requested: return {"type": "CANCELLED"}
+            if current_token().cancelled: return {"type": "CANCELLED"}
             analysis_data = self.ai_engine.analyze_csv_data(file_path, model="gpt-5-mini")
-            if state.stop_ai_requested: return {"type": "CANCELLED"}
-            with self.db.lock:
-                cursor = self.db.conn.cursor()
-                cursor.execute("UPDATE experiments SET analysis_json = ? WHERE id = ?", (json.dumps(analysis_data.model_dump()), node_id))
-                self.db.conn.commit()
+            if current_token().cancelled: return {"type": "CANCELLED"}
+            self.db.update_analysis(node_id, analysis_data.model_dump())
             return {"type": "ANALYSIS_READY", "data": analysis_data.model_dump()}
         except Exception as e:
             return {"type": "ERROR", "data": str(e)}
@@ -139,14 +257,14 @@ class WorkerController:
         try:
             raw = self.db.get_experiment_by_id(node_id)
             if not raw: return {"type": "ERROR", "data": "Node not found"}
-            file_path = raw[3]
+            file_path = raw.file_path
             if not os.path.exists(file_path): return {"type": "ERROR", "data": "File missing"}
             
-            if state.stop_ai_requested: return {"type": "CANCELLED"}
+            if current_token().cancelled: return {"type": "CANCELLED"}
             
             analysis_data = self.ai_engine.generate_simplified_summary(file_path)
             
-            if state.stop_ai_requested: return {"type": "CANCELLED"}
+            if current_token().cancelled: return {"type": "CANCELLED"}
             
             return {"type": "ANALYSIS_READY", "data": analysis_data.model_dump()}
         except Exception as e:
@@ -158,11 +276,11 @@ class WorkerController:
             tree_data = self.db.get_tree_data()
             tree_text = "\n".join([f"ID:{r[0]}, Parent:{r[1]}, Branch:{r[2]}, Name:{r[3]}" for r in tree_data])
             
-            if state.stop_ai_requested: return {"type": "CANCELLED"}
+            if current_token().cancelled: return {"type": "CANCELLED"}
             
             analysis_data = self.ai_engine.generate_project_simplified_summary(tree_text)
             
-            if state.stop_ai_requested: return {"type": "CANCELLED"}
+            if current_token().cancelled: return {"type": "CANCELLED"}
             
             return {"type": "ANALYSIS_READY", "data": analysis_data.model_dump()}
         except Exception as e:
@@ -173,9 +291,14 @@ class WorkerController:
             tree = self.db.get_tree_data()
             branch_nodes = [row for row in tree if row[2] == branch_name]
             history_text = "\n".join([f"ID: {row[0]} | Name: {row[3]}" for row in branch_nodes[-5:]])
-            if state.stop_ai_requested: return {"type": "CANCELLED"}
+            if branch_nodes:
+                branch_root = branch_nodes[0][0]
+                for row in branch_nodes[1:]:
+                    branch_root = self.db.lca(branch_root, row[0]) or branch_root
+                history_text = f"Common ancestor of branch: ID {branch_root}\n" + history_text
+            if current_token().cancelled: return {"type": "CANCELLED"}
             report = self.ai_engine.analyze_branch_history(history_text)
-            if state.stop_ai_requested: return {"type": "CANCELLED"}
+            if current_token().cancelled: return {"type": "CANCELLED"}
             return {"type": "ANALYSIS_READY", "data": {"summary": f"BRANCH REPORT ({branch_name}):\n{report}", "anomalies": []}}
         except Exception as e:
             return {"type": "ERROR", "data": str(e)}
@@ -191,6 +314,7 @@ class WorkerController:
 
     def worker_export_project(self, project_path):
         try:
+            if current_token().cancelled: return {"type": "EXPORT_COMPLETE", "data": "EXPORT CANCELLED."}
             ts = pd.Timestamp.now().strftime("%Y%m%d_%H%M")
             zip_name = f"SciGit_Export_{ts}"
             
@@ -211,15 +335,31 @@ class WorkerController:
         except Exception as e:
             return {"type": "ERROR", "data": str(e)}
 
-    def worker_save_editor_changes(self, node_id, file_path, df, project_path):
+    def worker_save_editor_changes(self, node_id, file_path, patch, project_path):
+        """Applies a sparse editor patch by streaming the file; the vault keeps the base version plus the patch.
+
+        SAVE_REFUSED means the file is unchanged and the editor keeps its edits.
+        """
+        tmp_path = file_path + ".saving"
         try:
             old_hash = save_to_vault(file_path, project_path)
-            if old_hash: self.db.add_hash_to_history(node_id, old_hash)
-            df.to_csv(file_path, index=False)
+            rewrite_csv(file_path, tmp_path, patch)
+            os.replace(tmp_path, file_path)
+        except CsvRewriteError as e:
+            return {"type": "SAVE_REFUSED", "data": f"SAVE REFUSED: {e}"}
+        except Exception as e:
+            return {"type": "SAVE_REFUSED", "data": f"SAVE FAILED: {e}"}
+        finally:
+            if os.path.exists(tmp_path): os.remove(tmp_path)
+        try:
+            if old_hash: self.db.add_hash_to_history(node_id, old_hash) # Only now is there a version to undo to
+            new_hash = get_file_hash(file_path)
+            if old_hash and new_hash: save_patch_to_vault(project_path, old_hash, new_hash, patch)
+            df = self._record_and_preview(node_id, new_hash, file_path)
             plot_bytes, size, context = create_seaborn_surface(df)
-            return {"type": "SAVE_COMPLETE", "data": {"node_id": node_id, "status": "VERSION SAVED", "plot_data": (plot_bytes, size, context)}}
+            return {"type": "SAVE_COMPLETE", "data": {"node_id": node_id, "status": "VERSION SAVED.", "plot_data": (plot_bytes, size, context)}}
         except Exception as e:
-            return {"type": "ERROR", "data": str(e)}
+            return {"type": "SAVE_COMPLETE", "data": {"node_id": node_id, "status": f"VERSION SAVED, BUT: {e}"}}
 
     def worker_undo(self, node_id, file_path, project_path, redo_stack_list):
         try:
@@ -231,6 +371,7 @@ class WorkerController:
             current_hash = save_to_vault(file_path, project_path)
             shutil.copy2(vault_file, file_path)
             self.db.remove_last_history_entry(node_id)
+            self._record_version_stats(node_id, target_hash, file_path=file_path)
             return {"type": "UNDO_COMPLETE", "data": {"node_id": node_id, "redo_hash": current_hash, "restored_hash": target_hash}}
         except Exception as e:
             return {"type": "ERROR", "data": str(e)}
@@ -242,46 +383,174 @@ class WorkerController:
             current_hash = save_to_vault(file_path, project_path)
             if current_hash: self.db.add_hash_to_history(node_id, current_hash)
             shutil.copy2(vault_file, file_path)
+            self._record_version_stats(node_id, redo_hash, file_path=file_path)
             return {"type": "REDO_COMPLETE", "data": {"node_id": node_id, "restored_hash": redo_hash}}
         except Exception as e:
              return {"type": "ERROR", "data": str(e)}
 
+def worker_move_project(src, dst, action="MOVE"):
+    """Moves a project folder: a rename when both sides share a filesystem, else a cancellable per-file copy.
+
+    Needs no db, which main closes before queueing. PROJECT_MOVED carries the path to reopen.
+    """
+    cancel = current_token()
+    def done(path, status): return {"type": "PROJECT_MOVED", "data": {"path": path, "status": status}}
+    try:
+        os.rename(src, dst)
+        return done(dst, f"PROJECT {action}D.")
+    except OSError as e:
+        if e.errno != errno.EXDEV: return done(src, f"{action} FAILED: {e}")
+    try:
+        walk = list(os.walk(src))
+        total = sum(len(files) for _, _, files in walk)
+        copied = 0
+        for root, _, files in walk:
+            target = os.path.join(dst, os.path.relpath(root, src))
+            os.makedirs(target, exist_ok=True)
+            for name in files:
+                if cancel.cancelled: raise InterruptedError
+                shutil.copy2(os.path.join(root, name), os.path.join(target, name))
+                copied += 1
+                state.status_msg = f"{action}: {copied}/{total} FILES (ESC TO CANCEL)"
+    except InterruptedError:
+        shutil.rmtree(dst, ignore_errors=True)
+        return done(src, f"{action} CANCELLED.")
+    except Exception as e:
+        shutil.rmtree(dst, ignore_errors=True)
+        return done(src, f"{action} FAILED: {e}")
+    shutil.rmtree(src, onerror=lambda func, path, exc: print(f"Could not remove {path}: {exc[1]}"))
+    return done(dst, f"PROJECT {action}D.")
+
+def worker_print_map(path, nodes, edges):
+    """Writes a VersionTree.map_snapshot() to a vector PDF, without touching the live tree."""
+    try:
+        cancel = current_token()
+        def progress(done, total): state.status_msg = f"GENERATING MAP: SHEET {done + 1}/{total} (ESC TO CANCEL)"
+        success = export_tree_map_pdf(path, nodes, edges, cancel, progress)
+        if cancel.cancelled: return {"type": "EXPORT_COMPLETE", "data": "MAP CANCELLED."}
+        return {"type": "EXPORT_COMPLETE", "data": "MAP SAVED." if success else "MAP ERROR."}
+    except Exception as e:
+        return {"type": "ERROR", "data": str(e)}
+
+LANES = {"interactive": 2, "ingest": 1, "ai": 2, "export": 1} # Worker threads per lane
+
 class TaskQueue:
-    def __init__(self):
-        self.task_queue = Queue()
+    """Worker pools per lane, so plot loads never queue behind AI calls or exports.
+
+    interactive: plot loads. ingest: anything that writes project files or the db, one
+    worker so writes keep their order. ai: network calls. export: zips, PDFs, project moves.
+    Within a lane lower priority values run first. Every task runs with a CancelToken
+    (core.tasks.current_token()); queuing a task with a supersede key cancels older tasks
+    with that key and drops their results.
+    """
+    def __init__(self, lanes=None):
         self.result_queue = Queue()
-        self.worker_thread = threading.Thread(target=self._worker_loop, daemon=True)
-        self.worker_thread.start()
+        self.queues = {}
+        self.tokens = {} # lane -> tokens queued or running
+        self.blocking = set() # Tokens of tasks that show the processing overlay
+        self.latest = {} # supersede key -> token
+        self.lock = threading.Lock()
+        self.seq = itertools.count()
+        for lane, workers in {**LANES, **(lanes or {})}.items():
+            self.queues[lane] = PriorityQueue()
+            self.tokens[lane] = set()
+            for _ in range(max(1, workers)): threading.Thread(target=self._worker_loop, args=(lane,), daemon=True).start()
 
-    def _worker_loop(self):
+    def _worker_loop(self, lane):
+        queue = self.queues[lane]
         while True:
-            func, args = self.task_queue.get()
+            _, _, token, func, args = queue.get()
             try:
-                result = func(*args)
-                self.result_queue.put(result)
+                if token.superseded: result = {"type": "CANCELLED"} # Otherwise the task decides what a cancel means
+                else: result = run_with_token(token, func, args)
             except Exception as e:
-                self.result_queue.put({"type": "ERROR", "data": str(e)})
-            finally:
-                self.task_queue.task_done()
+                result = {"type": "ERROR", "data": str(e)}
+            with self.lock: self.tokens[lane].discard(token)
+            self.result_queue.put((token, result))
+
+    def add_task(self, func, args, background=False, lane="interactive", priority=NORMAL, supersede=None):
+        """Queues func(*args) on a lane and returns its CancelToken.
+
+        Background tasks run without the processing overlay so the UI stays usable.
+        """
+        token = CancelToken(supersede)
+        with self.lock:
+            if supersede is not None:
+                old = self.latest.get(supersede)
+                if old is not None: old.cancel(superseded=True)
+                self.latest[supersede] = token
+            self.tokens[lane].add(token)
+        if not background:
+            self.blocking.add(token)
+            state.is_processing = True
+        self.queues[lane].put((priority, next(self.seq), token, func, args))
+        return token
+
+    def cancel(self, lane):
+        """Cancels everything queued or running on a lane and releases the overlay it held.
 
-    def add_task(self, func, args):
-        state.is_processing = True
-        self.task_queue.put((func, args))
+        A project move/rename keeps the overlay (and its input guard) until PROJECT_MOVED
+        reopens the project, since the db is closed until then.
+        """
+        with self.lock: tokens = list(self.tokens[lane])
+        for token in tokens: token.cancel()
+        if state.processing_mode != "FILE": self._release(tokens)
+
+    def drain(self, lanes, timeout=30):
+        """Cancels the lanes and waits until none of their tasks is queued or running.
+
+        Tasks that ignore cancellation (saves, imports) still finish. Returns False on timeout.
+        """
+        for lane in lanes: self.cancel(lane)
+        deadline = time.monotonic() + timeout
+        while any(self.tokens[lane] for lane in lanes):
+            if time.monotonic() > deadline: return False
+            time.sleep(0.02)
+        return True
+
+    def _release(self, tokens):
+        self.blocking.difference_update(tokens)
+        if not self.blocking:
+            state.is_processing = False
+            state.processing_mode = "NORMAL"
 
     def process_results(self):
         while not self.result_queue.empty():
-            result = self.result_queue.get()
-            if result.get("type") == "CANCELLED": continue
+            token, result = self.result_queue.get()
+            if token.key is not None and self.latest.get(token.key) is token: del self.latest[token.key]
+            if token in self.blocking: self._release([token])
+            if token.superseded or result.get("type") == "CANCELLED": continue
             if result.get("type") == "ERROR":
                 state.status_msg = f"ERROR: {result['data']}"
-                state.is_processing = False
-                state.processing_mode = "NORMAL"
                 continue
+            if result.get("follow_up"): # (func, args, add_task options): a slow second step on another lane
+                func, args, options = result["follow_up"]
+                self.add_task(func, args, **options)
 
             msg_type = result.get("type")
             data = result.get("data")
-            state.is_processing = False
-            state.processing_mode = "NORMAL"
+            if msg_type == "PRUNE_COMPLETE":
+                if data['removed']:
+                    state.needs_tree_update = True
+                    state.status_msg = f"REMOVED {data['removed']} MISSING FILES FROM VAULT"
+                elif state.status_msg.startswith("CHECKING PROJECT FILES"): state.status_msg = "SYSTEM READY"
+                continue
+            if msg_type == "STATS_BACKFILL_PROGRESS":
+                state.unindexed_runs = max(0, state.unindexed_runs - data['indexed'] - data['failed'])
+                state.unreadable_runs += data['failed']
+                if state.unindexed_runs: state.status_msg = f"INDEXING COLUMN STATS: {state.unindexed_runs} RUNS LEFT"
+                else: state.status_msg = "COLUMN STATS INDEXED" + (f" ({state.unreadable_runs} UNREADABLE)" if state.unreadable_runs else "")
+                continue
+
+            if msg_type == "SEARCH_RESULTS":
+                if data['text'] != state.search_text: continue # Typed on since; a newer search is queued
+                state.search_results = data['results']
+                if data['predicate'] and state.unindexed_runs: state.status_msg = f"STAT SEARCH INCOMPLETE: {state.unindexed_runs} RUNS NOT INDEXED YET"
+                continue
+
+            if msg_type == "COMPARISON_READY":
+                if list(state.selected_ids) == data['ids']: state.current_analysis = data['analysis'] # Else the selection moved on
+                continue
 
             if msg_type == "LOAD_COMPLETE":
                 if 'plot_data' in data and data['plot_data'][0]:
@@ -304,6 +573,11 @@ class TaskQueue:
                 state.needs_tree_update = True
                 state.status_msg = data['status']
 
+            elif msg_type == "IMPORT_COMPLETE":
+                state.head_id = data['head_id']
+                state.needs_tree_update = True
+                state.status_msg = data['status']
+
             elif msg_type == "INCONSISTENCY_CHECK_COMPLETE":
                 state.inconsistency_data = data
                 state.inconsistent_nodes = data.get("inconsistent_node_ids", [])
@@ -324,14 +598,23 @@ class TaskQueue:
             elif msg_type == "EXPORT_COMPLETE":
                 state.status_msg = data
 
+            elif msg_type == "PROJECT_MOVED":
+                state.reopen_project_path = data['path'] # Main reopens the db and watcher there
+                state.status_msg = data['status']
+
             elif msg_type == "SAVE_COMPLETE":
                 if 'node_id' in data: state.redo_stack[data['node_id']] = [] 
-                state.status_msg = "VERSION SAVED."
+                state.editor_saving, state.editor_saved = False, True
+                state.status_msg = data['status']
                 if 'plot_data' in data and data['plot_data'][0]:
                     raw, size, ctx = data['plot_data']
                     state.current_plot = pygame.image.frombuffer(raw, size, "RGBA")
                     state.plot_context = ctx
 
+            elif msg_type == "SAVE_REFUSED":
+                state.editor_saving = False
+                state.status_msg = data
+
             elif msg_type == "UNDO_COMPLETE":
                 node_id = data['node_id']
                 if node_id not in state.redo_stack: state.redo_stack[node_id] = []
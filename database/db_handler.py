@@ -1,17 +1,40 @@
 # --- FILE: database/db_handler.py ---
 import sqlite3
 import json
+import re
 import threading
 import os
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
+from database.lineage import AncestryIndex
+from database.records import ExperimentRecord
 
 class DBHandler:
-    def __init__(self, db_path="research_vault.db"):
+    def __init__(self, db_path="research_vault.db", flush_interval_ms=250, cache_size=256):
         self.db_path = db_path
         self.lock = threading.Lock()
         self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.lineage = AncestryIndex()
+        self.lineage_ready = False
+        self.has_fts = True
+        self.record_cache = OrderedDict() # id -> ExperimentRecord, LRU; every write path drops its entries
+        self.cache_lock = threading.Lock() # Guards record_cache; never held across sqlite calls
+        self.cache_gen = 0 # Bumped by every invalidation
+        self.record_gen = {} # id -> cache_gen of its last invalidation
+        self.cleared_gen = 0 # cache_gen of the last full clear
+        self.cache_size = cache_size
         self.create_tables()
 
+        # Write-behind queue: small UI-driven updates are coalesced per row and
+        # committed together by a background flusher instead of one fsync each.
+        self.pending_lock = threading.Lock()
+        self.pending_writes = {} # key -> (sql, params); same key = same row/column, last write wins
+        self.flush_interval = flush_interval_ms / 1000
+        self._flush_stop = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+        self._flusher.start()
+
     def create_tables(self):
         self.conn.execute("CREATE TABLE IF NOT EXISTS node_history (node_id INTEGER, file_hash TEXT, timestamp DATETIME)")
         query = """
@@ -54,6 +77,194 @@ class DBHandler:
                 except sqlite3.Error:
                     pass
 
+            if "file_hash" not in columns:
+                try:
+                    self.conn.execute("ALTER TABLE experiments ADD COLUMN file_hash TEXT")
+                    self.conn.commit()
+                except sqlite3.Error:
+                    pass
+
+            # Why column stats couldn't be computed for the current file; cleared when it changes
+            if "stats_error" not in columns:
+                try:
+                    self.conn.execute("ALTER TABLE experiments ADD COLUMN stats_error TEXT")
+                    self.conn.commit()
+                except sqlite3.Error:
+                    pass
+
+            # Manual drag offsets on top of the computed tree layout
+            for col in ("offset_x", "offset_y"):
+                if col not in columns:
+                    try:
+                        self.conn.execute(f"ALTER TABLE experiments ADD COLUMN {col} REAL DEFAULT 0")
+                        self.conn.commit()
+                    except sqlite3.Error:
+                        pass
+
+            # Graph indexes + normalized linkage table
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_node_history_node ON node_history (node_id)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_experiments_parent ON experiments (parent_id)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_experiments_branch ON experiments (branch_name)")
+            self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS edges (
+                src INTEGER NOT NULL,
+                dst INTEGER NOT NULL,
+                kind TEXT NOT NULL DEFAULT 'link',
+                PRIMARY KEY (src, dst, kind)
+            )
+            """)
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_edges_dst ON edges (dst, src)")
+            self.migrate_linked_nodes()
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_experiments_hash ON experiments (file_hash)")
+            self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS column_stats (
+                version_hash TEXT NOT NULL,
+                column_name TEXT NOT NULL,
+                count INTEGER,
+                nulls INTEGER,
+                min REAL, max REAL, mean REAL, std REAL,
+                q25 REAL, q50 REAL, q75 REAL,
+                histogram TEXT,
+                PRIMARY KEY (version_hash, column_name)
+            )
+            """)
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_column_stats_column ON column_stats (column_name)")
+            self.create_change_log()
+            self.create_search_index()
+            self.conn.commit()
+
+    def create_change_log(self):
+        """Trigger-maintained change feed so the UI can patch the tree instead of reloading it."""
+        self.conn.execute("""
+        CREATE TABLE IF NOT EXISTS tree_changes (
+            rev INTEGER PRIMARY KEY AUTOINCREMENT,
+            entity TEXT NOT NULL,
+            src INTEGER NOT NULL,
+            dst INTEGER
+        )
+        """)
+        self.conn.executescript("""
+        CREATE TRIGGER IF NOT EXISTS trg_tree_node_insert AFTER INSERT ON experiments
+        BEGIN INSERT INTO tree_changes (entity, src) VALUES ('node', NEW.id); END;
+        CREATE TRIGGER IF NOT EXISTS trg_tree_node_update AFTER UPDATE OF name, parent_id, branch_name ON experiments
+        BEGIN INSERT INTO tree_changes (entity, src) VALUES ('node', NEW.id); END;
+        CREATE TRIGGER IF NOT EXISTS trg_tree_node_delete AFTER DELETE ON experiments
+        BEGIN INSERT INTO tree_changes (entity, src) VALUES ('node', OLD.id); END;
+        CREATE TRIGGER IF NOT EXISTS trg_tree_link_insert AFTER INSERT ON edges WHEN NEW.kind = 'link'
+        BEGIN INSERT INTO tree_changes (entity, src, dst) VALUES ('link', NEW.src, NEW.dst); END;
+        CREATE TRIGGER IF NOT EXISTS trg_tree_link_delete AFTER DELETE ON edges WHEN OLD.kind = 'link'
+        BEGIN INSERT INTO tree_changes (entity, src, dst) VALUES ('link', OLD.src, OLD.dst); END;
+        """)
+        # Readers always start from a full snapshot, so history from previous sessions is dead weight
+        self.conn.execute("DELETE FROM tree_changes WHERE rev < (SELECT MAX(rev) FROM tree_changes)")
+
+    def migrate_linked_nodes(self):
+        """Moves legacy JSON linked_nodes blobs into the edges table (idempotent)."""
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT id, linked_nodes FROM experiments WHERE linked_nodes IS NOT NULL")
+        rows = cursor.fetchall()
+        if not rows: return
+        pairs = []
+        for src, blob in rows:
+            try: targets = json.loads(blob) or []
+            except (TypeError, ValueError): targets = []
+            for tgt in targets:
+                try: pairs.append((src, int(tgt)))
+                except (TypeError, ValueError): pass
+        cursor.executemany("INSERT OR IGNORE INTO edges (src, dst, kind) VALUES (?, ?, 'link')", pairs)
+        cursor.execute("UPDATE experiments SET linked_nodes = NULL WHERE linked_nodes IS NOT NULL")
+
+    # Summary + anomaly text pulled out of analysis_json for the full-text index
+    FTS_ANALYSIS_SQL = """CASE WHEN json_valid({col}) THEN
+        COALESCE(json_extract({col}, '$.summary'), '') || ' ' ||
+        COALESCE((SELECT group_concat(value, ' ') FROM json_each({col}, '$.anomalies')), '')
+    ELSE '' END"""
+
+    def create_search_index(self):
+        """FTS5 index over names, notes, metadata and AI analyses, kept in sync by triggers."""
+        try:
+            old = self.conn.execute("SELECT sql FROM sqlite_master WHERE name = 'experiments_fts'").fetchone()
+            if old and "prefix" not in old[0]: self.conn.execute("DROP TABLE experiments_fts") # Rebuilt below with prefix indexes
+            self.conn.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS experiments_fts
+            USING fts5(name, notes, temperature, sample_id, analysis, tokenize = 'unicode61', prefix = '2 3')
+            """)
+        except sqlite3.OperationalError:
+            self.has_fts = False # SQLite built without FTS5: search falls back to LIKE
+            return
+
+        new_row = "NEW.id, NEW.name, NEW.notes, NEW.temperature, NEW.sample_id, " + self.FTS_ANALYSIS_SQL.format(col="NEW.analysis_json")
+        self.conn.executescript(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_fts_insert AFTER INSERT ON experiments
+        BEGIN
+            INSERT INTO experiments_fts (rowid, name, notes, temperature, sample_id, analysis) VALUES ({new_row});
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_fts_update AFTER UPDATE OF name, notes, temperature, sample_id, analysis_json ON experiments
+        BEGIN
+            DELETE FROM experiments_fts WHERE rowid = OLD.id;
+            INSERT INTO experiments_fts (rowid, name, notes, temperature, sample_id, analysis) VALUES ({new_row});
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_fts_delete AFTER DELETE ON experiments
+        BEGIN
+            DELETE FROM experiments_fts WHERE rowid = OLD.id;
+        END;
+        """)
+
+        # Backfill projects created before the index existed
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT (SELECT COUNT(*) FROM experiments), (SELECT COUNT(*) FROM experiments_fts)")
+        n_rows, n_indexed = cursor.fetchone()
+        if n_rows != n_indexed:
+            cursor.execute("DELETE FROM experiments_fts")
+            cursor.execute(f"""
+            INSERT INTO experiments_fts (rowid, name, notes, temperature, sample_id, analysis)
+            SELECT id, name, notes, temperature, sample_id, {self.FTS_ANALYSIS_SQL.format(col="analysis_json")} FROM experiments
+            """)
+
+    @staticmethod
+    def build_fts_query(text):
+        """Turns search-bar input into an FTS5 query.
+
+        "quoted words" stay phrases, a trailing * is a prefix match, and the last
+        bare word is treated as a prefix so results update while typing (from two
+        characters on; one-letter prefixes match most of the index).
+        """
+        tokens = re.findall(r'"[^"]*"?|\S+', text)
+        terms = []
+        for i, tok in enumerate(tokens):
+            if tok.startswith('"'):
+                phrase = tok.strip('"').strip()
+                if phrase: terms.append('"' + phrase.replace('"', '""') + '"')
+                continue
+            word = tok.rstrip("*").replace('"', '""')
+            is_prefix = tok.endswith("*") or (i == len(tokens) - 1 and len(word) >= 2)
+            if word: terms.append(f'"{word}"' + ("*" if is_prefix else ""))
+        return " ".join(terms)
+
+    def search_experiments(self, text, limit=20):
+        """Ranked full-text search. Returns (id, name, snippet) rows, best match first."""
+        query = self.build_fts_query(text)
+        if not query: return []
+        with self.lock:
+            cursor = self.conn.cursor()
+            try:
+                if self.has_fts:
+                    cursor.execute("""
+                    SELECT rowid, name, snippet(experiments_fts, -1, '[', ']', '..', 8)
+                    FROM experiments_fts WHERE experiments_fts MATCH ?
+                    ORDER BY bm25(experiments_fts, 10.0, 4.0, 2.0, 2.0, 1.0) LIMIT ?
+                    """, (query, limit))
+                else:
+                    like = f"%{text.strip()}%"
+                    cursor.execute("""
+                    SELECT id, name, COALESCE(notes, '') FROM experiments
+                    WHERE name LIKE ? OR notes LIKE ? OR temperature LIKE ? OR sample_id LIKE ? OR analysis_json LIKE ?
+                    ORDER BY id DESC LIMIT ?
+                    """, (like, like, like, like, like, limit))
+                return cursor.fetchall()
+            except sqlite3.OperationalError:
+                return []
+
     def get_id_by_path(self, path):
         with self.lock:
             cursor = self.conn.cursor()
@@ -81,55 +292,403 @@ class DBHandler:
                     branch
                 ))
                 self.conn.commit()
+                if self.lineage_ready: self.lineage.add(cursor.lastrowid, parent_id)
                 return cursor.lastrowid
             except sqlite3.IntegrityError:
                 cursor.execute("SELECT id FROM experiments WHERE file_path = ?", (file_path,))
                 res = cursor.fetchone()
                 return res[0] if res else None
 
+    def add_experiments_bulk(self, records, parent_id=None, branch="main", chain=True, chunk_size=500):
+        """Bulk ingest: one executemany + commit per chunk instead of one commit per file.
+
+        Each record is a dict with name, file_path, analysis and optionally file_hash,
+        parent_id and branch. With chain=True every record becomes the child of the
+        previous one, starting from parent_id. Paths already in the vault keep their
+        existing id. Returns the ids in input order. The lock is taken per chunk, so UI
+        reads (search, selection) run between chunks of a large import.
+        """
+        ids = []
+        prev_id = parent_id
+        chunk = []
+        for rec in records:
+            chunk.append(rec)
+            if len(chunk) >= chunk_size:
+                prev_id = self._insert_experiment_chunk(chunk, prev_id, parent_id, branch, chain, ids)
+                chunk = []
+        if chunk:
+            self._insert_experiment_chunk(chunk, prev_id, parent_id, branch, chain, ids)
+        return ids
+
+    def _insert_experiment_chunk(self, chunk, prev_id, parent_id, branch, chain, ids):
+        with self.lock:
+            cursor = self.conn.cursor()
+            paths = [rec["file_path"] for rec in chunk]
+            placeholders = ",".join("?" * len(paths))
+            cursor.execute(f"SELECT file_path, id FROM experiments WHERE file_path IN ({placeholders})", paths)
+            known = dict(cursor.fetchall())
+
+            # Ids are assigned up front so children in the same chunk can reference their parent
+            cursor.execute("SELECT MAX(COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'experiments'), 0), COALESCE((SELECT MAX(id) FROM experiments), 0))")
+            next_id = cursor.fetchone()[0] + 1
+
+            ts = datetime.now().strftime("%Y-%m-%d %H:%M")
+            rows, history = [], []
+            for rec in chunk:
+                exp_id = known.get(rec["file_path"])
+                if exp_id is None:
+                    exp_id = next_id
+                    next_id += 1
+                    known[rec["file_path"]] = exp_id
+                    parent = rec.get("parent_id", prev_id if chain else parent_id)
+                    rows.append((exp_id, ts, rec["name"], rec["file_path"], json.dumps(rec.get("analysis", {})), parent, rec.get("branch", branch), rec.get("file_hash")))
+                    if rec.get("file_hash"):
+                        history.append((exp_id, rec["file_hash"], datetime.now()))
+                ids.append(exp_id)
+                if chain: prev_id = exp_id
+
+            try:
+                cursor.executemany("""
+                INSERT OR IGNORE INTO experiments (id, timestamp, name, file_path, analysis_json, parent_id, branch_name, file_hash)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """, rows)
+                cursor.executemany("INSERT INTO node_history (node_id, file_hash, timestamp) VALUES (?, ?, ?)", history)
+                self.conn.commit()
+            except sqlite3.Error:
+                self.conn.rollback()
+                raise
+            if self.lineage_ready:
+                for row in rows: self.lineage.add(row[0], row[5])
+            return prev_id
+
     def get_tree_data(self):
-        """Returns hierarchical experiment relationships and additional links."""
+        """Returns hierarchical experiment relationships as (id, parent_id, branch, name) rows."""
         with self.lock:
             cursor = self.conn.cursor()
-            cursor.execute("SELECT id, parent_id, branch_name, name, linked_nodes FROM experiments ORDER BY id ASC")
+            cursor.execute("SELECT id, parent_id, branch_name, name FROM experiments ORDER BY id ASC")
             return cursor.fetchall()
 
-    def get_experiment_by_id(self, exp_id):
+    def get_links(self, kind="link"):
+        """Returns custom linkages as (src, dst) pairs."""
         with self.lock:
             cursor = self.conn.cursor()
-            cursor.execute("SELECT * FROM experiments WHERE id = ?", (exp_id,))
-            return cursor.fetchone()
+            cursor.execute("SELECT src, dst FROM edges WHERE kind = ? ORDER BY src, dst", (kind,))
+            links = cursor.fetchall()
+            pending = [pair for pair in self._pending_links(kind) if pair not in set(links)]
+            return sorted(links + pending) if pending else links
 
-    def update_metadata(self, exp_id, notes):
-        query = "UPDATE experiments SET notes = ? WHERE id = ?"
+    def get_linked_nodes(self, node_id, kind="link"):
+        """Returns the ids a node links to (index lookup on the edges primary key)."""
         with self.lock:
             cursor = self.conn.cursor()
-            cursor.execute(query, (notes, exp_id))
-            self.conn.commit()
+            cursor.execute("SELECT dst FROM edges WHERE src = ? AND kind = ?", (node_id, kind))
+            targets = [r[0] for r in cursor.fetchall()]
+            targets += [dst for src, dst in self._pending_links(kind) if src == node_id and dst not in targets]
+            return targets
+
+    def get_children(self, node_id):
+        with self.lock:
+            cursor = self.conn.cursor()
+            cursor.execute("SELECT id FROM experiments WHERE parent_id = ? ORDER BY id ASC", (node_id,))
+            return [r[0] for r in cursor.fetchall()]
+
+    def get_tree_snapshot(self):
+        """Returns (rows, links, revision) read atomically, for VersionTree.update_tree."""
+        self.flush() # Rows carry the drag offsets, which may still be queued
+        with self.lock:
+            cursor = self.conn.cursor()
+            cursor.execute("SELECT COALESCE(MAX(rev), 0) FROM tree_changes")
+            rev = cursor.fetchone()[0]
+            cursor.execute("SELECT id, parent_id, branch_name, name, offset_x, offset_y FROM experiments ORDER BY id ASC")
+            rows = cursor.fetchall()
+            cursor.execute("SELECT src, dst FROM edges WHERE kind = 'link' ORDER BY src, dst")
+            links = cursor.fetchall()
+            links += [pair for pair in self._pending_links() if pair not in set(links)]
+            return rows, links, rev
+
+    def get_tree_changes(self, since_rev):
+        """Returns only what changed in the tree after since_rev.
+
+        Result: {"rev", "nodes": current rows of new/changed nodes, "deleted": ids,
+        "links_added": pairs, "links_removed": pairs}.
+        """
+        with self.lock:
+            cursor = self.conn.cursor()
+            cursor.execute("SELECT COALESCE(MAX(rev), ?) FROM tree_changes", (since_rev,))
+            rev = cursor.fetchone()[0]
+            cursor.execute("SELECT DISTINCT src FROM tree_changes WHERE entity = 'node' AND rev > ? AND rev <= ?", (since_rev, rev))
+            touched = {r[0] for r in cursor.fetchall()}
+            cursor.execute("""
+            SELECT id, parent_id, branch_name, name, offset_x, offset_y FROM experiments
+            WHERE id IN (SELECT src FROM tree_changes WHERE entity = 'node' AND rev > ? AND rev <= ?)
+            ORDER BY id ASC
+            """, (since_rev, rev))
+            nodes = cursor.fetchall()
+
+            cursor.execute("""
+            SELECT DISTINCT c.src, c.dst, e.src IS NOT NULL FROM tree_changes c
+            LEFT JOIN edges e ON e.src = c.src AND e.dst = c.dst AND e.kind = 'link'
+            WHERE c.entity = 'link' AND c.rev > ? AND c.rev <= ?
+            """, (since_rev, rev))
+            links = cursor.fetchall()
+            pending = self._pending_links() # Re-reported once flushed; VersionTree ignores duplicates
+
+        return {
+            "rev": rev,
+            "nodes": nodes,
+            "deleted": sorted(touched - {r[0] for r in nodes}),
+            "links_added": [(src, dst) for src, dst, alive in links if alive] + pending,
+            "links_removed": [(src, dst) for src, dst, alive in links if not alive]
+        }
+
+    # --- LINEAGE (recursive CTEs) ---
+    ANCESTORS_CTE = """
+    WITH RECURSIVE anc(id, parent_id, depth) AS (
+        SELECT id, parent_id, 0 FROM experiments WHERE id = ?
+        UNION ALL
+        SELECT e.id, e.parent_id, anc.depth + 1 FROM experiments e JOIN anc ON e.id = anc.parent_id
+    )
+    """
+    DESCENDANTS_CTE = """
+    WITH RECURSIVE sub(id, depth) AS (
+        SELECT id, 0 FROM experiments WHERE id = ?
+        UNION ALL
+        SELECT e.id, sub.depth + 1 FROM experiments e JOIN sub ON e.parent_id = sub.id
+    )
+    """
+
+    def get_ancestors(self, node_id):
+        """Returns ancestor ids, nearest parent first."""
+        with self.lock:
+            cursor = self.conn.cursor()
+            cursor.execute(self.ANCESTORS_CTE + "SELECT id FROM anc WHERE depth > 0 ORDER BY depth", (node_id,))
+            return [r[0] for r in cursor.fetchall()]
+
+    def get_descendants(self, node_id):
+        """Returns descendant ids in breadth-first order."""
+        with self.lock:
+            cursor = self.conn.cursor()
+            cursor.execute(self.DESCENDANTS_CTE + "SELECT id FROM sub WHERE depth > 0 ORDER BY depth, id", (node_id,))
+            return [r[0] for r in cursor.fetchall()]
+
+    def get_subtree_size(self, node_id):
+        """Number of nodes in the subtree rooted at node_id (including itself)."""
+        with self.lock:
+            cursor = self.conn.cursor()
+            cursor.execute(self.DESCENDANTS_CTE + "SELECT COUNT(*) FROM sub", (node_id,))
+            return cursor.fetchone()[0]
+
+    def get_common_ancestor(self, id_a, id_b):
+        """Lowest common ancestor via SQL; a node counts as its own ancestor."""
+        query = """
+        WITH RECURSIVE anc_a(id, parent_id, depth) AS (
+            SELECT id, parent_id, 0 FROM experiments WHERE id = ?
+            UNION ALL
+            SELECT e.id, e.parent_id, anc_a.depth + 1 FROM experiments e JOIN anc_a ON e.id = anc_a.parent_id
+        ), anc_b(id, parent_id) AS (
+            SELECT id, parent_id FROM experiments WHERE id = ?
+            UNION ALL
+            SELECT e.id, e.parent_id FROM experiments e JOIN anc_b ON e.id = anc_b.parent_id
+        )
+        SELECT anc_a.id FROM anc_a JOIN anc_b ON anc_a.id = anc_b.id ORDER BY anc_a.depth LIMIT 1
+        """
+        with self.lock:
+            cursor = self.conn.cursor()
+            cursor.execute(query, (id_a, id_b))
+            res = cursor.fetchone()
+            return res[0] if res else None
+
+    def _ensure_lineage(self):
+        if self.lineage_ready: return
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT id, parent_id FROM experiments ORDER BY id ASC")
+        self.lineage.build(cursor.fetchall())
+        self.lineage_ready = True
+
+    def lca(self, id_a, id_b):
+        """Lowest common ancestor from the in-memory ancestry index (O(log n))."""
+        with self.lock:
+            self._ensure_lineage()
+            return self.lineage.lca(id_a, id_b)
+
+    def is_ancestor(self, ancestor_id, node_id):
+        with self.lock:
+            self._ensure_lineage()
+            return self.lineage.is_ancestor(ancestor_id, node_id)
+
+    def get_experiment_by_id(self, exp_id):
+        with self.cache_lock:
+            record = self.record_cache.get(exp_id)
+            if record:
+                self.record_cache.move_to_end(exp_id)
+                return record
+            started = self.cache_gen
+        with self.lock:
+            row = self.conn.execute(ExperimentRecord.select_sql() + " WHERE id = ?", (exp_id,)).fetchone()
+            if not row: return None
+            record = ExperimentRecord(*row)
+            pending = self._pending_columns(exp_id)
+            if pending: record = record.replace(**pending)
+        with self.cache_lock:
+            # A write queued while we read may not be in this row; only cache if none was
+            if self.record_gen.get(exp_id, 0) <= started and self.cleared_gen <= started:
+                self.record_cache[exp_id] = record
+                if len(self.record_cache) > self.cache_size: self.record_cache.popitem(last=False)
+        return record
+
+    def invalidate_records(self, *exp_ids):
+        """Drops cached records; with no ids the whole cache is cleared."""
+        with self.cache_lock:
+            self.cache_gen += 1
+            if not exp_ids:
+                self.record_cache.clear()
+                self.cleared_gen = self.cache_gen
+            for exp_id in exp_ids:
+                self.record_cache.pop(exp_id, None)
+                self.record_gen[exp_id] = self.cache_gen
+
+    def update_metadata(self, exp_id, notes):
+        self._queue_write(("experiments", exp_id, "notes"), "UPDATE experiments SET notes = ? WHERE id = ?", (notes, exp_id))
 
     def update_plot_settings(self, exp_id, x_col, y_col):
         settings = json.dumps({"x": x_col, "y": y_col})
+        self._queue_write(("experiments", exp_id, "plot_settings"), "UPDATE experiments SET plot_settings = ? WHERE id = ?", (settings, exp_id))
+            
+    def update_node_offset(self, exp_id, dx, dy):
+        """Stores a node's manual drag offset. Not a tree change, so it never reaches the change feed."""
+        self._queue_write(("experiments", exp_id, "offset_x"), "UPDATE experiments SET offset_x = ? WHERE id = ?", (dx, exp_id))
+        self._queue_write(("experiments", exp_id, "offset_y"), "UPDATE experiments SET offset_y = ? WHERE id = ?", (dy, exp_id))
+
+    def add_linkage(self, source_id, target_id, kind="link"):
+        """Adds a custom visual linkage connection between nodes."""
+        self._queue_write(("edges", source_id, target_id, kind), "INSERT OR IGNORE INTO edges (src, dst, kind) VALUES (?, ?, ?)", (source_id, target_id, kind))
+
+    # --- WRITE-BEHIND QUEUE ---
+    def _queue_write(self, key, sql, params):
+        with self.pending_lock:
+            self.pending_writes[key] = (sql, params)
+        if key[0] == "experiments": self.invalidate_records(key[1]) # Bumps its generation so an in-flight read won't cache the old row
+
+    def _flush_loop(self):
+        while not self._flush_stop.wait(self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        """Commits every queued write in a single transaction."""
+        with self.lock:
+            with self.pending_lock:
+                if not self.pending_writes: return
+                keys = list(self.pending_writes)
+                batch = list(self.pending_writes.values())
+                self.pending_writes = {}
+            try:
+                for sql, params in batch:
+                    self.conn.execute(sql, params)
+                self.conn.commit()
+            except sqlite3.Error as e:
+                self.conn.rollback()
+                print(f"Write-behind flush failed, retrying {len(keys)} writes: {e}")
+                with self.pending_lock: # Re-queue unless a newer value for the same key arrived meanwhile
+                    for key, write in zip(keys, batch): self.pending_writes.setdefault(key, write)
+            written = {key[1] for key in keys if key[0] == "experiments"}
+            if written: self.invalidate_records(*written) # Also covers a record cached from a read that raced the queueing
+
+    def _pending_columns(self, exp_id):
+        """Queued column values for one experiment, so reads see writes that are not flushed yet."""
+        with self.pending_lock:
+            return {key[2]: params[0] for key, (sql, params) in self.pending_writes.items()
+                    if key[0] == "experiments" and key[1] == exp_id}
+
+    def _pending_links(self, kind="link"):
+        with self.pending_lock:
+            return [(key[1], key[2]) for key in self.pending_writes if key[0] == "edges" and key[3] == kind]
+
+    # --- PER-VERSION COLUMN STATISTICS ---
+    STAT_FIELDS = {"count": "count", "nulls": "nulls", "min": "min", "max": "max", "mean": "mean", "std": "std",
+                   "q25": "q25", "q50": "q50", "median": "q50", "q75": "q75"}
+    STAT_OPS = (">=", "<=", "!=", ">", "<", "=")
+    STAT_PREDICATE = re.compile(r"^\s*(\w+)\s*\(\s*(.+?)\s*\)\s*(>=|<=|!=|>|<|=)\s*(-?\d+(?:\.\d*)?(?:[eE]-?\d+)?)\s*$")
+
+    def set_file_hash(self, exp_id, file_hash):
+        """Points an experiment at the data version its file currently holds."""
+        with self.lock:
+            self.conn.execute("UPDATE experiments SET file_hash = ?, stats_error = NULL WHERE id = ?", (file_hash, exp_id))
+            self.conn.commit()
+            self.invalidate_records(exp_id)
+
+    def update_analysis(self, exp_id, analysis_dict):
+        with self.lock:
+            self.conn.execute("UPDATE experiments SET analysis_json = ? WHERE id = ?", (json.dumps(analysis_dict), exp_id))
+            self.conn.commit()
+            self.invalidate_records(exp_id)
+
+    def has_column_stats(self, version_hash):
         with self.lock:
             cursor = self.conn.cursor()
-            cursor.execute("UPDATE experiments SET plot_settings = ? WHERE id = ?", (settings, exp_id))
+            cursor.execute("SELECT 1 FROM column_stats WHERE version_hash = ? LIMIT 1", (version_hash,))
+            return cursor.fetchone() is not None
+
+    def save_column_stats(self, entries):
+        """Stores stats for one or more versions: entries is an iterable of (version_hash, stats_list)."""
+        rows = []
+        for version_hash, stats in entries:
+            for st in stats:
+                hist = json.dumps(st["histogram"]) if st.get("histogram") else None
+                rows.append((version_hash, st["column"], st.get("count"), st.get("nulls"), st.get("min"), st.get("max"),
+                             st.get("mean"), st.get("std"), st.get("q25"), st.get("q50"), st.get("q75"), hist))
+        with self.lock:
+            self.conn.executemany("INSERT OR REPLACE INTO column_stats VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
             self.conn.commit()
-            
-    def add_linkage(self, source_id, target_id):
-        """Adds a custom visual linkage connection between nodes."""
+
+    def get_column_stats(self, version_hash):
         with self.lock:
             cursor = self.conn.cursor()
-            cursor.execute("SELECT linked_nodes FROM experiments WHERE id = ?", (source_id,))
-            res = cursor.fetchone()
-            links = []
-            if res and res[0]:
-                try: links = json.loads(res[0])
-                except: pass
-            if target_id not in links:
-                links.append(target_id)
-            cursor.execute("UPDATE experiments SET linked_nodes = ? WHERE id = ?", (json.dumps(links), source_id))
+            cursor.execute("SELECT * FROM column_stats WHERE version_hash = ? ORDER BY rowid", (version_hash,))
+            names = [d[0] for d in cursor.description]
+            return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+    @classmethod
+    def parse_stat_predicate(cls, text):
+        """Parses 'max(temp) > 80' into (stat, column, op, value); None if text is not a predicate."""
+        match = cls.STAT_PREDICATE.match(text)
+        if not match or match.group(1).lower() not in cls.STAT_FIELDS: return None
+        return match.group(1).lower(), match.group(2), match.group(3), float(match.group(4))
+
+    def query_column_stats(self, stat, column, op, value, limit=50):
+        """Experiments whose current data has a column (substring match) satisfying stat <op> value.
+
+        Answered from column_stats alone. Returns (id, name, description) rows.
+        """
+        field = self.STAT_FIELDS.get(stat)
+        if not field or op not in self.STAT_OPS: return []
+        query = f"""
+        SELECT e.id, e.name, s.column_name, s.{field} FROM column_stats s
+        JOIN experiments e ON e.file_hash = s.version_hash
+        WHERE s.column_name LIKE ? AND s.{field} {op} ?
+        ORDER BY s.{field} DESC LIMIT ?
+        """
+        with self.lock:
+            cursor = self.conn.cursor()
+            cursor.execute(query, (f"%{column}%", value, limit))
+            return [(exp_id, name, f"{stat}({col}) = {val:.4g}") for exp_id, name, col, val in cursor.fetchall()]
+
+    UNINDEXED_SQL = """FROM experiments e WHERE e.stats_error IS NULL
+        AND (e.file_hash IS NULL OR NOT EXISTS (SELECT 1 FROM column_stats s WHERE s.version_hash = e.file_hash))"""
+
+    def get_unindexed_experiments(self):
+        """(id, file_path) of experiments with no column stats for their data, e.g. runs added before stats
+        existed. Runs whose stats already failed are left out until their file changes."""
+        with self.lock:
+            return self.conn.execute(f"SELECT e.id, e.file_path {self.UNINDEXED_SQL} ORDER BY e.id").fetchall()
+
+    def mark_stats_failed(self, exp_id, reason):
+        with self.lock:
+            self.conn.execute("UPDATE experiments SET stats_error = ? WHERE id = ?", (reason, exp_id))
             self.conn.commit()
 
     def close(self):
+        self._flush_stop.set()
+        self.flush()
         try:
             with self.lock:
                 self.conn.close()
@@ -159,16 +718,44 @@ class DBHandler:
             cursor.execute(query, (node_id,))
             self.conn.commit()
             
-    def prune_missing_files(self):
+    @staticmethod
+    def _missing_in_directory(directory, paths):
+        """One directory listing instead of one stat per file; names not listed are double-checked."""
+        try:
+            with os.scandir(directory or ".") as it: present = {entry.name for entry in it}
+        except (FileNotFoundError, NotADirectoryError): return list(paths)
+        except OSError: return [p for p in paths if not os.path.exists(p)]
+        return [p for p in paths if os.path.basename(p) not in present and not os.path.exists(p)]
+
+    def prune_missing_files(self, progress=None, max_workers=8):
+        """Removes experiments whose file is gone. Directories are checked in parallel
+        outside the DB lock; progress(done, total) is called per directory."""
         with self.lock:
-            cursor = self.conn.cursor()
-            cursor.execute("SELECT id, file_path FROM experiments")
-            rows = cursor.fetchall()
-            removed = False
-            for exp_id, file_path in rows:
-                if file_path and not os.path.exists(file_path):
-                    cursor.execute("DELETE FROM experiments WHERE id = ?", (exp_id,))
-                    removed = True
-            if removed:
+            rows = self.conn.execute("SELECT id, file_path FROM experiments WHERE file_path IS NOT NULL AND file_path != ''").fetchall()
+        by_dir = defaultdict(list)
+        ids_by_path = {}
+        for exp_id, file_path in rows:
+            by_dir[os.path.dirname(file_path)].append(file_path)
+            ids_by_path[file_path] = exp_id
+
+        missing = []
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = [pool.submit(self._missing_in_directory, d, paths) for d, paths in by_dir.items()]
+            for done, future in enumerate(as_completed(futures), 1):
+                missing.extend(ids_by_path[p] for p in future.result())
+                if progress: progress(done, len(futures))
+        if not missing: return 0
+
+        params = [(exp_id,) for exp_id in missing]
+        with self.lock:
+            try:
+                self.conn.executemany("DELETE FROM experiments WHERE id = ?", params)
+                self.conn.executemany("DELETE FROM edges WHERE src = ?", params)
+                self.conn.executemany("DELETE FROM edges WHERE dst = ?", params)
                 self.conn.commit()
-            return removed
\ No newline at end of file
+            except sqlite3.Error:
+                self.conn.rollback()
+                raise
+            self.lineage_ready = False
+            self.invalidate_records()
+        return len(missing)
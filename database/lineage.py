@@ -0,0 +1,57 @@
+# --- FILE: database/lineage.py ---
+class AncestryIndex:
+    """Binary-lifting table over the experiment tree.
+
+    up[n][k] is the 2^k-th ancestor of n, so LCA and is-ancestor take O(log n).
+    Nodes must be added parent-first, which autoincrement ids already guarantee.
+    """
+    def __init__(self):
+        self.depth = {}
+        self.up = {}
+
+    def build(self, rows):
+        self.depth = {}
+        self.up = {}
+        for node_id, parent_id in rows:
+            self.add(node_id, parent_id)
+
+    def add(self, node_id, parent_id):
+        if parent_id is None or parent_id not in self.depth:
+            self.depth[node_id] = 0
+            self.up[node_id] = []
+            return
+        self.depth[node_id] = self.depth[parent_id] + 1
+        jumps = [parent_id]
+        k = 0
+        while k < len(self.up[jumps[k]]):
+            jumps.append(self.up[jumps[k]][k])
+            k += 1
+        self.up[node_id] = jumps
+
+    def __contains__(self, node_id):
+        return node_id in self.depth
+
+    def lift(self, node_id, steps):
+        k = 0
+        while steps and node_id is not None:
+            if steps & 1:
+                jumps = self.up[node_id]
+                node_id = jumps[k] if k < len(jumps) else None
+            steps >>= 1
+            k += 1
+        return node_id
+
+    def is_ancestor(self, ancestor_id, node_id):
+        if ancestor_id not in self.depth or node_id not in self.depth: return False
+        diff = self.depth[node_id] - self.depth[ancestor_id]
+        return diff >= 0 and self.lift(node_id, diff) == ancestor_id
+
+    def lca(self, a, b):
+        if a not in self.depth or b not in self.depth: return None
+        if self.depth[a] < self.depth[b]: a, b = b, a
+        a = self.lift(a, self.depth[a] - self.depth[b])
+        if a == b: return a
+        for k in range(len(self.up[a]) - 1, -1, -1):
+            if k < len(self.up[a]) and k < len(self.up[b]) and self.up[a][k] != self.up[b][k]:
+                a, b = self.up[a][k], self.up[b][k]
+        return self.up[a][0] if self.up[a] and self.up[b] and self.up[a][0] == self.up[b][0] else None
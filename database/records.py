@@ -0,0 +1,32 @@
+# --- FILE: database/records.py ---
+import json
+
+class ExperimentRecord:
+    """One row of the experiments table with named fields instead of positional indexes."""
+    COLUMNS = ("id", "timestamp", "name", "file_path", "analysis_json", "parent_id", "branch_name",
+               "researcher_name", "notes", "temperature", "sample_id", "plot_settings", "file_hash")
+    __slots__ = COLUMNS
+
+    def __init__(self, *values):
+        for field, value in zip(self.COLUMNS, values):
+            setattr(self, field, value)
+
+    @classmethod
+    def select_sql(cls):
+        return f"SELECT {', '.join(cls.COLUMNS)} FROM experiments"
+
+    def replace(self, **changes):
+        return ExperimentRecord(*(changes.get(f, getattr(self, f)) for f in self.COLUMNS))
+
+    @property
+    def analysis(self):
+        try: return json.loads(self.analysis_json) if self.analysis_json else {}
+        except (TypeError, ValueError): return {}
+
+    @property
+    def saved_plot_settings(self):
+        try: return json.loads(self.plot_settings) if self.plot_settings else None
+        except (TypeError, ValueError): return None
+
+    def __repr__(self):
+        return f"ExperimentRecord(id={self.id}, name={self.name!r}, branch={self.branch_name!r})"
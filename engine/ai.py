@@ -6,7 +6,7 @@ from pydantic import BaseModel, field_validator
 from typing import List, Any
 from openai import AzureOpenAI
 from dotenv import load_dotenv
-from state_manager import state
+from core.tasks import current_token
 
 load_dotenv()
 
@@ -95,8 +95,7 @@ class ScienceAI:
                 ai_generated=False
             )
         
-        if state.stop_ai_requested:
-            state.stop_ai_requested = False
+        if current_token().cancelled:
             return self._local_analysis(df)
         
         if self.client:
@@ -4,6 +4,7 @@ from matplotlib.figure import Figure
 from matplotlib.backends.backend_agg import FigureCanvasAgg
 import seaborn as sns
 import pandas as pd
+import numpy as np
 import re
 from settings import UITheme
 
@@ -15,6 +16,96 @@ def mpl_color(c):
         return tuple(float(x) for x in c)
     return c
 
+def compute_column_stats(df, bins=10):
+    """Per-column summary statistics for one data version (vectorized across columns).
+
+    Returns a list of dicts with column, count, nulls, min/max/mean/std, q25/q50/q75
+    and a small histogram ({"edges": [...], "counts": [...]}) for numeric columns.
+    """
+    counts = df.count()
+    nulls = df.isna().sum()
+    numeric = df.select_dtypes(include=['number'])
+    if not numeric.empty:
+        moments = numeric.agg(['min', 'max', 'mean', 'std']).T
+        quants = numeric.quantile([0.25, 0.5, 0.75]).T
+
+    def num(v):
+        return None if pd.isna(v) else float(v)
+
+    stats = []
+    for col in df.columns:
+        entry = {"column": str(col), "count": int(counts[col]), "nulls": int(nulls[col])}
+        if col in numeric.columns:
+            entry.update({
+                "min": num(moments.at[col, 'min']), "max": num(moments.at[col, 'max']),
+                "mean": num(moments.at[col, 'mean']), "std": num(moments.at[col, 'std']),
+                "q25": num(quants.at[col, 0.25]), "q50": num(quants.at[col, 0.5]), "q75": num(quants.at[col, 0.75])
+            })
+            values = numeric[col].to_numpy(dtype=float)
+            values = values[np.isfinite(values)]
+            if values.size:
+                hist, edges = np.histogram(values, bins=bins)
+                entry["histogram"] = {"edges": edges.tolist(), "counts": hist.tolist()}
+        stats.append(entry)
+    return stats
+
+def compute_column_stats_chunked(file_path, chunksize=200_000, sample=100_000, bins=10, seed=0):
+    """compute_column_stats for a CSV too large to load, reading it chunksize rows at a time.
+
+    count, nulls, min/max/mean/std are exact (chunk moments merged with Chan's formula).
+    Quartiles and the histogram come from a uniform sample of up to `sample` finite values
+    per column (bottom-k random keys), so they are exact only for columns that fit in it.
+    A column counts as numeric only if pandas parsed it as numeric in every chunk.
+    """
+    rng = np.random.default_rng(seed)
+    cols = {} # column -> running aggregates
+    order = []
+    for chunk in pd.read_csv(file_path, chunksize=chunksize):
+        numeric = set(chunk.select_dtypes(include=['number']).columns)
+        for col in chunk.columns:
+            agg = cols.get(col)
+            if agg is None:
+                agg = cols[col] = {"count": 0, "nulls": 0, "numeric": True, "n": 0, "mean": 0.0, "m2": 0.0,
+                                   "min": np.inf, "max": -np.inf, "keys": np.empty(0), "values": np.empty(0)}
+                order.append(col)
+            series = chunk[col]
+            agg["count"] += int(series.count())
+            agg["nulls"] += int(series.isna().sum())
+            if col not in numeric: agg["numeric"] = False
+            if not agg["numeric"]: continue
+            values = series.to_numpy(dtype=float)
+            values = values[np.isfinite(values)]
+            if not values.size: continue
+            n, mean = values.size, float(values.mean())
+            m2 = float(((values - mean) ** 2).sum())
+            total = agg["n"] + n
+            delta = mean - agg["mean"]
+            agg["m2"] += m2 + delta * delta * agg["n"] * n / total
+            agg["mean"] += delta * n / total
+            agg["n"] = total
+            agg["min"], agg["max"] = min(agg["min"], float(values.min())), max(agg["max"], float(values.max()))
+            keys = np.concatenate([agg["keys"], rng.random(n)])
+            kept = np.concatenate([agg["values"], values])
+            if keys.size > sample:
+                pick = np.argpartition(keys, sample)[:sample]
+                keys, kept = keys[pick], kept[pick]
+            agg["keys"], agg["values"] = keys, kept
+
+    stats = []
+    for col in order:
+        agg = cols[col]
+        entry = {"column": str(col), "count": agg["count"], "nulls": agg["nulls"]}
+        if agg["numeric"] and agg["n"]:
+            q25, q50, q75 = np.quantile(agg["values"], [0.25, 0.5, 0.75])
+            entry.update({"min": agg["min"], "max": agg["max"], "mean": agg["mean"],
+                          "std": float(np.sqrt(agg["m2"] / (agg["n"] - 1))) if agg["n"] > 1 else None,
+                          "q25": float(q25), "q50": float(q50), "q75": float(q75)})
+            hist, edges = np.histogram(agg["values"], bins=bins, range=(agg["min"], agg["max"]))
+            scale = agg["n"] / agg["values"].size
+            entry["histogram"] = {"edges": edges.tolist(), "counts": np.rint(hist * scale).astype(int).tolist()}
+        stats.append(entry)
+    return stats
+
 # --- HEADER SCANNER ---
 class HeaderScanner:
     @staticmethod
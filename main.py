@@ -4,7 +4,6 @@ import os
 import sys
 import shutil
 import pathlib
-import pandas as pd
 import tkinter as tk
 from tkinter import filedialog, simpledialog
 from queue import Queue
@@ -13,13 +12,20 @@ from queue import Queue
 from state_manager import state
 from database.db_handler import DBHandler
 from ui.elements import VersionTree
-from ui.layout import layout
+from ui.tree_layout import LAYOUT_ENGINES, TidyLayout
+from ui.layout import layout, SEARCH_RESULT_ROWS
 from ui.screens import RenderEngine
+from ui.text_cache import text_cache
+from ui.frame_scheduler import frame_scheduler
 from core.watcher import start_watcher
 from engine.ai import ScienceAI
-from core.processor import export_to_report, export_tree_to_pdf
-from core.workers import TaskQueue, WorkerController
+from core.processor import export_to_report
+from core.workers import TaskQueue, WorkerController, worker_move_project, worker_print_map
+from core.tasks import HIGH, LOW
 from core.hashing import save_to_vault, get_file_hash
+from core.config import cfg
+from core.csv_table import PagedCsv
+from core.stall_monitor import stall_monitor
 from ui.axis_and_settings import AxisSelector, SettingsMenu 
 
 # --- INIT ---
@@ -40,9 +46,10 @@ clock = pygame.time.Clock()
 # --- OBJECTS ---
 db = None 
 ai_engine = ScienceAI()
-tree_ui = VersionTree()
+tree_ui = VersionTree(LAYOUT_ENGINES.get(cfg.data.get("tree_layout"), TidyLayout)())
+tree_ui.on_node_moved = lambda node: db and db.update_node_offset(node["id"], node["manual_offset"].x, node["manual_offset"].y)
 event_queue = Queue()
-task_manager = TaskQueue()
+task_manager = TaskQueue(cfg.data.get("worker_lanes"))
 render_engine = RenderEngine(screen)
 worker_ctrl = None 
 watcher = None
@@ -66,8 +73,22 @@ def load_database_safe(path):
         try: db.close()
         except: pass
     db = DBHandler(path)
-    if db.prune_missing_files(): print("Database pruned of missing files.")
     worker_ctrl = WorkerController(db, ai_engine) 
+    task_manager.add_task(worker_ctrl.worker_prune_missing, [], background=True, lane="ingest", priority=LOW)
+    queue_stats_backfill()
+
+STATS_BACKFILL_BATCH = 16 # Runs per backfill task; ingest work queued meanwhile runs between batches
+
+def queue_stats_backfill():
+    """Queues column-stat indexing for runs that predate it, a few runs per task."""
+    missing = db.get_unindexed_experiments()
+    state.unindexed_runs, state.unreadable_runs = len(missing), 0
+    for i in range(0, len(missing), STATS_BACKFILL_BATCH):
+        task_manager.add_task(worker_ctrl.worker_backfill_column_stats, [missing[i:i + STATS_BACKFILL_BATCH]], background=True, lane="ingest", priority=LOW)
+
+def load_selection(exp_ids, *plot_args):
+    """Plot loads run without the overlay; a newer selection supersedes a load still in flight."""
+    task_manager.add_task(worker_ctrl.worker_load_experiment, [exp_ids, *plot_args], background=True, priority=HIGH, supersede="load")
 
 def clear_pycache():
     root_path = pathlib.Path(".")
@@ -77,16 +98,41 @@ def clear_pycache():
         except Exception as e: print(f"Failed to delete {p}: {e}")
     print(f"Cleared {count} __pycache__ folders.")
 
+def commit_editor_cell():
+    """Stores the input buffer as an edit of the selected cell, if it changed."""
+    if not state.editor_selected_cell or state.editor_table is None: return
+    r, c = state.editor_selected_cell
+    if not state.editor_table.set_cell(r, c, state.editor_input_buffer): # Logged only if the value changed
+        state.status_msg = f"EDIT NOT APPLIED: ROW {r + 1} IS NOT LOADED YET"
+
+def select_editor_cell(r, c):
+    state.editor_selected_cell = (r, c)
+    state.editor_input_buffer = state.editor_table.cell(r, c, wait=True) or ""
+    if r < state.editor_scroll_y: state.editor_scroll_y = r
+    if r >= state.editor_scroll_y + 15: state.editor_scroll_y = r - 14
+    if c < state.editor_scroll_x: state.editor_scroll_x = c
+    if c >= state.editor_scroll_x + 12: state.editor_scroll_x = c - 11
+
+def close_editor():
+    if state.editor_table: state.editor_table.close()
+    state.editor_table = None
+    state.editor_selected_cell = None
+
 def save_editor_changes():
     if not state.selected_ids: return
-    if state.editor_selected_cell:
-        r, c = state.editor_selected_cell
-        try: val = float(state.editor_input_buffer); state.editor_df.iloc[r, c] = val
-        except ValueError: state.editor_df.iloc[r, c] = state.editor_input_buffer
-        state.editor_selected_cell = None
+    commit_editor_cell()
+    state.editor_selected_cell = None
+    patch = state.editor_table.edits.patch()
+    if not patch:
+        state.status_msg = "NO CHANGES TO SAVE"
+        return
+    if state.editor_table.multiline:
+        state.status_msg = "CANNOT SAVE: FILE HAS MULTI-LINE QUOTED FIELDS"
+        return
     state.status_msg = "SAVING & VERSIONING..."
     state.processing_mode = "LOCAL"
-    task_manager.add_task(worker_ctrl.worker_save_editor_changes, [state.selected_ids[0], state.editor_file_path, state.editor_df.copy(), state.selected_project_path])
+    state.editor_saving = True
+    task_manager.add_task(worker_ctrl.worker_save_editor_changes, [state.selected_ids[0], state.editor_file_path, patch, state.selected_project_path], lane="ingest")
 
 def perform_undo():
     if not state.selected_ids: return
@@ -95,7 +141,7 @@ def perform_undo():
     if not raw: return
     state.status_msg = "UNDOING..."
     state.processing_mode = "LOCAL"
-    task_manager.add_task(worker_ctrl.worker_undo,[node_id, raw[3], state.selected_project_path, state.redo_stack.get(node_id,[])])
+    task_manager.add_task(worker_ctrl.worker_undo,[node_id, raw.file_path, state.selected_project_path, state.redo_stack.get(node_id,[])], lane="ingest")
 
 def perform_redo():
     if not state.selected_ids: return
@@ -108,18 +154,19 @@ def perform_redo():
     redo_hash = state.redo_stack[node_id].pop()
     state.status_msg = "REDOING..."
     state.processing_mode = "LOCAL"
-    task_manager.add_task(worker_ctrl.worker_redo,[node_id, raw[3], state.selected_project_path, redo_hash])
+    task_manager.add_task(worker_ctrl.worker_redo,[node_id, raw.file_path, state.selected_project_path, redo_hash], lane="ingest")
 
 def open_editor_for_selected():
     global current_state
     if len(state.selected_ids) != 1: state.status_msg = "SELECT 1 FILE TO EDIT"; return
     raw = db.get_experiment_by_id(state.selected_ids[0])
     if not raw: state.status_msg = "ERROR: FILE NOT FOUND"; return
-    state.editor_file_path = raw[3]
+    state.editor_file_path = raw.file_path
     try:
-        state.editor_df = pd.read_csv(state.editor_file_path)
+        close_editor()
+        state.editor_table = PagedCsv(state.editor_file_path) # Reads the header only; rows are indexed in the background
+        state.editor_scroll_y, state.editor_scroll_x = 0, 0
         current_state = STATE_EDITOR
-        state.editor_selected_cell = None
         state.status_msg = "EDITING MODE ACTIVE"
     except Exception: state.status_msg = "ERROR OPENING FILE"
 
@@ -162,25 +209,34 @@ def reset_to_splash():
     state.show_delete_confirm = False
     state.show_add_popup = False
     state.linkage_source = None
-    state.editor_df = None
+    close_editor()
     state.editor_file_path = None
     state.editor_scroll_y = 0
+    state.editor_scroll_x = 0
     state.editor_selected_cell = None
     state.editor_input_buffer = ""
     state.search_text = ""
     state.search_active = False
+    state.search_results = []
     tree_ui.search_filter = ""
     state.meta_input_notes = ""
     state.researcher_name = ""
     state.show_login_box = False
     state.selected_project_path = ""
     state.analysis_scroll_y = 0
-    state.stop_ai_requested = False
     state.minimap_collapsed = False
     state.redo_stack = {}
     state.pan_mode = False 
     tree_ui.nodes =[]
-    tree_ui.connections =[]
+    tree_ui.node_map = {}
+    tree_ui.edges = {}
+    tree_ui.adjacency = {}
+    tree_ui.edge_geometry = {}
+    tree_ui.node_grid.clear()
+    tree_ui.edge_grid.clear()
+    tree_ui.revision = None
+    tree_ui.layout_floor = 0
+    tree_ui.dragged_node_id = None
     tree_ui.camera_offset = pygame.Vector2(60, 300)
     tree_ui.zoom_level = 1.0
     current_state = STATE_SPLASH
@@ -193,38 +249,32 @@ def perform_print_mapping():
     path = filedialog.asksaveasfilename(defaultextension=".pdf", filetypes=[("PDF", "*.pdf")])
     if not path: return
 
-    state.status_msg = "GENERATING MAP..."
-    
-    all_x = [n["pos"].x for n in tree_ui.nodes]
-    all_y =[n["pos"].y for n in tree_ui.nodes]
-    min_x, max_x = min(all_x), max(all_x)
-    min_y, max_y = min(all_y), max(all_y)
-    
-    padding = 100
-    w = int(max_x - min_x + (padding * 2))
-    h = int(max_y - min_y + (padding * 2))
-    
-    map_surf = pygame.Surface((w, h))
-    map_surf.fill((255, 255, 255)) 
-    
-    old_offset = tree_ui.camera_offset
-    old_zoom = tree_ui.zoom_level
-    
-    tree_ui.zoom_level = 1.0
-    tree_ui.camera_offset = pygame.Vector2(padding - min_x, padding - min_y)
-    
-    tree_ui.draw(map_surf, (-1000, -1000)) 
-    
-    tree_ui.camera_offset = old_offset
-    tree_ui.zoom_level = old_zoom
-    
-    temp_img = "temp_tree_map.png"
-    pygame.image.save(map_surf, temp_img)
-    
-    success = export_tree_to_pdf(path, temp_img)
-    if os.path.exists(temp_img): os.remove(temp_img)
-    
-    state.status_msg = "MAP SAVED." if success else "MAP ERROR."
+    state.status_msg = "GENERATING MAP... (ESC TO CANCEL)"
+    task_manager.add_task(worker_print_map, [path, *tree_ui.map_snapshot()], background=True, lane="export")
+
+def relocate_project(dest_path, action):
+    """Closes the project and moves its folder on a worker; PROJECT_MOVED reopens it (see reopen_project)."""
+    global watcher, db, worker_ctrl
+    # Loads, imports, saves, stats backfill and AI calls use the db and read the project folder
+    if not task_manager.drain(["interactive", "ingest", "ai"]):
+        queue_stats_backfill() # The drain cancelled it; the project stays open
+        state.status_msg = f"{action} POSTPONED: BACKGROUND TASKS STILL RUNNING"
+        return
+    if watcher: watcher.stop(); watcher.join(); watcher = None
+    if db: db.close(); db = None
+    worker_ctrl = None
+
+    state.status_msg = f"{action}: PREPARING... (ESC TO CANCEL)"
+    state.processing_mode = "FILE"
+    task_manager.add_task(worker_move_project, [state.selected_project_path, dest_path, action], lane="export", priority=HIGH)
+
+def reopen_project(path):
+    global watcher
+    state.selected_project_path = path
+    try:
+        load_database_safe(os.path.join(path, "project_vault.db"))
+        watcher = start_watcher(os.path.join(path, "data"), event_queue)
+    except Exception as e: state.status_msg = f"REOPEN FAILED: {e}"
 
 def perform_move_project():
     new_dir = filedialog.askdirectory(title="Select New Parent Directory")
@@ -237,23 +287,7 @@ def perform_move_project():
     if os.path.exists(dest_path):
         state.status_msg = "ERROR: DESTINATION EXISTS"
         return
-        
-    try:
-        global watcher, db, worker_ctrl
-        if watcher: watcher.stop(); watcher.join(); watcher = None
-        if db: db.close(); db = None
-        worker_ctrl = None
-        
-        shutil.move(curr_path, dest_path)
-        state.selected_project_path = dest_path
-        
-        load_database_safe(os.path.join(dest_path, "project_vault.db"))
-        watcher = start_watcher(os.path.join(dest_path, "data"), event_queue)
-        state.status_msg = "PROJECT MOVED."
-    except Exception as e:
-        state.status_msg = f"MOVE FAILED: {e}"
-        load_database_safe(os.path.join(curr_path, "project_vault.db"))
-        watcher = start_watcher(os.path.join(curr_path, "data"), event_queue)
+    relocate_project(dest_path, "MOVE")
 
 def perform_rename_project():
     new_name = simpledialog.askstring("Rename Project", "Enter new project name:")
@@ -266,23 +300,7 @@ def perform_rename_project():
     if os.path.exists(new_path):
         state.status_msg = "ERROR: NAME EXISTS"
         return
-
-    try:
-        global watcher, db, worker_ctrl
-        if watcher: watcher.stop(); watcher.join(); watcher = None
-        if db: db.close(); db = None
-        worker_ctrl = None
-
-        os.rename(curr_path, new_path)
-        state.selected_project_path = new_path
-
-        load_database_safe(os.path.join(new_path, "project_vault.db"))
-        watcher = start_watcher(os.path.join(new_path, "data"), event_queue)
-        state.status_msg = "PROJECT RENAMED."
-    except Exception as e:
-        state.status_msg = f"RENAME FAILED: {e}"
-        load_database_safe(os.path.join(curr_path, "project_vault.db"))
-        watcher = start_watcher(os.path.join(curr_path, "data"), event_queue)
+    relocate_project(new_path, "RENAME")
 
 def perform_delete_project():
     try:
@@ -293,66 +311,86 @@ def perform_delete_project():
     except Exception as e:
         state.status_msg = f"DELETE FAILED: {e}"
 
+def overlay_open():
+    """Dropdowns and modals that span several scheduler regions."""
+    return current_state != STATE_DASHBOARD or state.is_processing or state.show_file_dropdown or \
+        state.show_edit_dropdown or state.show_ai_dropdown or state.show_settings or state.show_ai_popup or \
+        state.show_api_popup or state.show_delete_confirm or state.show_conversion_dialog or \
+        state.show_add_popup or state.show_axis_selector or (state.search_active and bool(state.search_results))
+
 # ==============================================================================
 # GAME LOOP
 # ==============================================================================
 running = True
+stall_monitor.start()
+last_status, last_state = None, None
 while running:
+    stall_monitor.beat()
     mouse_pos = pygame.mouse.get_pos()
     events = pygame.event.get()
     
+    if not task_manager.result_queue.empty(): frame_scheduler.invalidate()
     task_manager.process_results()
+    if state.editor_saved:
+        state.editor_saved = False
+        close_editor()
+        if current_state == STATE_EDITOR: current_state = STATE_DASHBOARD
+    if state.reopen_project_path:
+        reopen_project(state.reopen_project_path)
+        state.reopen_project_path = None
     
     if not state.is_processing:
         if "VERSION SAVED" in state.status_msg or "RESTORED" in state.status_msg:
              if "RESTORED" in state.status_msg and state.selected_ids:
-                 state.processing_mode = "LOCAL"
-                 task_manager.add_task(worker_ctrl.worker_load_experiment,[state.selected_ids])
+                 load_selection(state.selected_ids)
                  state.status_msg = "READY."
     
     if not event_queue.empty() and not state.is_processing and worker_ctrl:
         ev = event_queue.get()
         if ev["type"] == "NEW_FILE":
             state.processing_mode = "LOCAL"
-            task_manager.add_task(worker_ctrl.worker_process_new_file, [ev["path"], state.head_id, state.active_branch, state.researcher_name])
+            task_manager.add_task(worker_ctrl.worker_process_new_file, [ev["path"], state.head_id, state.active_branch, state.researcher_name], lane="ingest")
 
     search_bar_hitbox = pygame.Rect(850, 45, 200, 20)
 
     for event in events:
         if event.type == pygame.QUIT: running = False
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE: task_manager.cancel("export") # Move/rename/map export
+        if state.is_processing and state.processing_mode == "FILE": continue # Project is closed while its folder moves
         
         if state.is_processing and state.processing_mode == "AI":
             if event.type == pygame.MOUSEBUTTONDOWN:
                 if layout.btn_ai_stop.check_hover(mouse_pos):
-                    state.stop_ai_requested = True
-                    state.is_processing = False 
-                    state.processing_mode = "NORMAL"
+                    task_manager.cancel("ai")
                     state.status_msg = "AI ABORTED."
                     continue 
 
-        if current_state == STATE_EDITOR and event.type == pygame.KEYDOWN:
-            if event.key in[pygame.K_UP, pygame.K_DOWN, pygame.K_LEFT, pygame.K_RIGHT]:
-                if state.editor_selected_cell:
-                    r, c = state.editor_selected_cell
-                    try: state.editor_df.iloc[r, c] = float(state.editor_input_buffer)
-                    except: state.editor_df.iloc[r, c] = state.editor_input_buffer
-                if not state.editor_selected_cell: new_r, new_c = 0, 0
+        if current_state == STATE_EDITOR and state.editor_saving and event.type in (pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN, pygame.MOUSEWHEEL): continue
+
+        if current_state == STATE_EDITOR and event.type == pygame.KEYDOWN and state.editor_table:
+            table = state.editor_table
+            if pygame.key.get_mods() & pygame.KMOD_CTRL and event.key in (pygame.K_z, pygame.K_y):
+                commit_editor_cell()
+                cell = table.undo() if event.key == pygame.K_z else table.redo()
+                if cell: select_editor_cell(*cell)
+                else: state.status_msg = "NOTHING TO UNDO" if event.key == pygame.K_z else "NOTHING TO REDO"
+            elif event.key in[pygame.K_UP, pygame.K_DOWN, pygame.K_LEFT, pygame.K_RIGHT] and table.row_count and table.columns:
+                commit_editor_cell()
+                if not state.editor_selected_cell: new_r, new_c = int(state.editor_scroll_y), int(state.editor_scroll_x)
                 else:
                     r, c = state.editor_selected_cell
                     new_r, new_c = r, c
                     if event.key == pygame.K_UP: new_r = max(0, r - 1)
-                    elif event.key == pygame.K_DOWN: new_r = min(len(state.editor_df)-1, r + 1)
+                    elif event.key == pygame.K_DOWN: new_r = min(table.row_count-1, r + 1)
                     elif event.key == pygame.K_LEFT: new_c = max(0, c - 1)
-                    elif event.key == pygame.K_RIGHT: new_c = min(len(state.editor_df.columns)-1, c + 1)
-                state.editor_selected_cell = (new_r, new_c)
-                state.editor_input_buffer = str(state.editor_df.iloc[new_r, new_c])
-                if new_r < state.editor_scroll_y: state.editor_scroll_y = new_r
-                if new_r >= state.editor_scroll_y + 15: state.editor_scroll_y = new_r - 14
+                    elif event.key == pygame.K_RIGHT: new_c = min(len(table.columns)-1, c + 1)
+                select_editor_cell(new_r, new_c)
+            elif event.key in (pygame.K_PAGEUP, pygame.K_PAGEDOWN):
+                step = -15 if event.key == pygame.K_PAGEUP else 15
+                state.editor_scroll_y = max(0, min(max(0, table.row_count - 15), state.editor_scroll_y + step))
             elif state.editor_selected_cell:
                 if event.key == pygame.K_RETURN:
-                    r, c = state.editor_selected_cell
-                    try: val = float(state.editor_input_buffer); state.editor_df.iloc[r, c] = val
-                    except ValueError: state.editor_df.iloc[r, c] = state.editor_input_buffer
+                    commit_editor_cell()
                     state.editor_selected_cell = None
                 elif event.key == pygame.K_BACKSPACE: state.editor_input_buffer = state.editor_input_buffer[:-1]
                 else: state.editor_input_buffer += event.unicode
@@ -418,17 +456,17 @@ while running:
         if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
             if current_state == STATE_EDITOR:
                 if layout.btn_editor_save.check_hover(mouse_pos):
-                    save_editor_changes()
-                    current_state = STATE_DASHBOARD
+                    save_editor_changes() # The editor closes once SAVE_COMPLETE lands; a refused save keeps the edits
                 elif layout.btn_editor_exit.check_hover(mouse_pos):
+                    close_editor()
                     current_state = STATE_DASHBOARD
-                if 50 < mouse_pos[0] < 1230 and 100 < mouse_pos[1] < 600:
+                if state.editor_table and 50 < mouse_pos[0] < 1230 and 100 < mouse_pos[1] < 600:
                     rel_y = mouse_pos[1] - 100
                     row_idx = (rel_y // 30) + int(state.editor_scroll_y)
-                    col_idx = (mouse_pos[0] - 50) // 100
-                    if 0 <= row_idx < len(state.editor_df) and 0 <= col_idx < len(state.editor_df.columns):
-                        state.editor_selected_cell = (row_idx, col_idx)
-                        state.editor_input_buffer = str(state.editor_df.iloc[row_idx, col_idx])
+                    col_idx = (mouse_pos[0] - 50) // 100 + int(state.editor_scroll_x)
+                    commit_editor_cell()
+                    if 0 <= row_idx < state.editor_table.row_count and 0 <= col_idx < len(state.editor_table.columns):
+                        select_editor_cell(row_idx, col_idx)
                     else: state.editor_selected_cell = None
 
             elif current_state == STATE_DASHBOARD:
@@ -454,11 +492,20 @@ while running:
                         if state.selected_ids and worker_ctrl:
                             x = state.plot_context.get("x_col") if state.plot_context else None
                             y = state.plot_context.get("y_col") if state.plot_context else None
-                            state.processing_mode = "LOCAL"
-                            task_manager.add_task(worker_ctrl.worker_load_experiment, [state.selected_ids, x, y, True])
+                            load_selection(state.selected_ids, x, y, True)
                             state.status_msg = "THEME APPLIED."
                     continue 
 
+                if state.search_active and state.search_results:
+                    hit = next((i for i in range(len(state.search_results)) if layout.search_result_rect(i).collidepoint(mouse_pos)), None)
+                    if hit is not None:
+                        node_id = state.search_results[hit][0]
+                        state.search_active = False
+                        state.selected_ids = [node_id]
+                        tree_ui.center_on_node(node_id)
+                        load_selection([node_id])
+                        continue
+
                 if search_bar_hitbox.collidepoint(mouse_pos): state.search_active = True
                 else: state.search_active = False
 
@@ -483,7 +530,7 @@ while running:
                     if layout.btn_conv_yes.check_hover(mouse_pos):
                         file_path, col, unit = state.pending_conversion
                         state.processing_mode = "LOCAL"
-                        task_manager.add_task(worker_ctrl.worker_perform_conversion,[file_path, col, unit, state.selected_ids])
+                        task_manager.add_task(worker_ctrl.worker_perform_conversion,[file_path, col, unit, state.selected_ids], lane="ingest")
                         state.show_conversion_dialog = False
                     elif layout.btn_conv_no.check_hover(mouse_pos): state.show_conversion_dialog = False
 
@@ -512,7 +559,7 @@ while running:
                         if layout.dd_file_export.check_hover(mouse_pos):
                             state.show_file_dropdown = False
                             state.processing_mode = "LOCAL"
-                            task_manager.add_task(worker_ctrl.worker_export_project,[state.selected_project_path])
+                            task_manager.add_task(worker_ctrl.worker_export_project,[state.selected_project_path], lane="export")
                             continue
                         if layout.dd_file_move.check_hover(mouse_pos):
                             state.show_file_dropdown = False
@@ -567,10 +614,10 @@ while running:
                             state.processing_mode = "AI"
                             if len(state.selected_ids) == 1:
                                 state.status_msg = "ANALYZING FILE (MINI)..."
-                                task_manager.add_task(worker_ctrl.worker_analyze_selection,[state.selected_ids[0]])
+                                task_manager.add_task(worker_ctrl.worker_analyze_selection,[state.selected_ids[0]], lane="ai")
                             else:
                                 state.status_msg = "ANALYZING BRANCH (NANO)..."
-                                task_manager.add_task(worker_ctrl.worker_analyze_branch,[state.active_branch])
+                                task_manager.add_task(worker_ctrl.worker_analyze_branch,[state.active_branch], lane="ai")
                             continue
                         
                         if layout.dd_ai_summary.check_hover(mouse_pos):
@@ -597,7 +644,7 @@ while running:
                             if len(state.selected_ids) == 1:
                                 state.processing_mode = "AI"
                                 state.status_msg = "GENERATING NODE REPORT..."
-                                task_manager.add_task(worker_ctrl.worker_generate_node_simplified_summary,[state.selected_ids[0]])
+                                task_manager.add_task(worker_ctrl.worker_generate_node_simplified_summary,[state.selected_ids[0]], lane="ai")
                             else:
                                 state.status_msg = "SELECT 1 FILE FOR REPORT"
                             continue
@@ -610,7 +657,7 @@ while running:
                             
                             state.processing_mode = "AI"
                             state.status_msg = "GENERATING PROJECT STORY..."
-                            task_manager.add_task(worker_ctrl.worker_generate_project_simplified_summary,[])
+                            task_manager.add_task(worker_ctrl.worker_generate_project_simplified_summary,[], lane="ai")
                             continue
 
                         if layout.dd_ai_inconsistency.check_hover(mouse_pos):
@@ -621,7 +668,7 @@ while running:
 
                             state.processing_mode = "AI"
                             state.status_msg = "AUDITING TREE..."
-                            task_manager.add_task(worker_ctrl.worker_find_inconsistencies,[])
+                            task_manager.add_task(worker_ctrl.worker_find_inconsistencies,[], lane="ai")
                             continue
 
                         if not pygame.Rect(160, 66, 180, 130).collidepoint(mouse_pos): state.show_ai_dropdown = False
@@ -632,7 +679,7 @@ while running:
                         path = filedialog.askopenfilename(filetypes=[("CSV", "*.csv")])
                         if path: 
                             state.processing_mode = "LOCAL"
-                            task_manager.add_task(worker_ctrl.worker_process_new_file, [path, state.selected_ids[0], state.active_branch, state.researcher_name])
+                            task_manager.add_task(worker_ctrl.worker_process_new_file, [path, state.selected_ids[0], state.active_branch, state.researcher_name], lane="ingest")
                     
                     elif len(state.selected_ids) == 1 and layout.btn_edit_meta.check_hover(mouse_pos): 
                         state.is_editing_metadata = not state.is_editing_metadata
@@ -647,8 +694,7 @@ while running:
                     elif state.is_editing_metadata and layout.btn_save_meta.check_hover(mouse_pos):
                         db.update_metadata(state.selected_ids[0], state.meta_input_notes)
                         state.is_editing_metadata = False
-                        state.processing_mode = "LOCAL"
-                        task_manager.add_task(worker_ctrl.worker_load_experiment, [state.selected_ids])
+                        load_selection(state.selected_ids)
                     
                     elif layout.btn_branch.check_hover(mouse_pos):
                         if state.active_branch == "main":
@@ -671,7 +717,7 @@ while running:
                             if path:
                                 parent = state.selected_ids[0] if state.selected_ids else None
                                 state.processing_mode = "LOCAL"
-                                task_manager.add_task(worker_ctrl.worker_process_new_file,[path, parent, state.active_branch, state.researcher_name])
+                                task_manager.add_task(worker_ctrl.worker_process_new_file,[path, parent, state.active_branch, state.researcher_name], lane="ingest")
                             continue
                             
                         if layout.btn_add_popup_image.check_hover(mouse_pos):
@@ -690,11 +736,21 @@ while running:
                                 state.status_msg = "SELECT A NODE FIRST TO LINK"
                             continue
 
+                        if layout.btn_add_popup_import.check_hover(mouse_pos):
+                            state.show_add_popup = False
+                            folder = filedialog.askdirectory(title="Select Folder of Experiment CSVs")
+                            if folder:
+                                parent = state.selected_ids[0] if state.selected_ids else state.head_id
+                                state.status_msg = "IMPORTING FOLDER..."
+                                state.processing_mode = "LOCAL"
+                                task_manager.add_task(worker_ctrl.worker_import_directory,[folder, parent, state.active_branch, state.researcher_name], lane="ingest")
+                            continue
+
                         if layout.btn_add_popup_more.check_hover(mouse_pos):
                             state.show_add_popup = False
                             continue
                             
-                        if not pygame.Rect(850, 480, 180, 160).collidepoint(mouse_pos):
+                        if not pygame.Rect(850, 440, 180, 200).collidepoint(mouse_pos):
                             state.show_add_popup = False
 
                     if not state.is_editing_metadata and not state.show_axis_selector and not state.show_add_popup:
@@ -711,8 +767,7 @@ while running:
                                         state.status_msg = "CANNOT LINK A NODE TO ITSELF"
                                     state.linkage_source = None
                                 else:
-                                    state.processing_mode = "LOCAL"
-                                    task_manager.add_task(worker_ctrl.worker_load_experiment, [selected_list])
+                                    load_selection(selected_list)
             
             elif current_state == STATE_SPLASH:
                 if not state.show_login_box:
@@ -740,18 +795,17 @@ while running:
                     if layout.btn_confirm.check_hover(mouse_pos):
                         if len(state.researcher_name) >= 2:
                             watcher = start_watcher(os.path.join(state.selected_project_path, "data"), event_queue)
-                            tree_data = db.get_tree_data()
+                            tree_data, links, revision = db.get_tree_snapshot()
+                            tree_ui.update_tree(tree_data, links, revision)
                             if not tree_data: current_state = STATE_ONBOARDING
-                            else: 
-                                tree_ui.update_tree(tree_data)
-                                current_state = STATE_DASHBOARD
+                            else: current_state = STATE_DASHBOARD
 
             elif current_state == STATE_ONBOARDING:
                 if layout.btn_onboard_upload.check_hover(mouse_pos):
                     path = filedialog.askopenfilename(filetypes=[("CSV", "*.csv")])
                     if path:
                         state.processing_mode = "LOCAL"
-                        task_manager.add_task(worker_ctrl.worker_process_new_file,[path, None, "main", state.researcher_name])
+                        task_manager.add_task(worker_ctrl.worker_process_new_file,[path, None, "main", state.researcher_name], lane="ingest")
                         current_state = STATE_DASHBOARD
                 elif layout.btn_skip_onboarding.check_hover(mouse_pos): current_state = STATE_DASHBOARD
 
@@ -760,11 +814,22 @@ while running:
                 if event.key == pygame.K_BACKSPACE: state.researcher_name = state.researcher_name[:-1]
                 else: state.researcher_name += event.unicode
             elif state.search_active:
+                if event.key in (pygame.K_UP, pygame.K_DOWN):
+                    tree_ui.next_match(-1 if event.key == pygame.K_UP else 1)
+                    continue
                 if event.key == pygame.K_BACKSPACE: state.search_text = state.search_text[:-1]
                 elif event.key == pygame.K_RETURN: state.search_active = False 
                 else: state.search_text += event.unicode
                 tree_ui.search_filter = state.search_text
+                if not db or not state.search_text.strip(): state.search_results = []
+                else: task_manager.add_task(worker_ctrl.worker_search, [state.search_text, SEARCH_RESULT_ROWS], background=True, priority=HIGH, supersede="search")
         
+        if current_state == STATE_EDITOR and event.type == pygame.MOUSEWHEEL and state.editor_table:
+            if pygame.key.get_mods() & pygame.KMOD_SHIFT or event.x:
+                state.editor_scroll_x = max(0, min(max(0, len(state.editor_table.columns) - 12), state.editor_scroll_x - (event.y or -event.x)))
+            else:
+                state.editor_scroll_y = max(0, min(max(0, state.editor_table.row_count - 15), state.editor_scroll_y - event.y * 3))
+
         if current_state == STATE_DASHBOARD:
             if event.type == pygame.MOUSEWHEEL:
                 if state.show_ai_popup:
@@ -787,19 +852,41 @@ while running:
             
             if event.type == pygame.MOUSEMOTION and tree_ui.is_panning: tree_ui.camera_offset += pygame.Vector2(event.rel)
 
-    if current_state == STATE_SPLASH: render_engine.draw_splash(mouse_pos)
-    elif current_state == STATE_ONBOARDING: render_engine.draw_onboarding(mouse_pos)
-    elif current_state == STATE_EDITOR: render_engine.draw_editor(mouse_pos)
-    elif current_state == STATE_DASHBOARD:
+    # --- FRAME SCHEDULING: redraw only what input, results or animations touched ---
+    frame_scheduler.note_events(events, overlay_open())
+    if current_state != last_state or current_state == STATE_SPLASH or state.is_processing: frame_scheduler.invalidate() # Screen switch / animated screens
+    last_state = current_state
+    if state.status_msg != last_status:
+        last_status = state.status_msg
+        frame_scheduler.invalidate("status")
+    if current_state == STATE_DASHBOARD:
         if state.needs_tree_update:
-            tree_ui.update_tree(db.get_tree_data())
+            if tree_ui.revision is None: tree_ui.update_tree(*db.get_tree_snapshot())
+            else: tree_ui.apply_tree_changes(db.get_tree_changes(tree_ui.revision))
             state.needs_tree_update = False
-        render_engine.draw_dashboard(mouse_pos, tree_ui, ai_engine, settings_menu)
-        if state.show_axis_selector: axis_selector.draw(screen, 850, 130, state.plot_context)
-        if state.show_api_popup: render_engine.draw_api_config_modal(mouse_pos)
-
-    pygame.display.flip()
-    clock.tick(60)
-
+            frame_scheduler.invalidate("tree")
+        if tree_ui.is_panning or tree_ui.dragged_node_id is not None or not tree_ui.layout_worker.results.empty(): frame_scheduler.invalidate("tree")
+        if state.search_active: frame_scheduler.blink("status")
+        if state.is_editing_metadata: frame_scheduler.blink("side")
+        if state.show_api_popup: frame_scheduler.blink()
+    elif current_state == STATE_EDITOR:
+        frame_scheduler.blink()
+        if state.editor_table and state.editor_table.poll_changed(): frame_scheduler.invalidate() # Rows indexed / pages loaded
+
+    if frame_scheduler.begin_frame(screen):
+        if current_state == STATE_SPLASH: render_engine.draw_splash(mouse_pos)
+        elif current_state == STATE_ONBOARDING: render_engine.draw_onboarding(mouse_pos)
+        elif current_state == STATE_EDITOR: render_engine.draw_editor(mouse_pos)
+        elif current_state == STATE_DASHBOARD:
+            render_engine.draw_dashboard(mouse_pos, tree_ui, ai_engine, settings_menu)
+            if state.show_axis_selector: axis_selector.draw(screen, 850, 130, state.plot_context)
+            if state.show_api_popup: render_engine.draw_api_config_modal(mouse_pos)
+
+        text_cache.end_frame()
+        frame_scheduler.present(screen)
+    stall_monitor.idle()
+    frame_scheduler.wait(clock)
+
+if db: db.close() # Flushes queued write-behind updates
 pygame.quit()
 sys.exit()
\ No newline at end of file
@@ -2,6 +2,7 @@
 from matplotlib import lines
 import pygame
 from ui.styles import theme
+from ui.text_cache import text_cache
 
 # This MetaClass allows us to access properties like UITheme.BG_DARK
 # and have them dynamically return the value from the current 'theme' object.
@@ -47,45 +48,10 @@ class UITheme(metaclass=DynamicThemeMeta):
 
     @staticmethod
     def render_terminal_text(surface, text, pos, font, color, width_limit=400):
-        words = text.split()
-        lines = []
-        current_line = []
-
-        for word in words:
-            # If a single token is too wide, split it into chunks
-            if font.size(word)[0] > width_limit:
-                # flush current line first
-                if current_line:
-                    lines.append(" ".join(current_line))
-                    current_line = []
-
-                chunk = ""
-                for ch in word:
-                    test = chunk + ch
-                    if font.size(test)[0] > width_limit and chunk:
-                        lines.append(chunk)
-                        chunk = ch
-                    else:
-                        chunk = test
-                if chunk:
-                    lines.append(chunk)
-                continue
-
-            current_line.append(word)
-            test_line = " ".join(current_line)
-            if font.size(test_line)[0] > width_limit:
-                current_line.pop()
-                lines.append(" ".join(current_line))
-                current_line = [word]
-        if current_line:
-            lines.append(" ".join(current_line))
-
-        y_offset = 0
-        for line in lines:
-            text_surf = font.render(line, True, color)
-            surface.blit(text_surf, (pos[0], pos[1] + y_offset))
-            y_offset += font.get_linesize() + 2
-        return y_offset
+        """Draws word-wrapped text and returns its height. Layout and pixels are cached per (text, font, width)."""
+        lines = text_cache.wrap(font, text, width_limit)
+        if lines: surface.blit(text_cache.block(font, text, color, width_limit), pos)
+        return len(lines) * (font.get_linesize() + 2)
     
     @staticmethod
     def draw_orange_streaks(surface, frame_count):
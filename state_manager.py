@@ -50,15 +50,21 @@ class AppState:
         self.linkage_source = None
         
         # Editor State
-        self.editor_df = None
+        self.editor_table = None # core.csv_table.PagedCsv of the file being edited
         self.editor_file_path = None
         self.editor_scroll_y = 0
+        self.editor_scroll_x = 0 # First visible column
         self.editor_selected_cell = None 
         self.editor_input_buffer = ""
+        self.editor_saving = False # A save is in flight; the editor stays open (and read-only) until it lands
+        self.editor_saved = False # Set by SAVE_COMPLETE; main closes the editor
 
         # Global Input
         self.search_text = ""
         self.search_active = False
+        self.search_results = [] # Ranked (id, name, snippet) rows from full-text search
+        self.unindexed_runs = 0 # Runs the column-stats backfill hasn't reached yet
+        self.unreadable_runs = 0 # Runs the backfill could not summarize
         
         # Metadata / Notes
         self.meta_input_notes = ""
@@ -73,9 +79,9 @@ class AppState:
         self.researcher_name = ""
         self.show_login_box = False
         self.selected_project_path = ""
+        self.reopen_project_path = None # Set when a move/rename worker finishes
 
         self.analysis_scroll_y = 0
-        self.stop_ai_requested = False
         self.minimap_collapsed = False
         
         # Undo/Redo
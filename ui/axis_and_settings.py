@@ -2,7 +2,9 @@
 import pygame
 from ui.styles import theme
 from ui.components import Button
+from ui.text_cache import text_cache
 from core.config import cfg
+from core.tasks import HIGH
 from state_manager import state
 
 class AxisSelector:
@@ -20,11 +22,11 @@ class AxisSelector:
         theme.draw_bracket(surface, self.rect, theme.ACCENT)
 
         # Header
-        header_surf = self.font.render("PLOT CONFIGURATION", True, theme.ACCENT)
+        header_surf = text_cache.render(self.font, "PLOT CONFIGURATION", True, theme.ACCENT)
         surface.blit(header_surf, (x + 10, y + 10))
         
         # Instructions
-        inst_surf = self.font.render("Hold 'X' + Click to set X-Axis", True, theme.TEXT_DIM)
+        inst_surf = text_cache.render(self.font, "Hold 'X' + Click to set X-Axis", True, theme.TEXT_DIM)
         surface.blit(inst_surf, (x + 10, y + 25))
         
         self.close_btn.rect.topleft = (x + 210, y + 5)
@@ -47,18 +49,18 @@ class AxisSelector:
             pygame.draw.rect(surface, col_color, row_rect)
             
             # Text
-            txt = self.font.render(col[:20], True, theme.TEXT_MAIN)
+            txt = text_cache.render(self.font, col[:20], True, theme.TEXT_MAIN)
             surface.blit(txt, (x + 15, row_rect.y + 4))
             
             # Indicators (X or Y)
             if col == context.get('x_col'):
                 pygame.draw.circle(surface, theme.ACCENT, (x + 210, row_rect.centery), 4)
-                lbl = self.font.render("X", True, theme.ACCENT)
+                lbl = text_cache.render(self.font, "X", True, theme.ACCENT)
                 surface.blit(lbl, (x + 195, row_rect.y + 4))
             
             if col == context.get('y_col'):
                 pygame.draw.circle(surface, theme.ACCENT_SEC, (x + 210, row_rect.centery), 4)
-                lbl = self.font.render("Y", True, theme.ACCENT_SEC)
+                lbl = text_cache.render(self.font, "Y", True, theme.ACCENT_SEC)
                 surface.blit(lbl, (x + 195, row_rect.y + 4))
 
     def handle_click(self, mouse_pos, context, worker_ctrl, task_manager):
@@ -92,9 +94,8 @@ class AxisSelector:
             else:
                 new_y = col_name
 
-            state.processing_mode = "LOCAL"
             task_manager.add_task(worker_ctrl.worker_load_experiment, 
-                                  [state.selected_ids, new_x, new_y, True])
+                                  [state.selected_ids, new_x, new_y, True], background=True, priority=HIGH, supersede="load")
 
 
 class SettingsMenu:
@@ -110,11 +111,7 @@ class SettingsMenu:
     def draw(self, surface):
         cx, cy = surface.get_rect().center
         self.rect.center = (cx, cy)
-        
-        # Overlay Dim
-        overlay = pygame.Surface(surface.get_size(), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 150))
-        surface.blit(overlay, (0,0))
+        # The dim overlay behind the panel is a cached RenderEngine layer
 
         # Panel
         pygame.draw.rect(surface, theme.BG_PANEL, self.rect)
@@ -122,11 +119,11 @@ class SettingsMenu:
         
         # Content
         y_off = self.rect.y + 20
-        title = self.font.render("SYSTEM CONFIGURATION", True, theme.TEXT_MAIN)
+        title = text_cache.render(self.font, "SYSTEM CONFIGURATION", True, theme.TEXT_MAIN)
         surface.blit(title, (self.rect.x + 20, y_off))
         
         y_off += 50
-        lbl_theme = self.font.render("COLOR THEME:", True, theme.TEXT_DIM)
+        lbl_theme = text_cache.render(self.font, "COLOR THEME:", True, theme.TEXT_DIM)
         surface.blit(lbl_theme, (self.rect.x + 20, y_off))
         
         self.btn_theme_light.rect.topleft = (self.rect.x + 20, y_off + 25)
@@ -137,7 +134,7 @@ class SettingsMenu:
         
         # Hotkeys
         y_off += 100
-        lbl_keys = self.font.render("ACTIVE HOTKEYS:", True, theme.TEXT_DIM)
+        lbl_keys = text_cache.render(self.font, "ACTIVE HOTKEYS:", True, theme.TEXT_DIM)
         surface.blit(lbl_keys, (self.rect.x + 20, y_off))
         
         y_off += 30
@@ -145,7 +142,7 @@ class SettingsMenu:
             key_name = pygame.key.name(keys[0]).upper()
             mod = "CTRL+" if keys[1] & pygame.KMOD_CTRL else ""
             txt = f"{action.upper()}: {mod}{key_name}"
-            surface.blit(self.font.render(txt, True, theme.TEXT_MAIN), (self.rect.x + 30, y_off))
+            surface.blit(text_cache.render(self.font, txt, True, theme.TEXT_MAIN), (self.rect.x + 30, y_off))
             y_off += 20
 
         # Clear Cache Button
@@ -1,5 +1,6 @@
 import pygame
 from settings import UITheme
+from ui.text_cache import text_cache
 
 class Button:
     def __init__(self, x, y, w, h, text, color):
@@ -18,22 +19,26 @@ class Button:
         pygame.draw.rect(surface, fill, self.rect)
         pygame.draw.rect(surface, draw_color, self.rect, 2)
         
-        txt_surf = font.render(self.text, True, UITheme.TEXT_OFF_WHITE)
+        txt_surf = text_cache.render(font, self.text, True, UITheme.TEXT_OFF_WHITE)
         surface.blit(txt_surf, (self.rect.x + (self.rect.w - txt_surf.get_width())//2, self.rect.y + (self.rect.h - txt_surf.get_height())//2))
 
     def check_hover(self, mouse_pos):
         self.is_hovered = self.rect.collidepoint(mouse_pos)
         return self.is_hovered
 
-def draw_loading_overlay(surface, font):
-    """Draws a semi-transparent 'Processing' screen."""
-    overlay = pygame.Surface((1280, 720), pygame.SRCALPHA)
-    overlay.fill((10, 10, 12, 200)) # Dark transparent
+def draw_loading_overlay(surface, font, overlay=None, detail=None):
+    """Draws a semi-transparent 'Processing' screen. Pass a pre-filled overlay to avoid allocating one; detail is a progress line."""
+    if overlay is None:
+        overlay = pygame.Surface((1280, 720), pygame.SRCALPHA)
+        overlay.fill((10, 10, 12, 200)) # Dark transparent
     
     # Pulsing text logic could go here, but let's keep it simple
-    msg = font.render(">> EXECUTING_ANALYSIS_PROTOCOL...", True, UITheme.ACCENT_ORANGE)
+    msg = text_cache.render(font, ">> EXECUTING_ANALYSIS_PROTOCOL...", True, UITheme.ACCENT_ORANGE)
     surface.blit(overlay, (0,0))
     surface.blit(msg, (1280//2 - msg.get_width()//2, 720//2))
+    if detail:
+        sub = text_cache.render(font, detail, True, UITheme.TEXT_DIM)
+        surface.blit(sub, (1280//2 - sub.get_width()//2, 720//2 + 30))
     
 def draw_metadata_panel(surface, experiment_data):
     """Draws the [i] Information panel on the right."""
@@ -73,7 +78,7 @@ class TextInput:
         pygame.draw.rect(surface, color, self.rect, 1)
         
         # Label
-        lbl = self.font.render(self.label, True, UITheme.TEXT_DIM)
+        lbl = text_cache.render(self.font, self.label, True, UITheme.TEXT_DIM)
         surface.blit(lbl, (self.rect.x, self.rect.y - 20))
         
         # Text
@@ -1,15 +1,29 @@
 # --- FILE: ui/elements.py ---
 import pygame
 import math
-import json
+import numpy as np
 from settings import UITheme
 from state_manager import state
+from ui.spatial import SpatialGrid
+from ui.text_cache import text_cache
+from ui.lod import LOD_ZOOM, lod_level, TreeArrays, ClusterLevel
+from ui.tree_layout import GEN_SPACING, ROW_SPACING, TidyLayout, LayoutWorker
+from ui.search_index import NameIndex
+
+MINIMAP_DOT = [(dx, dy) for dx in range(-2, 3) for dy in range(-2, 3) if dx * dx + dy * dy <= 4] # radius-2 disk
 
 class VersionTree:
-    def __init__(self):
+    def __init__(self, layout_engine=None):
         self.nodes = []  
-        self.connections =[]
+        self.node_map = {}
+        self.edges = {} # ("tree", child_id) / ("link", src, dst) -> (src_node, dst_node)
+        self.adjacency = {} # node id -> keys of incident edges
+        self.edge_geometry = {} # edge key -> (segments, world-space polyline, arrow direction); dropped when an endpoint moves
         self.extra_links = {}
+        self.branch_slots = {"main": 0}
+        self.revision = None
+        self.node_grid = SpatialGrid() # node id by world position, for hit-testing and culling
+        self.edge_grid = SpatialGrid() # edge key by curve bbox
         self.node_radius = 18
         self.camera_offset = pygame.Vector2(60, 300)
         self.zoom_level = 1.0
@@ -17,9 +31,25 @@ class VersionTree:
         self.dragged_node_id = None
         self.font = pygame.font.SysFont("Consolas", 12, bold=True)
         self._search_filter = "" 
+        self.search_index = NameIndex()
+        self.search_matches = frozenset() # ids matching search_filter, computed once per keystroke
+        self.search_order = None # sorted search_matches, built on first next/prev
+        self.search_cursor = 0
         self.minimap_rect = None
         self.minimap_btn_rect = None
         self.minimap_internals = {}
+        self.minimap_layer = None
+        self.minimap_layer_key = None
+        self.minimap_points = None
+        self.minimap_dirty = True
+        self.lod_arrays = None
+        self.lod_levels = {} # lod level -> ClusterLevel, rebuilt after nodes or edges change
+        self.lod_dirty = False
+        self.layout_engine = layout_engine or TidyLayout() # Any object with .name and .compute(rows) -> {id: (x, y)}; .session() makes it incremental
+        self.layout_worker = LayoutWorker()
+        self.layout_floor = 0 # Results for older tickets are stale: a full layout replaced them
+        self.drag_moved = False
+        self.on_node_moved = None # Called with the node after a drag, to persist its offset
 
     @property
     def search_filter(self): return self._search_filter
@@ -27,67 +57,274 @@ class VersionTree:
     @search_filter.setter
     def search_filter(self, value):
         self._search_filter = value
-        if value:
-            for node in self.nodes:
-                if value.lower() in node["name"].lower():
-                    self.center_on_node(node["id"])
-                    break
+        self._refresh_search(recenter=True)
+
+    def _refresh_search(self, recenter=False):
+        self.search_matches = self.search_index.search(self._search_filter)
+        self.search_order = None
+        if not recenter or not self._search_filter: return
+        if not self.search_matches:
+            state.status_msg = "NO MATCH"
+            return
+        self.search_cursor = 0
+        self.center_on_node(min(self.search_matches))
+        state.status_msg = f"MATCH 1/{len(self.search_matches)}"
+
+    def next_match(self, step=1):
+        """Cycles the camera through matches in id order; step=-1 goes back."""
+        if not self.search_matches: return
+        if self.search_order is None:
+            self.search_order = sorted(self.search_matches)
+            self.search_cursor = min(self.search_cursor, len(self.search_order) - 1)
+        self.search_cursor = (self.search_cursor + step) % len(self.search_order)
+        self.center_on_node(self.search_order[self.search_cursor])
+        state.status_msg = f"MATCH {self.search_cursor + 1}/{len(self.search_order)}"
 
     def handle_zoom(self, direction):
         old_zoom = self.zoom_level
-        if direction == "in": self.zoom_level = min(2.0, self.zoom_level + 0.1)
-        else: self.zoom_level = max(0.4, self.zoom_level - 0.1)
+        if direction == "in": self.zoom_level = min(2.0, round(self.zoom_level + 0.1, 2))
+        else: self.zoom_level = max(0.1, round(self.zoom_level - 0.1, 2))
         if old_zoom != self.zoom_level:
             center = pygame.Vector2(400, 300)
             self.camera_offset = center - (center - self.camera_offset) * (self.zoom_level / old_zoom)
 
     def center_on_node(self, node_id):
-        for node in self.nodes:
-            if node["id"] == node_id:
-                target_center = pygame.Vector2(400, 300)
-                self.camera_offset = target_center - (node["pos"] * self.zoom_level)
-                break
+        node = self.node_map.get(node_id)
+        if node:
+            target_center = pygame.Vector2(400, 300)
+            self.camera_offset = target_center - (node["pos"] * self.zoom_level)
 
-    def update_tree(self, db_rows):
+    def update_tree(self, db_rows, links=(), revision=None):
         old_offsets = {n["id"]: n.get("manual_offset", pygame.Vector2(0,0)) for n in self.nodes}
         self.nodes = []
-        self.connections =[]
+        self.node_map = {}
+        self.node_grid.clear()
+        self.search_index.clear()
+        self._positions_changed()
         self.extra_links = {} # Reset extra links
-        pos_map = {}
-        branch_slots = {"main": 0}
-        next_slot_y = 100 
+        for src, tgt in links:
+            self.extra_links.setdefault(src, []).append(tgt)
+        self.branch_slots = {"main": 0}
 
         for row in db_rows:
             node_id, parent_id, branch, name = row[0], row[1], row[2], row[3]
-            if len(row) > 4 and row[4]:
-                try: self.extra_links[node_id] = json.loads(row[4])
-                except: pass
-            
-            gen_x = pos_map[parent_id]['gen'] + 1 if (parent_id and parent_id in pos_map) else 0
-            if branch not in branch_slots:
-                branch_slots[branch] = len(branch_slots) * next_slot_y
-            
-            base_pos = pygame.Vector2(gen_x * 160, branch_slots[branch])
-            manual_off = old_offsets.get(node_id, pygame.Vector2(0,0))
-            final_pos = base_pos + manual_off
-            
-            pos_map[node_id] = {'pos': final_pos, 'gen': gen_x}
-            
-            self.nodes.append({
-                "id": node_id, "pos": final_pos, "base_pos": base_pos,
-                "manual_offset": manual_off, "parent_id": parent_id, 
-                "name": name, "branch": branch
-            })
-            
-            if parent_id in pos_map:
-                self.connections.append((pos_map[parent_id]['pos'], final_pos))
-
-        # Add custom linkages
+            if len(row) > 5: manual_off = pygame.Vector2(row[4] or 0, row[5] or 0)
+            else: manual_off = old_offsets.get(node_id, pygame.Vector2(0,0))
+            self._add_node(self._place_node(node_id, parent_id, branch, name, manual_off))
+        self.rebuild_connections()
+        self.revision = revision
+        self.layout_floor = self.layout_worker.reset(self.layout_engine, db_rows, revision)
+        self.search_index.build_async()
+        if self._search_filter: self._refresh_search()
+
+    def apply_tree_changes(self, changes):
+        """Patches nodes and edges in place from a DBHandler.get_tree_changes() delta."""
+        upserts = []
+        if changes["deleted"]:
+            gone = set(changes["deleted"])
+            self.nodes = [n for n in self.nodes if n["id"] not in gone]
+            for node_id in gone:
+                for key in list(self.adjacency.get(node_id, ())): self._remove_edge(key)
+                self.adjacency.pop(node_id, None)
+                self.node_map.pop(node_id, None)
+                self.extra_links.pop(node_id, None)
+                self.node_grid.remove(node_id)
+                self.search_index.remove(node_id)
+            self._positions_changed()
+        for src, tgt in changes["links_removed"]:
+            if tgt in self.extra_links.get(src, []): self.extra_links[src].remove(tgt)
+            self._remove_edge(("link", src, tgt))
+
+        for row in changes["nodes"]:
+            node_id, parent_id, branch, name = row[0], row[1], row[2], row[3]
+            node = self.node_map.get(node_id)
+            if node is None:
+                manual_off = pygame.Vector2(row[4] or 0, row[5] or 0) if len(row) > 5 else pygame.Vector2(0,0)
+                node = self._place_node(node_id, parent_id, branch, name, manual_off)
+                self._add_node(node)
+                upserts.append((node_id, parent_id, branch))
+                if parent_id in self.node_map: self._add_edge(("tree", node_id), self.node_map[parent_id], node)
+            elif node["parent_id"] != parent_id or node["branch"] != branch:
+                moved = self._place_node(node_id, parent_id, branch, name, node["manual_offset"])
+                node.update(moved)
+                upserts.append((node_id, parent_id, branch))
+                self.search_index.add(node_id, name)
+                self._remove_edge(("tree", node_id))
+                if parent_id in self.node_map: self._add_edge(("tree", node_id), self.node_map[parent_id], node)
+                self.move_node(node)
+            elif node["name"] != name:
+                node["name"] = name
+                self.search_index.add(node_id, name)
+
+        for src, tgt in changes["links_added"]:
+            targets = self.extra_links.setdefault(src, [])
+            if tgt in targets: continue
+            targets.append(tgt)
+            if src in self.node_map and tgt in self.node_map:
+                self._add_edge(("link", src, tgt), self.node_map[src], self.node_map[tgt])
+        self.revision = changes["rev"]
+        if upserts or changes["deleted"]:
+            self.layout_worker.update(self.layout_engine, self.revision, upserts, changes["deleted"])
+        if changes["nodes"] or changes["deleted"]:
+            if self._search_filter: self._refresh_search()
+
+    # --- LAYOUT ---
+    # Nodes are placed provisionally right away (next to their parent) and snap to the
+    # engine's layout once the worker delivers it, so commits never wait on a full re-layout.
+    # The worker keeps its own copy of the rows; the UI only sends what changed and gets
+    # back only the nodes that moved.
+    def set_layout_engine(self, engine):
+        self.layout_engine = engine
+        ticket = self.layout_worker.relayout(engine, self.revision)
+        cached = self.layout_worker.cached(engine, self.revision)
+        if cached is not None:
+            self._apply_layout(cached)
+            self.layout_floor = ticket
+
+    def poll_layout(self):
+        result = self.layout_worker.poll()
+        if result and result[0] >= self.layout_floor: self._apply_layout(result[1])
+
+    def _apply_layout(self, positions):
+        """Moves only the nodes whose base position changed; manual offsets ride on top."""
+        moved = []
+        for node_id, (x, y) in positions.items():
+            node = self.node_map.get(node_id)
+            if node is None or (node["base_pos"].x == x and node["base_pos"].y == y): continue
+            node["base_pos"] = pygame.Vector2(x, y)
+            if node_id == self.dragged_node_id: node["manual_offset"] = node["pos"] - node["base_pos"]
+            else: node["pos"] = node["base_pos"] + node["manual_offset"]
+            moved.append(node)
+        if len(moved) > 1000:
+            # Re-indexing everything beats thousands of incremental grid moves
+            self.node_grid.clear()
+            for node in self.nodes: self.node_grid.insert(node["id"], node["pos"].x, node["pos"].y)
+            self._positions_changed()
+            self.rebuild_connections()
+        else:
+            for node in moved: self.move_node(node)
+
+    def _place_node(self, node_id, parent_id, branch, name, manual_off):
+        parent = self.node_map.get(parent_id) if parent_id else None
+        gen_x = parent["gen"] + 1 if parent else 0
+        if branch not in self.branch_slots:
+            self.branch_slots[branch] = len(self.branch_slots) * ROW_SPACING
+        if parent and self.layout_engine.name != "generation":
+            # Provisional: right of the parent, below its existing children
+            siblings = sum(1 for key in self.adjacency.get(parent_id, ()) if key[0] == "tree" and key[1] != parent_id)
+            base_pos = parent["base_pos"] + pygame.Vector2(GEN_SPACING, siblings * ROW_SPACING)
+        else:
+            base_pos = pygame.Vector2(gen_x * GEN_SPACING, self.branch_slots[branch])
+        return {
+            "id": node_id, "pos": base_pos + manual_off, "base_pos": base_pos,
+            "manual_offset": manual_off, "parent_id": parent_id,
+            "name": name, "branch": branch, "gen": gen_x
+        }
+
+    def _positions_changed(self):
+        self.minimap_dirty = True
+        self.lod_dirty = True
+
+    def _add_node(self, node):
+        self.nodes.append(node)
+        self.node_map[node["id"]] = node
+        self.node_grid.insert(node["id"], node["pos"].x, node["pos"].y)
+        self.search_index.add(node["id"], node["name"])
+        self._positions_changed()
+
+    # Edges hold the node dicts themselves, so positions are read live; the adjacency
+    # index lets a moved node refresh just its own edges.
+    def _add_edge(self, key, src_node, dst_node):
+        self.edges[key] = (src_node, dst_node)
+        self.adjacency.setdefault(src_node["id"], set()).add(key)
+        self.adjacency.setdefault(dst_node["id"], set()).add(key)
+        self.lod_dirty = True
+        self._index_edge(key)
+
+    def _remove_edge(self, key):
+        edge = self.edges.pop(key, None)
+        if not edge: return
+        for node in edge: self.adjacency.get(node["id"], set()).discard(key)
+        self.lod_dirty = True
+        self.edge_grid.remove(key)
+        self.edge_geometry.pop(key, None)
+
+    def _index_edge(self, key):
+        self.edge_geometry.pop(key, None)
+        # Padded so the curve's control-point bulge and ports stay inside the indexed bbox
+        start, end = self.edges[key][0]["pos"], self.edges[key][1]["pos"]
+        pad = self.node_radius + 40
+        self.edge_grid.insert(key, min(start.x, end.x) - pad, min(start.y, end.y) - pad,
+                              max(start.x, end.x) + pad, max(start.y, end.y) + pad)
+
+    def move_node(self, node):
+        """Re-indexes a node and only its incident edges after its position changed."""
+        self.node_grid.move(node["id"], node["pos"].x, node["pos"].y)
+        self._positions_changed()
+        for key in self.adjacency.get(node["id"], ()): self._index_edge(key)
+
+    def visible_world_rect(self, surface_size, margin=50):
+        """World-space (x0, y0, x1, y1) covered by a surface of the given size, plus a screen margin."""
+        w, h = surface_size
+        x0 = (-margin - self.camera_offset.x) / self.zoom_level
+        y0 = (-margin - self.camera_offset.y) / self.zoom_level
+        x1 = (w + margin - self.camera_offset.x) / self.zoom_level
+        y1 = (h + margin - self.camera_offset.y) / self.zoom_level
+        return x0, y0, x1, y1
+
+    def map_snapshot(self):
+        """Plain-data copy of the tree for export workers: nodes (id, x, y, name, branch) and edges (src_id, dst_id)."""
+        nodes = [(n["id"], n["pos"].x, n["pos"].y, n["name"], n["branch"]) for n in self.nodes]
+        edges = [(src["id"], dst["id"]) for src, dst in self.edges.values()]
+        return nodes, edges
+
+    def rebuild_connections(self):
+        self.edges = {}
+        self.adjacency = {}
+        self.edge_geometry = {}
+        self.edge_grid.clear()
+
+        # Standard parent-child links
+        for n in self.nodes:
+            if n["parent_id"] in self.node_map:
+                self._add_edge(("tree", n["id"]), self.node_map[n["parent_id"]], n)
+
+        # Custom extra links
         for src, targets in self.extra_links.items():
-            if src in pos_map:
+            if src in self.node_map:
                 for tgt in targets:
-                    if tgt in pos_map:
-                        self.connections.append((pos_map[src]['pos'], pos_map[tgt]['pos']))
+                    if tgt in self.node_map:
+                        self._add_edge(("link", src, tgt), self.node_map[src], self.node_map[tgt])
+
+    def draw_lod(self, surface):
+        """Zoomed-out rendering: per-branch runs of nodes drawn as segments with counts, no labels."""
+        if self.lod_arrays is None or (self.lod_dirty and self.dragged_node_id is None):
+            self.lod_arrays = TreeArrays(self.nodes, self.edges.values())
+            self.lod_levels = {}
+            self.lod_dirty = False
+        level = lod_level(self.zoom_level)
+        lod = self.lod_levels.get(level)
+        if lod is None: lod = self.lod_levels[level] = ClusterLevel(self.lod_arrays, level)
+
+        r = max(2, int(self.node_radius * self.zoom_level))
+        rows = self.lod_arrays.row
+        selected = {int(lod.node_cluster[rows[n]]) for n in state.selected_ids if n in rows}
+        clusters, sx0, sx1, sy, links = lod.visible(self.zoom_level, self.camera_offset, surface.get_size())
+        for lx0, ly0, lx1, ly1 in links.tolist():
+            pygame.draw.line(surface, (100, 100, 110), (lx0, ly0), (lx1, ly1), 1)
+
+        for idx in clusters.tolist():
+            x0, x1, y = sx0[idx], sx1[idx], sy[idx]
+            base_color = UITheme.NODE_MAIN if lod.is_main[idx] else UITheme.NODE_BRANCH
+            if idx in selected:
+                pygame.draw.rect(surface, UITheme.ACCENT_ORANGE, (x0 - r - 3, y - r - 3, x1 - x0 + 2 * r + 6, 2 * r + 6), 2, border_radius=r + 3)
+            if lod.count[idx] == 1:
+                pygame.draw.circle(surface, UITheme.PANEL_GREY, (x0, y), r)
+                pygame.draw.circle(surface, base_color, (x0, y), r, 1)
+                continue
+            pygame.draw.rect(surface, base_color, (x0 - r, y - r, x1 - x0 + 2 * r, 2 * r), border_radius=r)
+            label = text_cache.render(self.font, str(lod.count[idx]), True, UITheme.TEXT_OFF_WHITE)
+            if label.get_width() < x1 - x0 + 2 * r: surface.blit(label, label.get_rect(center=((x0 + x1) / 2, y)))
 
     def draw_arrow_head(self, surface, tip, direction, color):
         if direction.length() == 0: return
@@ -99,69 +336,65 @@ class VersionTree:
         p3 = tip - pygame.Vector2(size, -size/2).rotate_rad(angle)
         pygame.draw.polygon(surface, color, [p1, p2, p3])
 
-    def draw_n8n_curve(self, surface, start, end, color):
-        dist = (end.x - start.x) / 2
-        if abs(dist) < 10: dist = 40
-        cp1 = start + pygame.Vector2(dist, 0)
-        cp2 = end - pygame.Vector2(dist, 0)
-        
-        points = [start]
-        for t in range(1, 21):
-            t /= 20
-            p = (1-t)**3 * start + 3*(1-t)**2 * t * cp1 + 3*(1-t) * t**2 * cp2 + t**3 * end
-            points.append(p)
-        
+    def curve_segments(self):
+        """Polyline resolution for edges: 20 segments at 1x zoom, fewer when zoomed out."""
+        return max(4, min(32, int(20 * self.zoom_level)))
+
+    def _build_edge_geometry(self, keys, segments):
+        """World-space n8n-style Bezier polylines for many edges in one numpy pass."""
+        ends = np.array([(self.edges[k][0]["pos"].x + self.node_radius, self.edges[k][0]["pos"].y,
+                          self.edges[k][1]["pos"].x - self.node_radius, self.edges[k][1]["pos"].y) for k in keys], dtype=float)
+        start, end = ends[:, :2], ends[:, 2:]
+        dist = (end[:, 0] - start[:, 0]) / 2
+        dist[np.abs(dist) < 10] = 40
+        cp1, cp2 = start.copy(), end.copy()
+        cp1[:, 0] += dist
+        cp2[:, 0] -= dist
+        t = np.linspace(0, 1, segments + 1)[None, :, None]
+        pts = (1-t)**3 * start[:, None] + 3*(1-t)**2 * t * cp1[:, None] + 3*(1-t) * t**2 * cp2[:, None] + t**3 * end[:, None]
+        for k, poly, d in zip(keys, pts, dist):
+            self.edge_geometry[k] = (segments, poly, 1 if d > 0 else -1)
+
+    def draw_n8n_curve(self, surface, points, direction, color):
         pygame.draw.lines(surface, color, False, points, 2)
-        direction = end - cp2
-        if direction.length() == 0: direction = pygame.Vector2(1, 0)
-        self.draw_arrow_head(surface, end, direction, color)
+        self.draw_arrow_head(surface, pygame.Vector2(points[-1]), pygame.Vector2(direction, 0), color)
 
     def draw(self, surface, mouse_pos):
+        self.poll_layout()
         surface.fill((0, 0, 0, 0))
         current_radius = int(self.node_radius * self.zoom_level)
         screen_w, screen_h = surface.get_size()
 
-        # FIXED: When dragging, we must rebuild BOTH parent connections AND extra links
-        if self.dragged_node_id is not None:
-            self.connections =[]
-            pos_lookup = {n["id"]: n["pos"] for n in self.nodes}
-            
-            # Rebuild standard parent-child links
-            for n in self.nodes:
-                if n["parent_id"] in pos_lookup:
-                    self.connections.append((pos_lookup[n["parent_id"]], n["pos"]))
-                    
-            # Rebuild custom extra links
-            for src, targets in self.extra_links.items():
-                if src in pos_lookup:
-                    for tgt in targets:
-                        if tgt in pos_lookup:
-                            self.connections.append((pos_lookup[src], pos_lookup[tgt]))
-
-        for start, end in self.connections:
-            s = (start * self.zoom_level) + self.camera_offset
-            e = (end * self.zoom_level) + self.camera_offset
-            port_out = s + pygame.Vector2(current_radius, 0)
-            port_in = e - pygame.Vector2(current_radius, 0)
-
-            if max(s.x, e.x) < -50 or min(s.x, e.x) > screen_w + 50: continue
-            if max(s.y, e.y) < -50 or min(s.y, e.y) > screen_h + 50: continue
-
-            self.draw_n8n_curve(surface, port_out, port_in, (100, 100, 110))
-            pygame.draw.circle(surface, (150, 150, 160), port_out, 3)
-            pygame.draw.circle(surface, (150, 150, 160), port_in, 3)
-
-        for node in self.nodes:
+        view = self.visible_world_rect((screen_w, screen_h))
+        if self.zoom_level < LOD_ZOOM:
+            self.draw_lod(surface)
+            return
+        keys = sorted(self.edge_grid.query(*view))
+        segments = self.curve_segments()
+        stale = [k for k in keys if k not in self.edge_geometry or self.edge_geometry[k][0] != segments]
+        if stale: self._build_edge_geometry(stale, segments)
+
+        if keys:
+            # Only the camera transform runs per frame; the curves themselves are cached in world space
+            polys = np.stack([self.edge_geometry[k][1] for k in keys]) * self.zoom_level + (self.camera_offset.x, self.camera_offset.y)
+            lo, hi = polys.min(axis=1), polys.max(axis=1)
+            on_screen = (hi[:, 0] >= -50) & (lo[:, 0] <= screen_w + 50) & (hi[:, 1] >= -50) & (lo[:, 1] <= screen_h + 50)
+            for idx in np.flatnonzero(on_screen):
+                points = polys[idx].tolist()
+                self.draw_n8n_curve(surface, points, self.edge_geometry[keys[idx]][2], (100, 100, 110))
+                pygame.draw.circle(surface, (150, 150, 160), points[0], 3)
+                pygame.draw.circle(surface, (150, 150, 160), points[-1], 3)
+
+        for node_id in sorted(self.node_grid.query(*view)):
+            node = self.node_map[node_id]
             draw_pos = (node["pos"] * self.zoom_level) + self.camera_offset
             ix, iy = int(draw_pos.x), int(draw_pos.y)
             
             if not (-50 < ix < screen_w + 50) or not (-50 < iy < screen_h + 50): continue
 
-            is_match = self.search_filter.lower() in node["name"].lower() if self.search_filter else False
+            is_match = node_id in self.search_matches
             is_light = UITheme.BG_DARK[0] > 150
             search_color = (255, 255, 0) if not is_light else (180, 140, 0)
-            
-            if is_match and state.status_msg != "MATCH FOUND": state.status_msg = "MATCH FOUND"
 
             base_color = UITheme.NODE_MAIN if node["branch"] == "main" else UITheme.NODE_BRANCH
             
@@ -170,7 +403,7 @@ class VersionTree:
                 hl_color = UITheme.ACCENT_ORANGE if idx == 0 else (0, 255, 255)
                 pygame.draw.circle(surface, hl_color, (ix, iy), current_radius + 4, 3)
             
-            if is_match and self.search_filter:
+            if is_match:
                 pygame.draw.circle(surface, search_color, (ix, iy), current_radius + 8, 3)
 
             pygame.draw.circle(surface, UITheme.PANEL_GREY, (ix, iy), current_radius)
@@ -179,19 +412,63 @@ class VersionTree:
             if node["id"] in state.inconsistent_nodes:
                 badge_pos = (ix + current_radius - 5, iy - current_radius + 5)
                 pygame.draw.circle(surface, (255, 50, 50), badge_pos, 8)
-                excl = self.font.render("!", True, (255, 255, 255))
+                excl = text_cache.render(self.font, "!", True, (255, 255, 255))
                 surface.blit(excl, (badge_pos[0] - excl.get_width()//2, badge_pos[1] - excl.get_height()//2))
 
             if self.zoom_level > 0.6:
-                id_txt = self.font.render(str(node["id"]), True, UITheme.TEXT_OFF_WHITE)
+                id_txt = text_cache.render(self.font, str(node["id"]), True, UITheme.TEXT_OFF_WHITE)
                 surface.blit(id_txt, id_txt.get_rect(center=(ix, iy)))
                 
                 name_trunc = node["name"][:15] + ".." if len(node["name"]) > 15 else node["name"]
                 name_col = search_color if is_match else UITheme.TEXT_DIM
-                name_txt = self.font.render(name_trunc, True, name_col)
+                name_txt = text_cache.render(self.font, name_trunc, True, name_col)
                 surface.blit(name_txt, (ix - 30, iy + current_radius + 5))
 
 
+    def _build_minimap_layer(self, map_w, map_h):
+        if self.minimap_dirty or self.minimap_points is None:
+            # Node pixels only change with positions; selection/palette changes reuse them
+            pos = np.array([(n["pos"].x, n["pos"].y) for n in self.nodes], dtype=float)
+            min_x, min_y = pos.min(axis=0)
+            max_x, max_y = pos.max(axis=0)
+            padding = 100
+            min_x -= padding; min_y -= padding; max_x += padding; max_y += padding
+            world_w = max_x - min_x; world_h = max_y - min_y
+            if world_w < 1: world_w = 1
+            if world_h < 1: world_h = 1
+
+            scale_x = map_w / world_w
+            scale_y = map_h / world_h
+            scale = min(scale_x, scale_y)
+            ids = np.array([n["id"] for n in self.nodes])
+            is_branch = np.array([n["branch"] != "main" for n in self.nodes])
+            self.minimap_points = (((pos - (min_x, min_y)) * scale).astype(int), ids, is_branch)
+            self.minimap_internals = {"min_x": min_x, "min_y": min_y, "scale": scale}
+            self.minimap_dirty = False
+
+        # Rasterized with numpy: every node becomes a small disk, however many share a pixel
+        pix, ids, is_branch = self.minimap_points
+        rgb = np.empty((map_w, map_h, 3), dtype=np.uint8)
+        rgb[:] = (15, 15, 20)
+        alpha = np.full((map_w, map_h), 220, dtype=np.uint8)
+        selected = np.isin(ids, state.selected_ids)
+        for mask, col in (((~is_branch) & (~selected), (100, 100, 100)), (is_branch, UITheme.NODE_BRANCH), ((~is_branch) & selected, UITheme.ACCENT_ORANGE)):
+            hit = np.zeros((map_w + 4, map_h + 4), dtype=bool)
+            pts = pix[mask]
+            pts = pts[(pts[:, 0] >= -2) & (pts[:, 0] < map_w + 2) & (pts[:, 1] >= -2) & (pts[:, 1] < map_h + 2)]
+            hit[pts[:, 0] + 2, pts[:, 1] + 2] = True
+            disk = np.zeros((map_w, map_h), dtype=bool)
+            for dx, dy in MINIMAP_DOT:
+                disk |= hit[2 + dx:2 + dx + map_w, 2 + dy:2 + dy + map_h]
+            rgb[disk] = col
+            alpha[disk] = 255
+
+        layer = pygame.Surface((map_w, map_h), pygame.SRCALPHA)
+        pygame.surfarray.blit_array(layer, rgb)
+        pygame.surfarray.pixels_alpha(layer)[:] = alpha
+        pygame.draw.rect(layer, UITheme.ACCENT_ORANGE, layer.get_rect(), 1)
+        self.minimap_layer = layer
+
     def draw_minimap(self, surface, panel_rect, icons=None):
         if not self.nodes: return
         map_w, map_h = 160, 120
@@ -205,7 +482,7 @@ class VersionTree:
             else:
                 pygame.draw.rect(surface, UITheme.PANEL_GREY, self.minimap_btn_rect)
                 pygame.draw.rect(surface, UITheme.ACCENT_ORANGE, self.minimap_btn_rect, 1)
-                surface.blit(self.font.render("+", True, UITheme.ACCENT_ORANGE), (self.minimap_btn_rect.x + 6, self.minimap_btn_rect.y + 2))
+                surface.blit(text_cache.render(self.font, "+", True, UITheme.ACCENT_ORANGE), (self.minimap_btn_rect.x + 6, self.minimap_btn_rect.y + 2))
             return
 
         self.minimap_rect = pygame.Rect(dest_x, dest_y, map_w, map_h)
@@ -214,36 +491,18 @@ class VersionTree:
         if icons and icons.get('collapse'): surface.blit(icons['collapse'], (self.minimap_btn_rect.x, self.minimap_btn_rect.y))
         else:
             pygame.draw.rect(surface, (50, 20, 20), self.minimap_btn_rect)
-            surface.blit(self.font.render("_", True, (255, 255, 255)), (self.minimap_btn_rect.x + 6, self.minimap_btn_rect.y - 4))
-
-        s = pygame.Surface((map_w, map_h))
-        s.set_alpha(220)
-        s.fill((15, 15, 20))
-        surface.blit(s, (dest_x, dest_y))
-        pygame.draw.rect(surface, UITheme.ACCENT_ORANGE, self.minimap_rect, 1)
-
-        all_x =[n["pos"].x for n in self.nodes]
-        all_y = [n["pos"].y for n in self.nodes]
-        min_x, max_x = min(all_x), max(all_x)
-        min_y, max_y = min(all_y), max(all_y)
-        padding = 100
-        min_x -= padding; min_y -= padding; max_x += padding; max_y += padding
-        world_w = max_x - min_x; world_h = max_y - min_y
-        if world_w < 1: world_w = 1
-        if world_h < 1: world_h = 1
-
-        scale_x = map_w / world_w
-        scale_y = map_h / world_h
-        scale = min(scale_x, scale_y)
-        
-        self.minimap_internals = {"min_x": min_x, "min_y": min_y, "scale": scale, "dest_x": dest_x, "dest_y": dest_y}
+            surface.blit(text_cache.render(self.font, "_", True, (255, 255, 255)), (self.minimap_btn_rect.x + 6, self.minimap_btn_rect.y - 4))
+
+        # The node layer is only redrawn when positions, selection or palette changed, and not mid-drag
+        layer_key = (tuple(state.selected_ids), UITheme.ACCENT_ORANGE, UITheme.NODE_BRANCH)
+        if self.minimap_layer is None or ((self.minimap_dirty or layer_key != self.minimap_layer_key) and self.dragged_node_id is None):
+            self._build_minimap_layer(map_w, map_h)
+            self.minimap_layer_key = layer_key
+        surface.blit(self.minimap_layer, (dest_x, dest_y))
 
-        for node in self.nodes:
-            mx = dest_x + (node["pos"].x - min_x) * scale
-            my = dest_y + (node["pos"].y - min_y) * scale
-            col = UITheme.ACCENT_ORANGE if node["id"] in state.selected_ids else (100, 100, 100)
-            if node["branch"] != "main": col = UITheme.NODE_BRANCH
-            if self.minimap_rect.collidepoint(mx, my): pygame.draw.circle(surface, col, (mx, my), 2)
+        data = self.minimap_internals
+        data["dest_x"], data["dest_y"] = dest_x, dest_y
+        min_x, min_y, scale = data["min_x"], data["min_y"], data["scale"]
 
         view_world_x = -self.camera_offset.x / self.zoom_level
         view_world_y = -self.camera_offset.y / self.zoom_level
@@ -280,11 +539,13 @@ class VersionTree:
         current_radius = self.node_radius * self.zoom_level
         clicked_node = None
         
-        for node in self.nodes:
-            draw_pos = (node["pos"] * self.zoom_level) + self.camera_offset
-            if draw_pos.distance_to(local_mouse) < current_radius + 5:
-                clicked_node = node["id"]
-                break
+        world_mouse = (local_mouse - self.camera_offset) / self.zoom_level
+        best = None
+        for node_id in self.node_grid.query_point(world_mouse.x, world_mouse.y, (current_radius + 5) / self.zoom_level):
+            draw_pos = (self.node_map[node_id]["pos"] * self.zoom_level) + self.camera_offset
+            dist = draw_pos.distance_to(local_mouse)
+            if dist < current_radius + 5 and (best is None or dist < best):
+                clicked_node, best = node_id, dist
         
         if clicked_node:
             keys = pygame.key.get_pressed()
@@ -304,10 +565,15 @@ class VersionTree:
         local_x = mouse_pos[0] - panel_rect[0]
         local_y = mouse_pos[1] - panel_rect[1]
         tree_mouse = (pygame.Vector2(local_x, local_y) - self.camera_offset) / self.zoom_level
-        tree_mouse.x = max(-2000, min(5000, tree_mouse.x))
-        tree_mouse.y = max(-2000, min(5000, tree_mouse.y))
-        for node in self.nodes:
-            if node["id"] == self.dragged_node_id:
-                node["pos"] = tree_mouse
-                node["manual_offset"] = node["pos"] - node["base_pos"]
-                break
\ No newline at end of file
+        node = self.node_map.get(self.dragged_node_id)
+        if node and node["pos"] != tree_mouse:
+            node["pos"] = tree_mouse
+            node["manual_offset"] = node["pos"] - node["base_pos"]
+            self.drag_moved = True
+            self.move_node(node)
+
+    def end_drag(self):
+        node = self.node_map.get(self.dragged_node_id)
+        if node and self.drag_moved and self.on_node_moved: self.on_node_moved(node)
+        self.dragged_node_id = None
+        self.drag_moved = False
\ No newline at end of file
@@ -0,0 +1,98 @@
+# --- FILE: ui/frame_scheduler.py ---
+import pygame
+
+class FrameScheduler:
+    """Decides when and where the main loop redraws.
+
+    The screen is split into a few fixed regions. Input, worker results and
+    animations mark regions dirty; a frame is drawn only when something is
+    dirty, clipped to the dirty area and pushed with display.update(rects).
+    When nothing has happened for linger_ms the loop sleeps in event.wait at
+    idle_fps, waking immediately on input.
+    """
+    REGIONS = {
+        "status": pygame.Rect(0, 0, 1280, 78),    # Header, menus, search bar, status line
+        "tree": pygame.Rect(0, 78, 830, 642),     # Tree panel, minimap, zoom buttons
+        "side": pygame.Rect(830, 78, 450, 642),   # Plot, analysis, metadata editor, ADD/BRANCH
+    }
+    SCREEN = pygame.Rect(0, 0, 1280, 720)
+
+    def __init__(self, fps=60, idle_fps=4, linger_ms=500):
+        self.fps = fps
+        self.idle_fps = idle_fps
+        self.linger_ms = linger_ms
+        self.full = True
+        self.dirty = set()
+        self.clip = None
+        self.last_activity = 0
+        self.phases = {}
+        self.frames_drawn = 0
+
+    def invalidate(self, *regions):
+        """Marks regions for redraw; no arguments means the whole screen."""
+        if not regions: self.full = True
+        self.dirty.update(regions)
+        self.last_activity = pygame.time.get_ticks()
+
+    def invalidate_at(self, pos):
+        for name, rect in self.REGIONS.items():
+            if rect.collidepoint(pos):
+                self.invalidate(name)
+                return
+        self.invalidate()
+
+    def note_events(self, events, overlay_open):
+        """Maps input to dirty regions. Open dropdowns/modals span regions, so they redraw everything."""
+        for event in events:
+            if event.type == pygame.MOUSEMOTION and not overlay_open:
+                self.invalidate_at(event.pos)
+                self.invalidate_at((event.pos[0] - event.rel[0], event.pos[1] - event.rel[1])) # Hover-out
+            elif event.type == pygame.MOUSEWHEEL and not overlay_open:
+                self.invalidate_at(pygame.mouse.get_pos())
+            else:
+                self.invalidate()
+
+    def blink(self, region=None, period_ms=500):
+        """Redraws region (None = everything) when a blink of the given period flips (text cursors).
+
+        Unlike invalidate this doesn't count as activity, so a blinking cursor alone runs at idle_fps.
+        """
+        phase = pygame.time.get_ticks() // period_ms
+        if self.phases.get(region) != phase:
+            self.phases[region] = phase
+            if region is None: self.full = True
+            else: self.dirty.add(region)
+
+    def begin_frame(self, screen):
+        """Clips the screen to the dirty area; returns False when there is nothing to draw."""
+        if self.full: self.clip = self.SCREEN.copy()
+        elif self.dirty:
+            rects = [self.REGIONS[name] for name in self.dirty]
+            self.clip = rects[0].unionall(rects[1:])
+        else: return False
+        screen.set_clip(self.clip)
+        return True
+
+    def wants(self, region):
+        """True if region is inside this frame's clip, so expensive drawing there isn't wasted."""
+        return self.clip is not None and self.clip.colliderect(self.REGIONS[region])
+
+    def present(self, screen):
+        screen.set_clip(None)
+        if self.full: pygame.display.flip()
+        else: pygame.display.update(self.clip)
+        self.full = False
+        self.dirty.clear()
+        self.clip = None
+        self.frames_drawn += 1
+
+    def wait(self, clock):
+        if pygame.time.get_ticks() - self.last_activity < self.linger_ms:
+            clock.tick(self.fps)
+            return
+        event = pygame.event.wait(1000 // self.idle_fps)
+        if event.type != pygame.NOEVENT: pygame.event.post(event)
+        clock.tick()
+
+# Global Instance
+frame_scheduler = FrameScheduler()
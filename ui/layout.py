@@ -1,10 +1,12 @@
 # --- FILE: ui/layout.py ---
+import pygame
 from ui.components import Button
 from settings import UITheme
 
 SCREEN_CENTER_X = 1280 // 2
 BTN_WIDTH = 280
 BTN_X = SCREEN_CENTER_X - (BTN_WIDTH // 2)
+SEARCH_RESULT_ROWS = 8
 
 class UILayout:
     def __init__(self):
@@ -19,11 +21,12 @@ class UILayout:
         self.btn_branch = Button(1050, 640, 180, 40, "NEW BRANCH", UITheme.NODE_BRANCH)
 
         # --- ADD POPUP BUTTONS ---
-        self.btn_add_popup_node = Button(850, 480, 180, 40, "ADD NODE", UITheme.PANEL_GREY)
-        self.btn_add_popup_image = Button(850, 520, 180, 40, "ADD IMAGE", UITheme.PANEL_GREY)
-        self.btn_add_popup_linkage = Button(850, 560, 180, 40, "ADD LINKAGE", UITheme.PANEL_GREY)
+        self.btn_add_popup_node = Button(850, 440, 180, 40, "ADD NODE", UITheme.PANEL_GREY)
+        self.btn_add_popup_image = Button(850, 480, 180, 40, "ADD IMAGE", UITheme.PANEL_GREY)
+        self.btn_add_popup_linkage = Button(850, 520, 180, 40, "ADD LINKAGE", UITheme.PANEL_GREY)
+        self.btn_add_popup_import = Button(850, 560, 180, 40, "IMPORT FOLDER", UITheme.PANEL_GREY)
         self.btn_add_popup_more = Button(850, 600, 180, 40, "MORE", UITheme.PANEL_GREY)
-        for b in[self.btn_add_popup_node, self.btn_add_popup_image, self.btn_add_popup_linkage, self.btn_add_popup_more]:
+        for b in[self.btn_add_popup_node, self.btn_add_popup_image, self.btn_add_popup_linkage, self.btn_add_popup_import, self.btn_add_popup_more]:
             b.fill_color = "BG_DARK"
         
         # DASHBOARD - CONTEXT ICONS
@@ -102,4 +105,8 @@ class UILayout:
         self.btn_del_confirm = Button(SCREEN_CENTER_X - 110, 400, 100, 40, "CONFIRM", (200, 50, 50))
         self.btn_del_cancel = Button(SCREEN_CENTER_X + 10, 400, 100, 40, "CANCEL", UITheme.PANEL_GREY)
 
+    def search_result_rect(self, idx):
+        """Row rect of the ranked search-result dropdown under the search bar."""
+        return pygame.Rect(850, 67 + idx * 28, 380, 28)
+
 layout = UILayout()
\ No newline at end of file
@@ -0,0 +1,56 @@
+# --- FILE: ui/lod.py ---
+import math
+import numpy as np
+from ui.tree_layout import GEN_SPACING, ROW_SPACING
+
+LOD_ZOOM = 0.35    # Below this zoom VersionTree draws clusters instead of nodes
+LOD_MIN_PX = 64    # A cluster cell is at least this wide on screen
+
+def lod_level(zoom):
+    """Cells double in size per level, so clusters split progressively while zooming in."""
+    return max(0, math.ceil(math.log2(LOD_MIN_PX / (GEN_SPACING * zoom))))
+
+class TreeArrays:
+    """Flat numpy view of the tree shared by every ClusterLevel (rebuilt when nodes or edges change)."""
+    def __init__(self, nodes, edges):
+        self.row = {n["id"]: i for i, n in enumerate(nodes)}
+        self.pos = np.array([(n["pos"].x, n["pos"].y) for n in nodes], dtype=float).reshape(-1, 2)
+        codes = {"main": 0}
+        self.branch = np.array([codes.setdefault(n["branch"], len(codes)) for n in nodes], dtype=np.int64)
+        pairs = [(self.row[src["id"]], self.row[dst["id"]]) for src, dst in edges if src["id"] in self.row and dst["id"] in self.row]
+        self.edges = np.array(pairs, dtype=np.int64).reshape(-1, 2)
+
+class ClusterLevel:
+    """Nodes bucketed per branch into grid cells; each bucket collapses into one segment.
+
+    Cluster i spans x0[i]..x1[i] at height y[i] (world space) and holds count[i]
+    nodes. links holds each pair of distinct clusters joined by an edge once.
+    """
+    def __init__(self, arrays, level):
+        cell = np.floor(arrays.pos / (GEN_SPACING * 2 ** level, ROW_SPACING * 2 ** level)).astype(np.int64)
+        keys = np.column_stack([arrays.branch, cell])
+        uniq, inverse = np.unique(keys, axis=0, return_inverse=True)
+        self.node_cluster = inverse.reshape(-1)
+        k = len(uniq)
+        self.is_main = uniq[:, 0] == 0
+        self.count = np.bincount(self.node_cluster, minlength=k)
+        self.x0 = np.full(k, np.inf)
+        self.x1 = np.full(k, -np.inf)
+        np.minimum.at(self.x0, self.node_cluster, arrays.pos[:, 0])
+        np.maximum.at(self.x1, self.node_cluster, arrays.pos[:, 0])
+        self.y = np.bincount(self.node_cluster, weights=arrays.pos[:, 1], minlength=k) / np.maximum(self.count, 1)
+
+        a, b = self.node_cluster[arrays.edges[:, 0]], self.node_cluster[arrays.edges[:, 1]]
+        self.links = np.unique(np.column_stack([a, b])[a != b], axis=0).reshape(-1, 2)
+
+    def visible(self, zoom, offset, size, margin=50):
+        """Screen-space cluster and link coordinates, culled to the surface."""
+        w, h = size
+        sx0, sx1, sy = self.x0 * zoom + offset[0], self.x1 * zoom + offset[0], self.y * zoom + offset[1]
+        on = (sx1 >= -margin) & (sx0 <= w + margin) & (sy >= -margin) & (sy <= h + margin)
+        a, b = self.links[:, 0], self.links[:, 1]
+        lx0, lx1, ly0, ly1 = sx1[a], sx0[b], sy[a], sy[b]
+        link_on = (np.maximum(lx0, lx1) >= -margin) & (np.minimum(lx0, lx1) <= w + margin) & \
+                  (np.maximum(ly0, ly1) >= -margin) & (np.minimum(ly0, ly1) <= h + margin)
+        clusters = np.flatnonzero(on)
+        return clusters, sx0, sx1, sy, np.column_stack([lx0, ly0, lx1, ly1])[link_on]
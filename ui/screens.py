@@ -3,8 +3,11 @@ import pygame
 import os
 from settings import UITheme
 from state_manager import state
-from ui.layout import layout, SCREEN_CENTER_X
+from ui.layout import layout, SCREEN_CENTER_X, SEARCH_RESULT_ROWS
 from ui.components import draw_loading_overlay
+from ui.styles import theme
+from ui.text_cache import text_cache
+from ui.frame_scheduler import frame_scheduler
 
 class RenderEngine:
     def __init__(self, screen):
@@ -13,6 +16,9 @@ class RenderEngine:
         self.font_bold = pygame.font.SysFont("Consolas", 18, bold=True)
         self.font_header = pygame.font.SysFont("Consolas", 32, bold=True)
         self.font_small = pygame.font.SysFont("Consolas", 10)
+        self.layers = {} # (name, theme, size) -> pre-rendered static surface, see layer()
+        self.tree_surf = pygame.Surface((800, 600), pygame.SRCALPHA) # Reused every frame; VersionTree.draw clears it
+        self.ai_report = None # (content key, pre-rendered report surface)
         
         self.icons = {}
         try:
@@ -34,6 +40,35 @@ class RenderEngine:
         self.icons['settings'] = load_icon("image/setting_icon.webp", (30, 30))
         self.icons['graph'] = load_icon("image/graph.png", (30, 30))
 
+    # --- STATIC LAYERS ---
+    def layer(self, name, size, paint, alpha=False):
+        """Surface painted once by paint(surface) and reused until the theme or size changes."""
+        key = (name, theme.mode, size)
+        surf = self.layers.get(key)
+        if surf is None:
+            surf = pygame.Surface(size, pygame.SRCALPHA) if alpha else pygame.Surface(size)
+            paint(surf)
+            self.layers[key] = surf
+        return surf
+
+    def dim(self, rgba, size=(1280, 720)):
+        """Translucent full-screen fill behind modals."""
+        return self.layer(("dim", rgba), size, lambda s: s.fill(rgba), alpha=True)
+
+    def _paint_backdrop(self, surf, color=None):
+        surf.fill(color or UITheme.BG_DARK)
+        UITheme.draw_grid(surf)
+
+    def _paint_dashboard(self, surf):
+        self._paint_backdrop(surf)
+        pygame.draw.rect(surf, UITheme.PANEL_GREY, (0, 0, 1280, 70))
+        pygame.draw.line(surf, UITheme.ACCENT_ORANGE, (0, 70), (1280, 70), 2)
+
+    def _paint_side_panel(self, surf):
+        # 2px transparent margin so the bracket strokes aren't cut off
+        pygame.draw.rect(surf, UITheme.PANEL_GREY, (2, 2, 420, 600))
+        UITheme.draw_bracket(surf, (2, 2, 420, 600), (100, 100, 100))
+
     def draw_splash(self, mouse_pos):
         self.screen.fill(UITheme.BG_LOGIN)
         if self.logo_img: self.screen.blit(self.logo_img, self.logo_img.get_rect(center=(SCREEN_CENTER_X, 230)))
@@ -45,18 +80,17 @@ class RenderEngine:
             box_rect = pygame.Rect(SCREEN_CENTER_X - 225, 380, 450, 240)
             pygame.draw.rect(self.screen, (20, 20, 35), box_rect, border_radius=10)
             UITheme.draw_bracket(self.screen, box_rect, UITheme.ACCENT_ORANGE)
-            self.screen.blit(self.font_bold.render("RESEARCHER IDENTITY", True, (255, 255, 255)), (SCREEN_CENTER_X - 100, 410))
+            self.screen.blit(text_cache.render(self.font_bold, "RESEARCHER IDENTITY", True, (255, 255, 255)), (SCREEN_CENTER_X - 100, 410))
             input_rect = pygame.Rect(SCREEN_CENTER_X - 190, 450, 380, 45)
             pygame.draw.rect(self.screen, (10, 10, 20), input_rect)
             pygame.draw.rect(self.screen, UITheme.ACCENT_ORANGE, input_rect, 2)
             txt = state.researcher_name + "|"
-            self.screen.blit(self.font_bold.render(txt, True, (255, 255, 255)), (input_rect.x + 10, input_rect.y + 12))
+            self.screen.blit(text_cache.render(self.font_bold, txt, True, (255, 255, 255)), (input_rect.x + 10, input_rect.y + 12))
             layout.btn_confirm.check_hover(mouse_pos)
             layout.btn_confirm.draw(self.screen, self.font_main)
 
     def draw_onboarding(self, mouse_pos):
-        self.screen.fill(UITheme.BG_DARK)
-        UITheme.draw_grid(self.screen)
+        self.screen.blit(self.layer("backdrop", self.screen.get_size(), self._paint_backdrop), (0, 0))
         panel_w, panel_h = 560, 260
         panel = pygame.Rect(0, 0, panel_w, panel_h)
         panel.center = (SCREEN_CENTER_X, 175)
@@ -64,16 +98,14 @@ class RenderEngine:
         pygame.draw.rect(self.screen, logo_blue, panel, border_radius=12)
         pygame.draw.rect(self.screen, UITheme.GRID_COLOR, panel, 1, border_radius=12)
         UITheme.draw_bracket(self.screen, panel, UITheme.ACCENT_ORANGE)
-        tint = pygame.Surface((panel_w, panel_h), pygame.SRCALPHA)
-        tint.fill((0, 0, 0, 30))
-        self.screen.blit(tint, panel.topleft)
+        self.screen.blit(self.dim((0, 0, 0, 30), (panel_w, panel_h)), panel.topleft)
         if self.logo_img:
             old_clip = self.screen.get_clip()
             self.screen.set_clip(panel)
             self.screen.blit(self.logo_img, self.logo_img.get_rect(center=panel.center))
             self.screen.set_clip(old_clip)
-        msg1 = self.font_header.render("WELCOME TO THE LAB", True, UITheme.TEXT_OFF_WHITE)
-        msg2 = self.font_bold.render("To begin, please upload your first experimental CSV file.", True, UITheme.TEXT_DIM)
+        msg1 = text_cache.render(self.font_header, "WELCOME TO THE LAB", True, UITheme.TEXT_OFF_WHITE)
+        msg2 = text_cache.render(self.font_bold, "To begin, please upload your first experimental CSV file.", True, UITheme.TEXT_DIM)
         self.screen.blit(msg1, (SCREEN_CENTER_X - msg1.get_width()//2, 320))
         self.screen.blit(msg2, (SCREEN_CENTER_X - msg2.get_width()//2, 370))
         for b in[layout.btn_onboard_upload, layout.btn_skip_onboarding]:
@@ -81,67 +113,67 @@ class RenderEngine:
             b.draw(self.screen, self.font_main)
 
     def draw_editor(self, mouse_pos):
-        self.screen.fill((10, 10, 12))
-        UITheme.draw_grid(self.screen)
+        self.screen.blit(self.layer("editor_backdrop", self.screen.get_size(), lambda s: self._paint_backdrop(s, (10, 10, 12))), (0, 0))
         pygame.draw.rect(self.screen, UITheme.PANEL_GREY, (0, 0, 1280, 60))
         filename = os.path.basename(state.editor_file_path) if state.editor_file_path else "Unknown"
-        self.screen.blit(self.font_bold.render(f"EDITING: {filename}", True, UITheme.ACCENT_ORANGE), (20, 20))
-        self.screen.blit(self.font_main.render("Arrow Keys to Navigate | Enter to Confirm | Save to Commit", True, UITheme.TEXT_DIM), (500, 22))
+        self.screen.blit(text_cache.render(self.font_bold, f"EDITING: {filename}", True, UITheme.ACCENT_ORANGE), (20, 20))
+        self.screen.blit(text_cache.render(self.font_main, "Arrow Keys to Navigate | Enter to Confirm | Save to Commit", True, UITheme.TEXT_DIM), (500, 22))
         start_x, start_y = 50, 100
         cell_w, cell_h = 100, 30
-        if state.editor_df is not None:
-            cols = state.editor_df.columns
-            for c_idx, col_name in enumerate(cols):
-                cx = start_x + (c_idx * cell_w)
-                if cx > 1200: break
+        row_limit, col_limit = 15, 12
+        table = state.editor_table
+        if table is not None:
+            # Only the visible window is touched; pages outside it load in the background
+            first_row, first_col = int(state.editor_scroll_y), int(state.editor_scroll_x)
+            last_row = min(table.row_count, first_row + row_limit)
+            cols = range(first_col, min(len(table.columns), first_col + col_limit))
+            table.request_rows(first_row, last_row)
+            for c_idx in cols:
+                cx = start_x + ((c_idx - first_col) * cell_w)
                 pygame.draw.rect(self.screen, (40, 40, 50), (cx, start_y - 30, cell_w, 30))
                 pygame.draw.rect(self.screen, (80, 80, 80), (cx, start_y - 30, cell_w, 30), 1)
-                self.screen.blit(self.font_small.render(col_name[:12], True, (255, 255, 255)), (cx + 5, start_y - 25))
-            row_limit = 15
-            visible_df = state.editor_df.iloc[int(state.editor_scroll_y):int(state.editor_scroll_y)+row_limit]
-            for r_idx, (idx, row) in enumerate(visible_df.iterrows()):
-                actual_row_idx = int(state.editor_scroll_y) + r_idx
-                ry = start_y + (r_idx * cell_h)
-                self.screen.blit(self.font_small.render(str(actual_row_idx), True, UITheme.TEXT_DIM), (10, ry + 8))
-                for c_idx, val in enumerate(row):
-                    cx = start_x + (c_idx * cell_w)
-                    if cx > 1200: break
+                self.screen.blit(text_cache.render(self.font_small, table.columns[c_idx][:12], True, (255, 255, 255)), (cx + 5, start_y - 25))
+            for actual_row_idx in range(first_row, last_row):
+                ry = start_y + ((actual_row_idx - first_row) * cell_h)
+                self.screen.blit(text_cache.render(self.font_small, str(actual_row_idx), True, UITheme.TEXT_DIM), (10, ry + 8))
+                for c_idx in cols:
+                    cx = start_x + ((c_idx - first_col) * cell_w)
                     rect = pygame.Rect(cx, ry, cell_w, cell_h)
                     is_selected = state.editor_selected_cell == (actual_row_idx, c_idx)
                     bg_col = (0, 60, 100) if is_selected else (20, 20, 25)
                     pygame.draw.rect(self.screen, bg_col, rect)
                     pygame.draw.rect(self.screen, (50, 50, 60), rect, 1)
-                    display_val = state.editor_input_buffer if is_selected else str(val)
-                    self.screen.blit(self.font_main.render(display_val[:12], True, (255, 255, 255)), (cx + 5, ry + 5))
+                    val = table.cell(actual_row_idx, c_idx)
+                    display_val = state.editor_input_buffer if is_selected else ("..." if val is None else val)
+                    color = UITheme.ACCENT_ORANGE if (actual_row_idx, c_idx) in table.overrides else (255, 255, 255)
+                    self.screen.blit(text_cache.render(self.font_main, display_val[:12], True, color), (cx + 5, ry + 5))
                     if is_selected: pygame.draw.rect(self.screen, UITheme.ACCENT_ORANGE, rect, 2)
+            rows_txt = f"ROWS {first_row}-{max(first_row, last_row - 1)} OF {table.row_count:,}" + ("" if table.complete else f" (INDEXING {table.progress:.0%})")
+            cols_txt = f"COLS {first_col + 1}-{first_col + len(cols)} OF {len(table.columns)}"
+            self.screen.blit(text_cache.render(self.font_main, f"{rows_txt} | {cols_txt} | SHIFT+WHEEL: COLUMNS", True, UITheme.TEXT_DIM), (200, 662))
         for b in[layout.btn_editor_save, layout.btn_editor_exit]:
             b.check_hover(mouse_pos)
             b.draw(self.screen, self.font_bold)
 
     def draw_ai_loading(self, mouse_pos):
-        overlay = pygame.Surface((1280, 720), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 245))
-        self.screen.blit(overlay, (0,0))
+        self.screen.blit(self.dim((0, 0, 0, 245)), (0, 0))
         UITheme.draw_scanning_lines(self.screen, pygame.time.get_ticks() // 20)
-        l1 = self.font_header.render("ESTABLISHING NEURAL LINK...", True, UITheme.ACCENT_ORANGE)
-        l2 = self.font_bold.render("TRANSMITTING EXPERIMENTAL DATA TO AZURE CLOUD", True, UITheme.TEXT_DIM)
+        l1 = text_cache.render(self.font_header, "ESTABLISHING NEURAL LINK...", True, UITheme.ACCENT_ORANGE)
+        l2 = text_cache.render(self.font_bold, "TRANSMITTING EXPERIMENTAL DATA TO AZURE CLOUD", True, UITheme.TEXT_DIM)
         self.screen.blit(l1, (SCREEN_CENTER_X - l1.get_width()//2, 300))
         self.screen.blit(l2, (SCREEN_CENTER_X - l2.get_width()//2, 350))
         layout.btn_ai_stop.check_hover(mouse_pos)
         layout.btn_ai_stop.draw(self.screen, self.font_bold)
 
     def draw_ai_popup(self, mouse_pos):
-        overlay = pygame.Surface((1280, 720), pygame.SRCALPHA)
-        if UITheme.BG_DARK[0] < 50: overlay.fill((0, 0, 0, 200))
-        else: overlay.fill((255, 255, 255, 120))
-        self.screen.blit(overlay, (0,0))
+        self.screen.blit(self.dim((0, 0, 0, 200) if UITheme.BG_DARK[0] < 50 else (255, 255, 255, 120)), (0, 0))
         w, h = 850, 560
         x, y = (1280 - w)//2, (720 - h)//2
         rect = pygame.Rect(x, y, w, h)
         pygame.draw.rect(self.screen, UITheme.PANEL_GREY, rect)
         pygame.draw.rect(self.screen, UITheme.ACCENT_ORANGE, rect, 2)
         UITheme.draw_bracket(self.screen, rect, UITheme.ACCENT_ORANGE)
-        self.screen.blit(self.font_header.render("AI ANALYSIS REPORT", True, UITheme.TEXT_OFF_WHITE), (x + 20, y + 20))
+        self.screen.blit(text_cache.render(self.font_header, "AI ANALYSIS REPORT", True, UITheme.TEXT_OFF_WHITE), (x + 20, y + 20))
         content_x = x + 40
         content_y = y + 95
         content_w = w - 80
@@ -151,54 +183,57 @@ class RenderEngine:
         pygame.draw.rect(self.screen, UITheme.GRID_COLOR, content_rect, 1, border_radius=6)
         pad = 14
         inner_rect = content_rect.inflate(-pad*2, -pad*2)
-        text_x = inner_rect.x + 10
         wrap_w = inner_rect.w - 20
-        self.screen.set_clip(inner_rect)
         if not hasattr(state, "ai_popup_scroll_y"): state.ai_popup_scroll_y = 0
-        scroll_y = state.ai_popup_scroll_y
-        y_cursor = inner_rect.y - scroll_y
-        content_start_y = inner_rect.y
-        data = state.ai_popup_data or {}
-        summary = data.get("summary", "No Data.")
-        self.screen.blit(self.font_bold.render("SUMMARY", True, UITheme.ACCENT_ORANGE), (inner_rect.x, y_cursor))
-        y_cursor += 34
-        y_cursor += UITheme.render_terminal_text(self.screen, summary, (text_x , y_cursor), self.font_main, UITheme.TEXT_OFF_WHITE, wrap_w) + 12
-        anomalies = data.get("anomalies", []) or[]
-        if anomalies:
-            self.screen.blit(self.font_bold.render("DETECTED ANOMALIES", True, UITheme.ACCENT_ORANGE), (inner_rect.x, y_cursor))
-            y_cursor += 34
-            for idx, item in enumerate(anomalies, start=1):
-                line = f"{idx}. {item}"
-                y_cursor += UITheme.render_terminal_text(self.screen, line, (text_x, y_cursor), self.font_main, (255, 120, 120), wrap_w) + 6
-            y_cursor += 8
-        next_steps = data.get("next_steps", "")
-        if next_steps:
-            self.screen.blit(self.font_bold.render("NEXT STEPS", True, UITheme.ACCENT_ORANGE), (inner_rect.x, y_cursor))
-            y_cursor += 34
-            y_cursor += UITheme.render_terminal_text(self.screen, next_steps, (text_x, y_cursor), self.font_main, UITheme.TEXT_OFF_WHITE, wrap_w) + 10
-        content_end_y_no_scroll = y_cursor + scroll_y
-        total_content_h = content_end_y_no_scroll - content_start_y
-        max_scroll = max(0, int(total_content_h - inner_rect.h + 20))
+        report = self.ai_report_surface(state.ai_popup_data or {}, inner_rect.w, wrap_w)
+        max_scroll = max(0, report.get_height() - inner_rect.h + 20)
         state.ai_popup_scroll_y = max(0, min(state.ai_popup_scroll_y, max_scroll))
-        self.screen.set_clip(None)
+        self.screen.blit(report, inner_rect.topleft, pygame.Rect(0, state.ai_popup_scroll_y, inner_rect.w, inner_rect.h))
         layout.btn_popup_close.check_hover(mouse_pos)
         layout.btn_popup_close.draw(self.screen, self.font_bold)
         layout.btn_popup_download.check_hover(mouse_pos)
         layout.btn_popup_download.draw(self.screen, self.font_bold)
 
+    def ai_report_surface(self, data, width, wrap_w):
+        """The whole AI report pre-rendered as one tall surface; the popup scrolls by blitting a window of it."""
+        summary = data.get("summary", "No Data.")
+        anomalies = data.get("anomalies", []) or[]
+        next_steps = data.get("next_steps", "")
+        key = (summary, tuple(str(a) for a in anomalies), next_steps, width, wrap_w, theme.mode)
+        if self.ai_report and self.ai_report[0] == key: return self.ai_report[1]
+
+        step = self.font_main.get_linesize() + 2
+        titles, paragraphs, y = [], [], 0
+        def section(title, texts, color, gap, tail=0):
+            nonlocal y
+            titles.append((title, y))
+            y += 34
+            for text in texts:
+                paragraphs.append((text, color, y))
+                y += len(text_cache.wrap(self.font_main, text, wrap_w)) * step + gap
+            y += tail
+        section("SUMMARY", [summary], UITheme.TEXT_OFF_WHITE, 12)
+        if anomalies: section("DETECTED ANOMALIES", [f"{idx}. {item}" for idx, item in enumerate(anomalies, start=1)], (255, 120, 120), 6, tail=8)
+        if next_steps: section("NEXT STEPS", [next_steps], UITheme.TEXT_OFF_WHITE, 10)
+
+        surf = pygame.Surface((width, max(1, y)))
+        surf.fill(UITheme.PANEL_GREY)
+        for title, ty in titles: surf.blit(text_cache.render(self.font_bold, title, True, UITheme.ACCENT_ORANGE), (0, ty))
+        for text, color, py in paragraphs: UITheme.render_terminal_text(surf, text, (10, py), self.font_main, color, wrap_w)
+        self.ai_report = (key, surf)
+        return surf
+
     def draw_api_config_modal(self, mouse_pos):
-        overlay = pygame.Surface((1280, 720), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 220))
-        self.screen.blit(overlay, (0,0))
+        self.screen.blit(self.dim((0, 0, 0, 220)), (0, 0))
         w, h = 600, 400
         x, y = (1280 - w)//2, (720 - h)//2
         rect = pygame.Rect(x, y, w, h)
         pygame.draw.rect(self.screen, UITheme.PANEL_GREY, rect)
         pygame.draw.rect(self.screen, UITheme.ACCENT_ORANGE, rect, 2)
         UITheme.draw_bracket(self.screen, rect, UITheme.ACCENT_ORANGE)
-        self.screen.blit(self.font_header.render("CONFIGURE AI CREDENTIALS", True, UITheme.TEXT_OFF_WHITE), (x + 20, y + 20))
-        self.screen.blit(self.font_main.render("Enter Azure OpenAI details. Use CTRL+V to paste.", True, UITheme.TEXT_DIM), (x + 20, y + 60))
-        lbl_key = self.font_bold.render("API KEY:", True, UITheme.ACCENT_ORANGE)
+        self.screen.blit(text_cache.render(self.font_header, "CONFIGURE AI CREDENTIALS", True, UITheme.TEXT_OFF_WHITE), (x + 20, y + 20))
+        self.screen.blit(text_cache.render(self.font_main, "Enter Azure OpenAI details. Use CTRL+V to paste.", True, UITheme.TEXT_DIM), (x + 20, y + 60))
+        lbl_key = text_cache.render(self.font_bold, "API KEY:", True, UITheme.ACCENT_ORANGE)
         self.screen.blit(lbl_key, (x + 40, y + 100))
         key_rect = pygame.Rect(x + 40, y + 130, 520, 40)
         col_key = (30, 30, 40) if state.api_active_field != 0 else (50, 50, 60)
@@ -207,8 +242,8 @@ class RenderEngine:
         pygame.draw.rect(self.screen, border_key, key_rect, 1)
         key_txt = state.api_key_buffer + ("|" if state.api_active_field == 0 and (pygame.time.get_ticks()//500)%2==0 else "")
         display_key = key_txt if len(key_txt) < 4 else "*" * (len(key_txt)-1) + key_txt[-1]
-        self.screen.blit(self.font_main.render(display_key, True, UITheme.TEXT_OFF_WHITE), (key_rect.x + 10, key_rect.y + 10))
-        lbl_end = self.font_bold.render("ENDPOINT URL:", True, UITheme.ACCENT_ORANGE)
+        self.screen.blit(text_cache.render(self.font_main, display_key, True, UITheme.TEXT_OFF_WHITE), (key_rect.x + 10, key_rect.y + 10))
+        lbl_end = text_cache.render(self.font_bold, "ENDPOINT URL:", True, UITheme.ACCENT_ORANGE)
         self.screen.blit(lbl_end, (x + 40, y + 190))
         end_rect = pygame.Rect(x + 40, y + 220, 520, 40)
         col_end = (30, 30, 40) if state.api_active_field != 1 else (50, 50, 60)
@@ -216,8 +251,8 @@ class RenderEngine:
         pygame.draw.rect(self.screen, col_end, end_rect)
         pygame.draw.rect(self.screen, border_end, end_rect, 1)
         end_txt = state.api_endpoint_buffer + ("|" if state.api_active_field == 1 and (pygame.time.get_ticks()//500)%2==0 else "")
-        self.screen.blit(self.font_main.render(end_txt[-50:], True, UITheme.TEXT_OFF_WHITE), (end_rect.x + 10, end_rect.y + 10))
-        self.screen.blit(self.font_small.render("Press TAB to switch fields. Press ENTER to Save.", True, UITheme.TEXT_DIM), (x + 40, y + 280))
+        self.screen.blit(text_cache.render(self.font_main, end_txt[-50:], True, UITheme.TEXT_OFF_WHITE), (end_rect.x + 10, end_rect.y + 10))
+        self.screen.blit(text_cache.render(self.font_small, "Press TAB to switch fields. Press ENTER to Save.", True, UITheme.TEXT_DIM), (x + 40, y + 280))
 
     def draw_plot_tooltip(self, mouse_pos):
         rel_x = (mouse_pos[0] - 850) / 400.0
@@ -230,7 +265,7 @@ class RenderEngine:
             x_val = row[ctx['x_col']] if ctx.get('x_col') else idx
             y_val = row[ctx['y_col']] if ctx.get('y_col') else "N/A"
             tt_text = f"X: {x_val} | Y: {y_val}"
-            tt_surf = self.font_small.render(tt_text, True, (255, 255, 255))
+            tt_surf = text_cache.render(self.font_small, tt_text, True, (255, 255, 255))
             tt_bg = pygame.Rect(mouse_pos[0] + 10, mouse_pos[1] + 10, tt_surf.get_width() + 10, 20)
             pygame.draw.rect(self.screen, (20, 20, 25), tt_bg)
             pygame.draw.rect(self.screen, UITheme.ACCENT_ORANGE, tt_bg, 1)
@@ -240,7 +275,7 @@ class RenderEngine:
         panel_rect = pygame.Rect(840, 80, 420, 550)
         pygame.draw.rect(self.screen, UITheme.PANEL_GREY, panel_rect)
         UITheme.draw_bracket(self.screen, panel_rect, UITheme.ACCENT_ORANGE)
-        self.screen.blit(self.font_bold.render("EDITING NOTES (CTRL+C/V to Copy/Paste):", True, UITheme.TEXT_DIM), (860, 95))
+        self.screen.blit(text_cache.render(self.font_bold, "EDITING NOTES (CTRL+C/V to Copy/Paste):", True, UITheme.TEXT_DIM), (860, 95))
         
         text_area_rect = pygame.Rect(850, 125, 400, 465)
         pygame.draw.rect(self.screen, UITheme.BG_DARK, text_area_rect)
@@ -263,9 +298,7 @@ class RenderEngine:
         layout.btn_save_meta.draw(self.screen, self.font_bold)
 
     def draw_delete_confirm_modal(self, mouse_pos):
-        overlay = pygame.Surface((1280, 720), pygame.SRCALPHA)
-        overlay.fill((20, 0, 0, 230))
-        self.screen.blit(overlay, (0,0))
+        self.screen.blit(self.dim((20, 0, 0, 230)), (0, 0))
         
         w, h = 500, 250
         x, y = (1280 - w)//2, (720 - h)//2
@@ -274,9 +307,9 @@ class RenderEngine:
         pygame.draw.rect(self.screen, (40, 10, 10), rect)
         pygame.draw.rect(self.screen, (255, 0, 0), rect, 2)
         
-        self.screen.blit(self.font_header.render("DANGER ZONE", True, (255, 50, 50)), (x + 140, y + 30))
-        self.screen.blit(self.font_bold.render("PERMANENTLY DELETE PROJECT?", True, UITheme.TEXT_OFF_WHITE), (x + 110, y + 90))
-        self.screen.blit(self.font_main.render("This action cannot be undone.", True, UITheme.TEXT_DIM), (x + 140, y + 120))
+        self.screen.blit(text_cache.render(self.font_header, "DANGER ZONE", True, (255, 50, 50)), (x + 140, y + 30))
+        self.screen.blit(text_cache.render(self.font_bold, "PERMANENTLY DELETE PROJECT?", True, UITheme.TEXT_OFF_WHITE), (x + 110, y + 90))
+        self.screen.blit(text_cache.render(self.font_main, "This action cannot be undone.", True, UITheme.TEXT_DIM), (x + 140, y + 120))
         
         layout.btn_del_confirm.check_hover(mouse_pos)
         layout.btn_del_confirm.draw(self.screen, self.font_bold)
@@ -285,9 +318,7 @@ class RenderEngine:
         layout.btn_del_cancel.draw(self.screen, self.font_bold)
 
     def draw_conversion_dialog(self, mouse_pos):
-        overlay = pygame.Surface((1280, 720), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 200))
-        self.screen.blit(overlay, (0,0))
+        self.screen.blit(self.dim((0, 0, 0, 200)), (0, 0))
         
         w, h = 400, 200
         x, y = (1280 - w)//2, (720 - h)//2
@@ -296,7 +327,7 @@ class RenderEngine:
         pygame.draw.rect(self.screen, UITheme.ACCENT_ORANGE, rect, 2)
         UITheme.draw_bracket(self.screen, rect, UITheme.ACCENT_ORANGE)
         
-        self.screen.blit(self.font_header.render("UNIT MISMATCH", True, UITheme.ACCENT_ORANGE), (x + 20, y + 20))
+        self.screen.blit(text_cache.render(self.font_header, "UNIT MISMATCH", True, UITheme.ACCENT_ORANGE), (x + 20, y + 20))
         
         if state.pending_conversion:
             file_path, col, unit = state.pending_conversion
@@ -304,7 +335,7 @@ class RenderEngine:
         else:
             msg = "Convert units to match?"
             
-        self.screen.blit(self.font_main.render(msg, True, UITheme.TEXT_OFF_WHITE), (x + 20, y + 70))
+        self.screen.blit(text_cache.render(self.font_main, msg, True, UITheme.TEXT_OFF_WHITE), (x + 20, y + 70))
         
         layout.btn_conv_yes.rect.topleft = (x + 50, y + 130)
         layout.btn_conv_no.rect.topleft = (x + 250, y + 130)
@@ -315,14 +346,21 @@ class RenderEngine:
         layout.btn_conv_no.check_hover(mouse_pos)
         layout.btn_conv_no.draw(self.screen, self.font_bold)
 
+    def draw_search_results(self, mouse_pos):
+        """Ranked full-text matches under the search bar; clicking one jumps to the node."""
+        for i, (node_id, name, snippet) in enumerate(state.search_results[:SEARCH_RESULT_ROWS]):
+            rect = layout.search_result_rect(i)
+            bg = UITheme.GRID_COLOR if rect.collidepoint(mouse_pos) else UITheme.BG_DARK
+            pygame.draw.rect(self.screen, bg, rect)
+            pygame.draw.rect(self.screen, UITheme.GRID_COLOR, rect, 1)
+            self.screen.blit(text_cache.render(self.font_small, f"#{node_id} {name[:40]}", True, UITheme.ACCENT_ORANGE), (rect.x + 5, rect.y + 3))
+            self.screen.blit(text_cache.render(self.font_small, (snippet or "").replace("\n", " ")[:60], True, UITheme.TEXT_DIM), (rect.x + 5, rect.y + 15))
+
     def draw_dashboard(self, mouse_pos, tree_ui, ai_engine, settings_menu):
-        self.screen.fill(UITheme.BG_DARK)
-        UITheme.draw_grid(self.screen)
-        pygame.draw.rect(self.screen, UITheme.PANEL_GREY, (0, 0, 1280, 70))
-        pygame.draw.line(self.screen, UITheme.ACCENT_ORANGE, (0, 70), (1280, 70), 2)
+        self.screen.blit(self.layer("dashboard", self.screen.get_size(), self._paint_dashboard), (0, 0))
         proj_name = os.path.basename(state.selected_project_path).upper() if state.selected_project_path else "NO PROJECT"
         header_txt = f"SCI-GIT // {proj_name} // {state.researcher_name.upper()}"
-        self.screen.blit(self.font_bold.render(header_txt, True, UITheme.ACCENT_ORANGE), (20, 10))
+        self.screen.blit(text_cache.render(self.font_bold, header_txt, True, UITheme.ACCENT_ORANGE), (20, 10))
         
         for b in[layout.btn_menu_file, layout.btn_menu_edit, layout.btn_menu_ai]:
             b.check_hover(mouse_pos)
@@ -358,60 +396,59 @@ class RenderEngine:
         pygame.draw.rect(self.screen, input_bg, search_rect)
         border_col = UITheme.ACCENT_ORANGE if state.search_active else UITheme.TEXT_DIM
         pygame.draw.rect(self.screen, border_col, search_rect, 1)
-        self.screen.blit(self.font_small.render("SEARCH:", True, UITheme.TEXT_DIM), (800, 48))
+        self.screen.blit(text_cache.render(self.font_small, "SEARCH:", True, UITheme.TEXT_DIM), (800, 48))
         display_text = state.search_text
         if state.search_active and (pygame.time.get_ticks() % 1000) > 500: display_text += "_"
-        text_surf = self.font_small.render(display_text, True, UITheme.TEXT_OFF_WHITE)
+        text_surf = text_cache.render(self.font_small, display_text, True, UITheme.TEXT_OFF_WHITE)
         if text_surf.get_width() > 190:
             display_text = "..." + state.search_text[-20:]
             if state.search_active and (pygame.time.get_ticks() % 1000) > 500: display_text += "_"
-            text_surf = self.font_small.render(display_text, True, UITheme.TEXT_OFF_WHITE)
+            text_surf = text_cache.render(self.font_small, display_text, True, UITheme.TEXT_OFF_WHITE)
         self.screen.blit(text_surf, (855, 48))
 
         ai_status = "AI ONLINE" if ai_engine.client else "AI OFFLINE"
         ai_col = (0, 255, 150) if ai_engine.client else (200, 50, 50)
-        self.screen.blit(self.font_main.render(ai_status, True, ai_col), (1125, 10))
-        self.screen.blit(self.font_main.render(f"> {state.status_msg}", True, UITheme.TEXT_DIM), (850, 15))
+        self.screen.blit(text_cache.render(self.font_main, ai_status, True, ai_col), (1125, 10))
+        self.screen.blit(text_cache.render(self.font_main, f"> {state.status_msg}", True, UITheme.TEXT_DIM), (850, 15))
 
-        tree_surf = pygame.Surface((800, 600), pygame.SRCALPHA)
         if pygame.mouse.get_pressed()[0] and not state.show_ai_popup and not state.show_api_popup and not state.show_delete_confirm:
             if not state.pan_mode:
                 tree_ui.update_drag(mouse_pos, (20, 80, 800, 600))
         else:
-            tree_ui.dragged_node_id = None
-            
-        tree_ui.draw(tree_surf, mouse_pos)
-        tree_ui.draw_minimap(tree_surf, tree_surf.get_rect(), self.icons)
-        self.screen.blit(tree_surf, (20, 80))
-        UITheme.draw_bracket(self.screen, (20, 80, 800, 600), UITheme.ACCENT_ORANGE)
+            tree_ui.end_drag()
+
+        if frame_scheduler.wants("tree"): # Skipped when only the header or side panel changed
+            tree_ui.draw(self.tree_surf, mouse_pos)
+            tree_ui.draw_minimap(self.tree_surf, self.tree_surf.get_rect(), self.icons)
+            self.screen.blit(self.tree_surf, (20, 80))
+            UITheme.draw_bracket(self.screen, (20, 80, 800, 600), UITheme.ACCENT_ORANGE)
         
         for b in[layout.btn_zoom_in, layout.btn_zoom_out, layout.btn_pan_mode]:
             b.check_hover(mouse_pos)
             b.draw(self.screen, self.font_bold)
+        self.screen.blit(text_cache.render(self.font_small, f"TEXT CACHE: {text_cache.saved_last_frame} RENDERS SAVED/FRAME", True, UITheme.TEXT_DIM), (150, 640))
             
         if state.pan_mode:
             pygame.draw.rect(self.screen, UITheme.ACCENT_ORANGE, layout.btn_pan_mode.rect, 2)
 
         if len(state.selected_ids) == 1:
-            for node in tree_ui.nodes:
-                if node["id"] == state.selected_ids[0]:
-                    pos = (node["pos"] * tree_ui.zoom_level) + tree_ui.camera_offset
-                    mx, my = pos.x + 45, pos.y + 60
-                    layout.btn_add_manual.rect.topleft = (mx, my)
-                    layout.btn_edit_meta.rect.topleft = (mx, my + 40)
-                    layout.btn_add_manual.check_hover(mouse_pos)
-                    layout.btn_add_manual.draw(self.screen, self.font_main)
-                    layout.btn_edit_meta.check_hover(mouse_pos)
-                    layout.btn_edit_meta.draw(self.screen, self.font_main)
+            node = tree_ui.node_map.get(state.selected_ids[0])
+            if node:
+                pos = (node["pos"] * tree_ui.zoom_level) + tree_ui.camera_offset
+                mx, my = pos.x + 45, pos.y + 60
+                layout.btn_add_manual.rect.topleft = (mx, my)
+                layout.btn_edit_meta.rect.topleft = (mx, my + 40)
+                layout.btn_add_manual.check_hover(mouse_pos)
+                layout.btn_add_manual.draw(self.screen, self.font_main)
+                layout.btn_edit_meta.check_hover(mouse_pos)
+                layout.btn_edit_meta.draw(self.screen, self.font_main)
                     
-                    if node["id"] in state.inconsistent_nodes:
-                        layout.btn_inconsistency_alert.rect.topleft = (mx, my + 80)
-                        layout.btn_inconsistency_alert.check_hover(mouse_pos)
-                        layout.btn_inconsistency_alert.draw(self.screen, self.font_bold)
+                if node["id"] in state.inconsistent_nodes:
+                    layout.btn_inconsistency_alert.rect.topleft = (mx, my + 80)
+                    layout.btn_inconsistency_alert.check_hover(mouse_pos)
+                    layout.btn_inconsistency_alert.draw(self.screen, self.font_bold)
 
-        side_rect = (840, 80, 420, 600)
-        pygame.draw.rect(self.screen, UITheme.PANEL_GREY, side_rect)
-        UITheme.draw_bracket(self.screen, side_rect, (100, 100, 100))
+        self.screen.blit(self.layer("side_panel", (424, 604), self._paint_side_panel, alpha=True), (838, 78))
 
         if not state.is_editing_metadata:
             if state.current_plot: 
@@ -451,16 +488,18 @@ class RenderEngine:
             b.draw(self.screen, self.font_main)
             
         if state.show_add_popup:
-            popup_rect = pygame.Rect(850, 480, 180, 160)
+            popup_rect = pygame.Rect(850, 440, 180, 200)
             pygame.draw.rect(self.screen, UITheme.BG_DARK, popup_rect)
             pygame.draw.rect(self.screen, UITheme.GRID_COLOR, popup_rect, 1)
-            for b in[layout.btn_add_popup_node, layout.btn_add_popup_image, layout.btn_add_popup_linkage, layout.btn_add_popup_more]:
+            for b in[layout.btn_add_popup_node, layout.btn_add_popup_image, layout.btn_add_popup_linkage, layout.btn_add_popup_import, layout.btn_add_popup_more]:
                 b.check_hover(mouse_pos)
                 b.draw(self.screen, self.font_main)
+
+        if state.search_active and state.search_results: self.draw_search_results(mouse_pos)
         
         if state.is_processing:
             if state.processing_mode == "AI": self.draw_ai_loading(mouse_pos)
-            else: draw_loading_overlay(self.screen, self.font_bold)
+            else: draw_loading_overlay(self.screen, self.font_bold, self.dim((10, 10, 12, 200)), state.status_msg if state.processing_mode == "FILE" else None)
         
         if state.show_conversion_dialog: self.draw_conversion_dialog(mouse_pos)
         if state.show_ai_popup: self.draw_ai_popup(mouse_pos)
@@ -468,6 +507,7 @@ class RenderEngine:
         if state.show_api_popup: self.draw_api_config_modal(mouse_pos)
         
         if state.show_settings:
+            self.screen.blit(self.dim((0, 0, 0, 150)), (0, 0))
             settings_menu.draw(self.screen)
             if self.icons.get('settings'):
                 r = layout.btn_main_settings.rect
@@ -0,0 +1,99 @@
+# --- FILE: ui/search_index.py ---
+import threading
+
+class NameIndex:
+    """Trigram postings over lower-cased node names for substring search.
+
+    Queries of 3+ chars intersect the postings of their trigrams and verify the
+    few candidates; shorter ones scan. A query that extends the previous one only
+    re-checks the previous matches, which is the common case while typing.
+    After a full load the postings are built on a thread (see build_async) and
+    searches scan until they are ready.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.names = {} # id -> lower-cased name
+        self.postings = None # trigram -> set of ids, None until built
+        self.journal = None # ids changed while a build runs
+        self.generation = 0
+        self.last_query = None
+        self.last_matches = frozenset()
+
+    @staticmethod
+    def _grams(name):
+        return {name[i:i + 3] for i in range(len(name) - 2)}
+
+    def clear(self):
+        with self.lock:
+            self.names = {}
+            self.postings = None
+            self.journal = None
+            self.generation += 1 # Orphans any build still running
+            self.last_query = None
+
+    def __len__(self):
+        return len(self.names)
+
+    def _post(self, postings, node_id, name, present):
+        for gram in self._grams(name):
+            if present: postings.setdefault(gram, set()).add(node_id)
+            else:
+                bucket = postings.get(gram)
+                if bucket is None: continue
+                bucket.discard(node_id)
+                if not bucket: del postings[gram]
+
+    def add(self, node_id, name):
+        name = (name or "").lower()
+        with self.lock:
+            old = self.names.get(node_id)
+            self.names[node_id] = name
+            if self.postings is not None:
+                if old is not None: self._post(self.postings, node_id, old, False)
+                self._post(self.postings, node_id, name, True)
+            elif self.journal is not None: self.journal.add(node_id)
+            self.last_query = None
+
+    def remove(self, node_id):
+        with self.lock:
+            name = self.names.pop(node_id, None)
+            if name is None: return
+            if self.postings is not None: self._post(self.postings, node_id, name, False)
+            elif self.journal is not None: self.journal.add(node_id)
+            self.last_query = None
+
+    def build_async(self):
+        with self.lock:
+            if self.postings is not None or self.journal is not None: return
+            self.journal = set()
+            snapshot, generation = dict(self.names), self.generation
+        threading.Thread(target=self._build, args=(snapshot, generation), daemon=True).start()
+
+    def _build(self, snapshot, generation):
+        postings = {}
+        for node_id, name in snapshot.items(): self._post(postings, node_id, name, True)
+        with self.lock:
+            if generation != self.generation: return
+            for node_id in self.journal:
+                if node_id in snapshot: self._post(postings, node_id, snapshot[node_id], False)
+                if node_id in self.names: self._post(postings, node_id, self.names[node_id], True)
+            self.postings = postings
+            self.journal = None
+
+    def search(self, query):
+        """Frozen set of ids whose name contains query (case-insensitive)."""
+        q = query.lower()
+        if not q: return frozenset()
+        with self.lock:
+            if q == self.last_query: return self.last_matches
+            if self.last_query and self.last_query in q:
+                candidates = self.last_matches
+            elif len(q) >= 3 and self.postings is not None:
+                buckets = sorted((self.postings.get(g, ()) for g in self._grams(q)), key=len)
+                candidates = set(buckets[0]).intersection(*buckets[1:]) if buckets[0] else ()
+            else:
+                candidates = self.names
+            names = self.names
+            self.last_query = q
+            self.last_matches = frozenset(i for i in candidates if q in names[i])
+            return self.last_matches
@@ -0,0 +1,69 @@
+# --- FILE: ui/spatial.py ---
+class SpatialGrid:
+    """Uniform grid over world coordinates.
+
+    Items are stored in every cell their bounding box touches, so point items
+    (nodes) occupy one cell and edges occupy the cells of their bbox. Items whose
+    bbox would cover more than max_cells (long cross-tree links) are kept in a
+    flat list and bbox-tested on every query instead.
+    """
+    def __init__(self, cell_size=200, max_cells=64):
+        self.cell_size = cell_size
+        self.max_cells = max_cells
+        self.cells = {}
+        self.item_cells = {}
+        self.oversized = {}
+
+    def clear(self):
+        self.cells = {}
+        self.item_cells = {}
+        self.oversized = {}
+
+    def __len__(self):
+        return len(self.item_cells) + len(self.oversized)
+
+    def _cell_range(self, x0, y0, x1, y1):
+        cs = self.cell_size
+        return int(x0 // cs), int(y0 // cs), int(x1 // cs), int(y1 // cs)
+
+    def insert(self, key, x0, y0, x1=None, y1=None):
+        if key in self.item_cells or key in self.oversized: self.remove(key)
+        if x1 is None: x1, y1 = x0, y0
+        x0, x1 = min(x0, x1), max(x0, x1)
+        y0, y1 = min(y0, y1), max(y0, y1)
+        cx0, cy0, cx1, cy1 = self._cell_range(x0, y0, x1, y1)
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > self.max_cells:
+            self.oversized[key] = (x0, y0, x1, y1)
+            return
+        keys = [(cx, cy) for cx in range(cx0, cx1 + 1) for cy in range(cy0, cy1 + 1)]
+        for cell in keys: self.cells.setdefault(cell, set()).add(key)
+        self.item_cells[key] = keys
+
+    def move(self, key, x0, y0, x1=None, y1=None):
+        self.insert(key, x0, y0, x1, y1)
+
+    def remove(self, key):
+        if self.oversized.pop(key, None): return
+        for cell in self.item_cells.pop(key, ()):
+            bucket = self.cells.get(cell)
+            if bucket is None: continue
+            bucket.discard(key)
+            if not bucket: del self.cells[cell]
+
+    def query(self, x0, y0, x1, y1):
+        """Keys whose cells intersect the rect (a superset; callers do the exact test)."""
+        cx0, cy0, cx1, cy1 = self._cell_range(x0, y0, x1, y1)
+        found = {key for key, (bx0, by0, bx1, by1) in self.oversized.items() if bx0 <= x1 and bx1 >= x0 and by0 <= y1 and by1 >= y0}
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > len(self.cells):
+            # Zoomed far out: walking the occupied cells is cheaper than the empty ones
+            for (cx, cy), bucket in self.cells.items():
+                if cx0 <= cx <= cx1 and cy0 <= cy <= cy1: found |= bucket
+            return found
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                bucket = self.cells.get((cx, cy))
+                if bucket: found |= bucket
+        return found
+
+    def query_point(self, x, y, radius):
+        return self.query(x - radius, y - radius, x + radius, y + radius)
@@ -1,6 +1,7 @@
 # ---FILE: ui/styles.py ---
 import pygame
 from core.config import cfg
+from ui.text_cache import text_cache
 
 class ThemePalette:
     def __init__(self):
@@ -8,6 +9,8 @@ class ThemePalette:
 
     def update_theme(self):
         mode = cfg.data.get("theme", "LIGHT")
+        self.mode = mode # Part of the key for pre-rendered layers (RenderEngine.layer)
+        text_cache.flush() # Cached labels carry the old palette's colors
         
         if mode == "LIGHT":
             # Scientific Journal Aesthetic
@@ -0,0 +1,92 @@
+# --- FILE: ui/text_cache.py ---
+import pygame
+from collections import OrderedDict
+
+class TextCache:
+    """LRU of rendered text surfaces keyed by (font, text, antialias, color).
+
+    render() has the same signature as pygame.font.Font.render. Callers must not
+    draw onto the returned surface, since it is shared.
+    """
+    def __init__(self, max_entries=4096, max_blocks=64):
+        self.max_entries = max_entries
+        self.max_blocks = max_blocks
+        self.surfaces = OrderedDict()
+        self.layouts = OrderedDict() # (font, text, width) -> wrapped lines
+        self.blocks = OrderedDict() # (font, text, width, color) -> one surface for the whole paragraph
+        self.frame_hits = 0
+        self.saved_last_frame = 0
+
+    def render(self, font, text, antialias, color):
+        key = (font, text, antialias, tuple(color))
+        surf = self.surfaces.get(key)
+        if surf is not None:
+            self.surfaces.move_to_end(key)
+            self.frame_hits += 1
+            return surf
+        surf = font.render(text, antialias, color)
+        self.surfaces[key] = surf
+        if len(self.surfaces) > self.max_entries: self.surfaces.popitem(last=False)
+        return surf
+
+    def wrap(self, font, text, width_limit):
+        """Word-wraps text to width_limit pixels; tokens wider than that are split per character."""
+        key = (font, text, width_limit)
+        lines = self.layouts.get(key)
+        if lines is not None:
+            self.layouts.move_to_end(key)
+            return lines
+        lines, current_line = [], []
+        for word in text.split():
+            if font.size(word)[0] > width_limit:
+                if current_line:
+                    lines.append(" ".join(current_line))
+                    current_line = []
+                chunk = ""
+                for ch in word:
+                    test = chunk + ch
+                    if font.size(test)[0] > width_limit and chunk:
+                        lines.append(chunk)
+                        chunk = ch
+                    else:
+                        chunk = test
+                if chunk: lines.append(chunk)
+                continue
+            current_line.append(word)
+            if font.size(" ".join(current_line))[0] > width_limit:
+                current_line.pop()
+                lines.append(" ".join(current_line))
+                current_line = [word]
+        if current_line: lines.append(" ".join(current_line))
+        self.layouts[key] = lines
+        if len(self.layouts) > self.max_entries: self.layouts.popitem(last=False)
+        return lines
+
+    def block(self, font, text, color, width_limit):
+        """Wrapped paragraph rendered once into a single transparent surface."""
+        key = (font, text, width_limit, tuple(color))
+        surf = self.blocks.get(key)
+        if surf is not None:
+            self.blocks.move_to_end(key)
+            self.frame_hits += 1
+            return surf
+        lines = self.wrap(font, text, width_limit)
+        step = font.get_linesize() + 2
+        rendered = [font.render(line, True, color) for line in lines]
+        surf = pygame.Surface((max([r.get_width() for r in rendered], default=1), max(1, step * len(lines))), pygame.SRCALPHA)
+        surf.fill((*color[:3], 0)) # Transparent but color-matched, so antialiased edges don't blend toward black
+        for i, line_surf in enumerate(rendered): surf.blit(line_surf, (0, i * step))
+        self.blocks[key] = surf
+        if len(self.blocks) > self.max_blocks: self.blocks.popitem(last=False)
+        return surf
+
+    def end_frame(self):
+        self.saved_last_frame = self.frame_hits
+        self.frame_hits = 0
+
+    def flush(self):
+        self.surfaces.clear()
+        self.blocks.clear()
+
+# Global Instance
+text_cache = TextCache()
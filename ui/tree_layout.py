@@ -0,0 +1,351 @@
+# --- FILE: ui/tree_layout.py ---
+import itertools
+import threading
+from collections import OrderedDict
+from queue import Queue, Empty
+
+GEN_SPACING = 160  # x distance between a node and its children
+ROW_SPACING = 100  # minimum y distance between neighbouring subtrees
+
+class GenerationLayout:
+    """Original placement: x by generation, one fixed row per branch. Siblings on a branch overlap."""
+    name = "generation"
+
+    def compute(self, rows):
+        pos, gen, slots = {}, {}, {"main": 0}
+        for row in rows:
+            node_id, parent_id, branch = row[0], row[1], row[2]
+            gen[node_id] = gen[parent_id] + 1 if parent_id in gen else 0
+            if branch not in slots: slots[branch] = len(slots) * ROW_SPACING
+            pos[node_id] = (gen[node_id] * GEN_SPACING, slots[branch])
+        return pos
+
+class TidyLayout:
+    """Buchheim-Walker tidy tree layout, iterative so deep histories don't hit the recursion limit.
+
+    Depth runs along x; siblings and their subtrees are packed along y without overlap.
+    Children on the parent's branch come first so a branch reads as a straight line.
+    """
+    name = "tidy"
+
+    def compute(self, rows):
+        return TidySession().update(rows)
+
+    def session(self):
+        return TidySession()
+
+class TidySession:
+    """Incremental tidy layout over a tree that changes a few rows at a time.
+
+    Each node caches its subtree's shape: the offset of each child from it and the
+    left/right contours (nearest node per depth on either side) as linked (delta, next)
+    cells that parents share instead of copying. A node with one child stores no cells:
+    its contour is a reference to the child, read through when walked, so a commit at
+    the end of a long run of history only updates heights on the way up. A change
+    re-packs the branching ancestors of the changed nodes and reuses every other subtree
+    as it is; positions are re-emitted only for subtrees whose offset from the first
+    root moved.
+
+    Packing a node's children follows Buchheim-Walker: each child starts one row
+    below its left sibling, is pushed down until its left contour clears the right
+    contour of the siblings before it, and the push is spread evenly over the
+    siblings in between. The parent is centred over its first and last child.
+    """
+    def __init__(self):
+        self.parent = {} # id -> parent in the layout; None is the virtual root holding every real root
+        self.declared = {} # id -> parent_id from its row, which may not be loaded (yet)
+        self.orphans = {} # missing parent_id -> ids laid out as roots until it arrives
+        self.branch = {None: "main"}
+        self.seq = {} # Row order; ties between siblings on the same side of a branch
+        self.counter = itertools.count()
+        self.kids = {None: []}
+        self.rel = {} # id -> offset from its parent, in rows
+        self.height = {None: 1} # Levels in the subtree, counting its root
+        self.lc, self.rc = {None: None}, {None: None} # Contours from the children's level down: a cell, None, or the only child's id
+        self.abs = {None: 0.0} # Offset from the first root, in rows
+        self.depth = {None: -1}
+
+    def update(self, upserts, deleted=()):
+        """Applies (id, parent_id, branch, ...) rows and deleted ids; returns {id: (x, y)} for nodes that moved."""
+        dirty = set()
+        for node_id in deleted:
+            if node_id not in self.parent: continue
+            self._detach(node_id, dirty)
+            for c in self.kids.pop(node_id): # Children wait for their parent as roots, like rows that come before theirs
+                self.parent[c] = None
+                self.kids[None].append(c)
+                self.orphans.setdefault(node_id, set()).add(c)
+            dirty.add(None)
+            dirty.discard(node_id)
+            for table in (self.parent, self.declared, self.branch, self.seq, self.rel, self.height, self.lc, self.rc, self.abs, self.depth):
+                table.pop(node_id, None)
+
+        for row in upserts:
+            node_id, parent_id, branch = row[0], row[1], row[2]
+            if node_id in self.parent:
+                if self.declared[node_id] == parent_id and self.branch[node_id] == branch: continue
+                self._detach(node_id, dirty)
+                if self.branch[node_id] != branch: dirty.add(node_id) # Its children's order depends on its branch
+            else:
+                self.seq[node_id] = next(self.counter)
+                self.kids[node_id] = []
+                self.height[node_id], self.lc[node_id], self.rc[node_id] = 1, None, None
+                for c in self.orphans.pop(node_id, ()):
+                    self.kids[None].remove(c)
+                    self.parent[c] = node_id
+                    self.kids[node_id].append(c)
+                    dirty.update((None, node_id))
+            self.declared[node_id], self.branch[node_id] = parent_id, branch
+            parent = parent_id if parent_id in self.parent else None
+            if parent is not None and (parent == node_id or (self.kids[node_id] and self._is_descendant(parent, node_id))):
+                parent = None # Would close a cycle; laid out as a root
+            if parent is None and parent_id is not None: self.orphans.setdefault(parent_id, set()).add(node_id)
+            self.parent[node_id] = parent
+            self.kids[parent].append(node_id)
+            dirty.add(parent)
+            self.depth[node_id] = None # Forces its subtree to be re-emitted
+
+        if not dirty: return {}
+        # Every dirty node and all its ancestors get re-packed, children before parents. Each
+        # walk up stops at a node an earlier walk reached, so later walks hold no ancestors
+        # of earlier ones and running the walks in reverse keeps that order.
+        parent, marked, walks = self.parent, {None}, []
+        for node_id in dirty:
+            walk = []
+            while node_id not in marked:
+                marked.add(node_id)
+                walk.append(node_id)
+                node_id = parent[node_id]
+            walks.append(walk)
+        order = [w for walk in reversed(walks) for w in walk]
+        order.append(None)
+        kids, rel, height = self.kids, self.rel, self.height
+        for node_id in order:
+            only = kids[node_id]
+            if len(only) == 1: # Straight run: the contours already refer to the child
+                only = only[0]
+                rel[only] = 0.0
+                height[node_id] = height[only] + 1
+                self.lc[node_id] = self.rc[node_id] = only
+            else: self._pack(node_id)
+
+        # Top-down, so a node's parent is final before it; subtrees that kept their offset are skipped
+        abs_y, depths = self.abs, self.depth
+        abs_y[None] = -rel[kids[None][0]] if kids[None] else 0.0
+        pos = {}
+        for node_id in reversed(order):
+            base, depth = abs_y[node_id], depths[node_id] + 1
+            for c in kids[node_id]:
+                y = base + rel[c]
+                if abs_y.get(c) != y or depths.get(c) != depth:
+                    self._place(c, y, depth, pos, descend=c not in marked)
+        return pos
+
+    def positions(self):
+        return {node_id: (self.depth[node_id] * GEN_SPACING, self.abs[node_id] * ROW_SPACING) for node_id in self.parent}
+
+    def _detach(self, node_id, dirty):
+        parent = self.parent[node_id]
+        self.kids[parent].remove(node_id)
+        dirty.add(parent)
+        waiting = self.orphans.get(self.declared[node_id])
+        if waiting:
+            waiting.discard(node_id)
+            if not waiting: del self.orphans[self.declared[node_id]]
+
+    def _is_descendant(self, node_id, ancestor_id):
+        while node_id is not None:
+            if node_id == ancestor_id: return True
+            node_id = self.parent[node_id]
+        return False
+
+    def _place(self, node_id, y, depth, pos, descend):
+        """Sets a node's position; with descend, also its subtree, which keeps its internal offsets."""
+        stack = [(node_id, y, depth)]
+        while stack:
+            v, y, depth = stack.pop()
+            self.abs[v], self.depth[v] = y, depth
+            pos[v] = (depth * GEN_SPACING, y * ROW_SPACING)
+            if descend: stack.extend((c, y + self.rel[c], depth + 1) for c in self.kids[v])
+
+    @staticmethod
+    def _cell(ref, contour):
+        """The (delta, next) cell a contour reference points at; an id stands for that child, straight below."""
+        return ref if ref is None or ref.__class__ is tuple else (0.0, contour[ref])
+
+    def _pack(self, v):
+        kids = self.kids[v]
+        if not kids:
+            self.height[v], self.lc[v], self.rc[v] = 1, None, None
+            return
+        branch, seq, height, lc, rc, cell_of = self.branch, self.seq, self.height, self.lc, self.rc, self._cell
+        own = branch[v]
+        kids.sort(key=lambda c: (branch[c] != own, seq[c]))
+        n = len(kids)
+        x = [0.0] * n
+        shift = [0.0] * n
+        change = [0.0] * n
+        # Right contour of the children placed so far: a stack of [owner, depth, y, next cell, last depth]
+        # segments, deepest at the bottom, each positioned at the first depth it covers
+        forest = [[0, 0, 0.0, cell_of(rc[kids[0]], rc), height[kids[0]] - 1]]
+        for i in range(1, n):
+            c = kids[i]
+            xi = x[i - 1] + 1
+            cell, offset = cell_of(lc[c], lc), 0.0
+            top = forest[-1]
+            while cell is not None:
+                if top[1] == top[4]:
+                    forest.pop()
+                    if not forest: break
+                    top = forest[-1]
+                else:
+                    top[2] += top[3][0]
+                    top[3] = cell_of(top[3][1], rc)
+                    top[1] += 1
+                offset += cell[0]
+                cell = cell_of(cell[1], lc)
+                gap = top[2] + 1 - (xi + offset)
+                if gap > 0: # Push c clear and spread the push over the siblings between it and the one it hit
+                    j = top[0]
+                    change[i] -= gap / (i - j)
+                    change[j] += gap / (i - j)
+                    shift[i] += gap
+                    xi += gap
+            x[i] = xi
+            if cell is None and forest: # c is shorter: the older contour continues below it
+                top = forest[-1]
+                if top[1] == top[4]: forest.pop()
+                else:
+                    top[2] += top[3][0]
+                    top[3] = cell_of(top[3][1], rc)
+                    top[1] += 1
+            else: forest = []
+            forest.append([i, 0, xi, cell_of(rc[c], rc), height[c] - 1])
+
+        acc_shift = acc_change = 0.0
+        for i in range(n - 1, -1, -1):
+            x[i] += acc_shift
+            acc_change += change[i]
+            acc_shift += shift[i] + acc_change
+        mid = (x[0] + x[-1]) / 2
+        rel = [xi - mid for xi in x]
+        for c, r in zip(kids, rel): self.rel[c] = r
+        self.height[v] = 1 + max(height[c] for c in kids)
+        self.lc[v] = self._merge(kids, rel, lc, self.height[v] - 1)
+        self.rc[v] = self._merge(kids[::-1], rel[::-1], rc, self.height[v] - 1)
+
+    def _merge(self, kids, rel, contour, tallest):
+        """Outer contour of a row of subtrees, nearest first: each one covers the levels below the ones before it.
+
+        Only the part above the tallest subtree is copied; its remaining cells are shared.
+        """
+        height, cell_of, deltas, prev, covered = self.height, self._cell, [], 0.0, 0
+        for c, y in zip(kids, rel):
+            if height[c] <= covered: continue
+            cell = contour[c]
+            for _ in range(covered):
+                cell = cell_of(cell, contour)
+                y += cell[0]
+                cell = cell[1]
+            deltas.append(y - prev)
+            prev = y
+            if height[c] == tallest: break
+            cell = cell_of(cell, contour)
+            while cell is not None:
+                prev += cell[0]
+                deltas.append(cell[0])
+                cell = cell_of(cell[1], contour)
+            covered = height[c]
+        for delta in reversed(deltas): cell = (delta, cell)
+        return cell
+
+LAYOUT_ENGINES = {"tidy": TidyLayout, "generation": GenerationLayout}
+
+class LayoutWorker:
+    """Computes layouts on a daemon thread and caches full layouts per (engine, tree revision).
+
+    The worker owns its copy of the tree's (id, parent, branch) rows. The UI sends full
+    loads (reset) and per-commit deltas (update), so the main thread never rebuilds the
+    row list; queued messages are handled together. Engines with a session() (tidy) lay
+    out a delta incrementally; others are recomputed and diffed against the last layout.
+    Either way a result carries only the positions that changed, plus the newest ticket
+    it answers; a reset or engine switch answers with the whole layout.
+    """
+    def __init__(self, cache_size=4):
+        self.requests = Queue()
+        self.results = Queue()
+        self.cache = OrderedDict()
+        self.cache_size = cache_size
+        self.lock = threading.Lock()
+        self.tickets = itertools.count(1)
+        self.epoch = 0 # Bumped by reset(); revisions restart when another project loads
+        # Worker thread only
+        self.rows = {} # id -> (id, parent_id, branch), in tree order
+        self.engine_name = None
+        self.session = None # Incremental layout state of the current engine, if it has one
+        self.last = {} # Last full layout of an engine without sessions
+        self.thread = threading.Thread(target=self._loop, daemon=True)
+        self.thread.start()
+
+    def cached(self, engine, revision):
+        if revision is None: return None
+        with self.lock:
+            return self.cache.get((self.epoch, engine.name, revision))
+
+    def _send(self, message):
+        ticket = next(self.tickets)
+        self.requests.put((ticket, self.epoch, *message))
+        return ticket
+
+    def reset(self, engine, rows, revision):
+        """Replaces the whole tree; rows are (id, parent_id, branch, ...). Returns the ticket."""
+        self.epoch += 1
+        return self._send(("reset", engine, revision, list(rows), ()))
+
+    def update(self, engine, revision, upserts=(), deleted=()):
+        """Applies added/re-parented (id, parent_id, branch) rows and deleted ids."""
+        return self._send(("update", engine, revision, list(upserts), list(deleted)))
+
+    def relayout(self, engine, revision):
+        return self._send(("update", engine, revision, [], []))
+
+    def _loop(self):
+        while True:
+            batch = [self.requests.get()]
+            while not self.requests.empty(): batch.append(self.requests.get()) # Coalesce: one result for many commits
+            ticket, epoch, _, engine, revision, _, _ = batch[-1]
+            rebuild = engine.name != self.engine_name or any(message[2] == "reset" for message in batch)
+            pos = {}
+            try:
+                for _, _, kind, _, _, upserts, deleted in batch:
+                    if kind == "reset": self.rows = {}
+                    for node_id in deleted: self.rows.pop(node_id, None)
+                    for row in upserts: self.rows[row[0]] = (row[0], row[1], row[2])
+                    if not rebuild and self.session: pos.update(self.session.update(upserts, deleted))
+                if rebuild:
+                    self.engine_name = engine.name
+                    self.session = engine.session() if hasattr(engine, "session") else None
+                    pos = self.session.update(self.rows.values()) if self.session else engine.compute(list(self.rows.values()))
+                    self.last = {} if self.session else pos
+                    if revision is not None:
+                        with self.lock:
+                            self.cache[(epoch, engine.name, revision)] = pos
+                            if len(self.cache) > self.cache_size: self.cache.popitem(last=False)
+                elif not self.session:
+                    full = engine.compute(list(self.rows.values()))
+                    pos = {node_id: p for node_id, p in full.items() if self.last.get(node_id) != p}
+                    self.last = full
+            except Exception as e:
+                print(f"Layout failed: {e}")
+                self.engine_name = None # Start over from the rows on the next request
+                continue
+            self.results.put((ticket, pos))
+
+    def poll(self):
+        """(newest ticket, positions) merged over every finished result, or None."""
+        merged, ticket = None, None
+        while True:
+            try: ticket, pos = self.results.get_nowait()
+            except Empty: return (ticket, merged) if merged is not None else None
+            if merged is None: merged = {}
+            merged.update(pos)